@@ -39,6 +39,7 @@ from lightrag.constants import (
     DEFAULT_OLLAMA_MODEL_TAG,
     DEFAULT_RERANK_BINDING,
     DEFAULT_ENTITY_TYPES,
+    DEFAULT_LLM_CACHE_EVICTION_POLICY,
 )
 
 # use the .env that is inside the current folder
@@ -345,6 +346,12 @@ def parse_args() -> argparse.Namespace:
         "ENABLE_LLM_CACHE_FOR_EXTRACT", True, bool
     )
     args.enable_llm_cache = get_env_value("ENABLE_LLM_CACHE", True, bool)
+    args.llm_cache_max_entries = get_env_value("LLM_CACHE_MAX_ENTRIES", None, int, True)
+    args.llm_cache_max_bytes = get_env_value("LLM_CACHE_MAX_BYTES", None, int, True)
+    args.llm_cache_eviction_policy = get_env_value(
+        "LLM_CACHE_EVICTION_POLICY", DEFAULT_LLM_CACHE_EVICTION_POLICY
+    )
+    args.llm_cache_ttl = get_env_value("LLM_CACHE_TTL", None, int, True)
 
     # Select Document loading tool (DOCLING, DEFAULT)
     args.document_loading_engine = get_env_value("DOCUMENT_LOADING_ENGINE", "DEFAULT")
@@ -58,6 +58,7 @@ from lightrag.kg.shared_storage import (
     initialize_pipeline_status,
     cleanup_keyed_lock,
     finalize_share_data,
+    get_namespace_lock_metrics,
 )
 from fastapi.security import OAuth2PasswordRequestForm
 from lightrag.api.auth import auth_handler
@@ -579,6 +580,16 @@ def create_app(args):
         name=args.simulated_model_name, tag=args.simulated_model_tag
     )
 
+    # Apply the LLM cache limits to every cache type when any of them is set
+    llm_cache_limits = {}
+    if args.llm_cache_max_entries or args.llm_cache_max_bytes or args.llm_cache_ttl:
+        llm_cache_limits["*"] = {
+            "max_entries": args.llm_cache_max_entries,
+            "max_bytes": args.llm_cache_max_bytes,
+            "policy": args.llm_cache_eviction_policy,
+            "ttl": args.llm_cache_ttl,
+        }
+
     # Initialize RAG with unified configuration
     try:
         rag = LightRAG(
@@ -606,6 +617,7 @@ def create_app(args):
             },
             enable_llm_cache_for_entity_extract=args.enable_llm_cache_for_extract,
             enable_llm_cache=args.enable_llm_cache,
+            llm_cache_limits=llm_cache_limits,
             rerank_model_func=rerank_model_func,
             max_parallel_insert=args.max_parallel_insert,
             max_graph_nodes=args.max_graph_nodes,
@@ -762,6 +774,8 @@ def create_app(args):
                 "auth_mode": auth_mode,
                 "pipeline_busy": pipeline_status.get("busy", False),
                 "keyed_locks": keyed_lock_info,
+                "namespace_locks": get_namespace_lock_metrics(),
+                "concurrency": rag.get_concurrency_metrics(),
                 "core_version": core_version,
                 "api_version": __api_version__,
                 "webui_title": webui_title,
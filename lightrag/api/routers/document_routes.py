@@ -287,6 +287,48 @@ class ClearCacheResponse(BaseModel):
         }
 
 
+class CompactCacheResponse(BaseModel):
+    """Response model for cache compaction operation
+
+    Attributes:
+        status: Status of the compact operation
+        message: Detailed message describing the operation result
+        evicted_entries: Number of cache entries evicted
+        evicted_bytes: Size of the evicted cache entries in bytes
+        cache_types: Remaining entries and bytes by cache type, plus the number of
+            entries kept because a text chunk still references them
+    """
+
+    status: Literal["success", "skipped"] = Field(
+        description="Status of the compact operation"
+    )
+    message: str = Field(description="Message describing the operation result")
+    evicted_entries: int = Field(default=0, description="Number of evicted entries")
+    evicted_bytes: int = Field(default=0, description="Size of evicted entries")
+    cache_types: Dict[str, Dict[str, Any]] = Field(
+        default_factory=dict,
+        description="Remaining and pinned entries by cache type",
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "status": "success",
+                "message": "Evicted 120 cache entries",
+                "evicted_entries": 120,
+                "evicted_bytes": 524288,
+                "cache_types": {
+                    "extract": {
+                        "entries": 900,
+                        "bytes": 3932160,
+                        "pinned_entries": 2400,
+                    },
+                    "query": {"entries": 450, "bytes": 1048576, "pinned_entries": 0},
+                },
+            }
+        }
+
+
 """Response model for document status
 
 Attributes:
@@ -2275,6 +2317,41 @@ def create_document_routes(
             logger.error(traceback.format_exc())
             raise HTTPException(status_code=500, detail=str(e))
 
+    @router.post(
+        "/compact_cache",
+        response_model=CompactCacheResponse,
+        dependencies=[Depends(combined_auth)],
+    )
+    async def compact_cache():
+        """
+        Evict LLM response cache entries until every cache type is within its limits.
+
+        Expired entries are evicted as well. Extraction results still referenced by
+        a text chunk are kept. Nothing is done when no cache limits are configured.
+
+        Returns:
+            CompactCacheResponse: The evicted entry count and bytes, and the remaining
+            entries and bytes by cache type.
+
+        Raises:
+            HTTPException: If an error occurs during cache compaction (500).
+        """
+        try:
+            result = await rag.acompact_llm_cache()
+            if not result:
+                return CompactCacheResponse(
+                    status="skipped", message="No LLM cache limits configured"
+                )
+            return CompactCacheResponse(
+                status="success",
+                message=f"Evicted {result['evicted_entries']} cache entries",
+                **result,
+            )
+        except Exception as e:
+            logger.error(f"Error compacting cache: {str(e)}")
+            logger.error(traceback.format_exc())
+            raise HTTPException(status_code=500, detail=str(e))
+
     @router.delete(
         "/delete_entity",
         response_model=DeletionResult,
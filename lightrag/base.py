@@ -12,7 +12,7 @@ from typing import (
     TypeVar,
     Callable,
 )
-from .utils import EmbeddingFunc
+from .utils import EmbeddingFunc, cosine_similarities
 from .types import KnowledgeGraph
 from .constants import (
     GRAPH_FIELD_SEP,
@@ -303,6 +303,29 @@ class BaseVectorStorage(StorageNameSpace, ABC):
         """
         pass
 
+    async def score_by_ids(
+        self, query_vector: list[float], ids: list[str]
+    ) -> dict[str, float]:
+        """Get the cosine similarity between a query vector and the vectors of the given IDs
+
+        The default implementation fetches the vectors with get_vectors_by_ids and
+        scores them in one matrix product, storages override it to score the vectors
+        where they are stored.
+
+        Args:
+            query_vector: The query embedding
+            ids: List of unique identifiers
+
+        Returns:
+            Dictionary mapping IDs to their cosine similarity, IDs not found are omitted
+            Format: {id: score, ...}
+        """
+        vectors = await self.get_vectors_by_ids(ids)
+        if not vectors:
+            return {}
+        scores = cosine_similarities(query_vector, list(vectors.values()))
+        return dict(zip(vectors.keys(), scores.tolist()))
+
 
 @dataclass
 class BaseKVStorage(StorageNameSpace, ABC):
@@ -590,6 +613,34 @@ class BaseGraphStorage(StorageNameSpace, ABC):
             edge_data: A dictionary of edge properties
         """
 
+    async def upsert_nodes_batch(self, nodes: list[tuple[str, dict[str, str]]]) -> None:
+        """Insert or update multiple nodes as a batch
+
+        Default implementation upserts nodes one by one.
+        Override this method for better performance in storage backends
+        that support batch operations.
+
+        Args:
+            nodes: List of (node_id, node_data) tuples
+        """
+        for node_id, node_data in nodes:
+            await self.upsert_node(node_id, node_data)
+
+    async def upsert_edges_batch(
+        self, edges: list[tuple[str, str, dict[str, str]]]
+    ) -> None:
+        """Insert or update multiple edges as a batch
+
+        Default implementation upserts edges one by one.
+        Override this method for better performance in storage backends
+        that support batch operations. Both nodes of every edge must exist.
+
+        Args:
+            edges: List of (source_node_id, target_node_id, edge_data) tuples
+        """
+        for source_node_id, target_node_id, edge_data in edges:
+            await self.upsert_edge(source_node_id, target_node_id, edge_data)
+
     @abstractmethod
     async def delete_node(self, node_id: str) -> None:
         """Delete a node from the graph.
@@ -39,6 +39,9 @@ DEFAULT_ENTITY_TYPES = [
 # Separator for graph fields
 GRAPH_FIELD_SEP = "<SEP>"
 
+# Characters tokenized at a time when chunking documents
+CHUNKING_BLOCK_CHARS = 1 << 16
+
 # Query and retrieval configuration defaults
 DEFAULT_TOP_K = 40
 DEFAULT_CHUNK_TOP_K = 20
@@ -64,6 +67,25 @@ DEFAULT_TEMPERATURE = 1.0
 # Async configuration defaults
 DEFAULT_MAX_ASYNC = 4  # Default maximum async operations
 DEFAULT_MAX_PARALLEL_INSERT = 2  # Default maximum parallel insert operations
+DEFAULT_GRAPH_UPSERT_BATCH_SIZE = 500  # Max nodes or edges per graph batch write
+
+# Adaptive (AIMD) concurrency for LLM and embedding calls: the configured max async
+# is the starting limit, which grows up to max async * DEFAULT_ADAPTIVE_ASYNC_MAX_MULTIPLIER
+# while latency is stable and is halved on rate limits, timeouts or latency spikes
+DEFAULT_ADAPTIVE_ASYNC = False
+DEFAULT_ADAPTIVE_ASYNC_MAX_MULTIPLIER = 4
+DEFAULT_ADAPTIVE_ASYNC_LATENCY_FACTOR = (
+    3.0  # Latency spike: above this multiple of the average
+)
+
+# LLM response cache limits: once a cache type exceeds its entry or byte limit, entries
+# are evicted in policy order ("lru", "lfu" or "ttl") until it is back below
+# (1 - DEFAULT_LLM_CACHE_EVICTION_HEADROOM) of the limit
+DEFAULT_LLM_CACHE_EVICTION_POLICY = "lru"
+DEFAULT_LLM_CACHE_EVICTION_HEADROOM = 0.1
+# Seconds before eviction is retried for a cache type an eviction pass could not bring
+# back within its limits
+DEFAULT_LLM_CACHE_EVICTION_RETRY_INTERVAL = 60
 
 # Embedding configuration defaults
 DEFAULT_EMBEDDING_FUNC_MAX_ASYNC = 8  # Default max async for embedding functions
@@ -87,3 +109,8 @@ DEFAULT_OLLAMA_MODEL_TAG = "latest"
 DEFAULT_OLLAMA_MODEL_SIZE = 7365960935
 DEFAULT_OLLAMA_CREATED_AT = "2024-01-15T00:00:00Z"
 DEFAULT_OLLAMA_DIGEST = "sha256:lightrag"
+
+# Shared HTTP connection pool defaults for LLM and embedding bindings
+DEFAULT_HTTP_MAX_CONNECTIONS = 100
+DEFAULT_HTTP_MAX_KEEPALIVE_CONNECTIONS = 20
+DEFAULT_HTTP_KEEPALIVE_EXPIRY = 30  # Seconds an idle connection is kept open
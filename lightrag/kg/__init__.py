@@ -5,6 +5,7 @@ STORAGE_IMPLEMENTATIONS = {
             "RedisKVStorage",
             "PGKVStorage",
             "MongoKVStorage",
+            "SqliteKVStorage",
         ],
         "required_methods": ["get_by_id", "upsert"],
     },
@@ -36,6 +37,7 @@ STORAGE_IMPLEMENTATIONS = {
             "RedisDocStatusStorage",
             "PGDocStatusStorage",
             "MongoDocStatusStorage",
+            "SqliteDocStatusStorage",
         ],
         "required_methods": ["get_docs_by_status"],
     },
@@ -48,6 +50,7 @@ STORAGE_ENV_REQUIREMENTS: dict[str, list[str]] = {
     "MongoKVStorage": [],
     "RedisKVStorage": ["REDIS_URI"],
     "PGKVStorage": ["POSTGRES_USER", "POSTGRES_PASSWORD", "POSTGRES_DATABASE"],
+    "SqliteKVStorage": [],
     # Graph Storage Implementations
     "NetworkXStorage": [],
     "Neo4JStorage": ["NEO4J_URI", "NEO4J_USERNAME", "NEO4J_PASSWORD"],
@@ -76,6 +79,7 @@ STORAGE_ENV_REQUIREMENTS: dict[str, list[str]] = {
     "RedisDocStatusStorage": ["REDIS_URI"],
     "PGDocStatusStorage": ["POSTGRES_USER", "POSTGRES_PASSWORD", "POSTGRES_DATABASE"],
     "MongoDocStatusStorage": [],
+    "SqliteDocStatusStorage": [],
 }
 
 # Storage implementation module mapping
@@ -101,6 +105,8 @@ STORAGES = {
     "FaissVectorDBStorage": ".kg.faiss_impl",
     "QdrantVectorDBStorage": ".kg.qdrant_impl",
     "MemgraphStorage": ".kg.memgraph_impl",
+    "SqliteKVStorage": ".kg.sqlite_impl",
+    "SqliteDocStatusStorage": ".kg.sqlite_impl",
 }
 
 
@@ -10,14 +10,22 @@ from lightrag.utils import logger, compute_mdhash_id
 from lightrag.base import BaseVectorStorage
 
 from .shared_storage import (
-    get_storage_lock,
+    CHANGE_SET_MAX_KEYS,
+    get_change_version,
+    get_changes_since,
+    get_namespace_lock,
     get_update_flag,
-    set_all_update_flags,
+    publish_changes,
 )
 
 # You must manually install faiss-cpu or faiss-gpu before using FAISS vector db
 import faiss  # type: ignore
 
+# Supported values for the "index_type" key of vector_db_storage_cls_kwargs
+FAISS_INDEX_TYPES = ("flat", "hnsw", "ivf_flat", "ivf_pq")
+# Index types that must be trained before vectors can be added
+FAISS_IVF_INDEX_TYPES = ("ivf_flat", "ivf_pq")
+
 
 @final
 @dataclass
@@ -25,6 +33,13 @@ class FaissVectorDBStorage(BaseVectorStorage):
     """
     A Faiss-based Vector DB Storage for LightRAG.
     Uses cosine similarity by storing normalized vectors in a Faiss index with inner product search.
+
+    The index type is selected with vector_db_storage_cls_kwargs:
+    - "flat" (default): exact brute-force search
+    - "hnsw": graph based ANN search, tuned by hnsw_m, ef_construction and ef_search
+    - "ivf_flat" / "ivf_pq": inverted file ANN search, tuned by nlist, nprobe
+      (and pq_m, pq_nbits for product quantization). IVF indexes stay exact until
+      train_size vectors exist, then are trained once on the stored vectors.
     """
 
     def __post_init__(self):
@@ -37,6 +52,28 @@ class FaissVectorDBStorage(BaseVectorStorage):
             )
         self.cosine_better_than_threshold = cosine_threshold
 
+        # ANN index configuration
+        self._index_type = str(kwargs.get("index_type", "flat")).lower()
+        if self._index_type not in FAISS_INDEX_TYPES:
+            raise ValueError(
+                f"Unsupported Faiss index_type '{self._index_type}', expected one of {FAISS_INDEX_TYPES}"
+            )
+        self._hnsw_m = int(kwargs.get("hnsw_m", 32))
+        self._ef_construction = int(kwargs.get("ef_construction", 200))
+        self._ef_search = int(kwargs.get("ef_search", 64))
+        self._nlist = int(kwargs.get("nlist", 1024))
+        self._nprobe = int(kwargs.get("nprobe", 16))
+        self._pq_m = int(kwargs.get("pq_m", 16))
+        self._pq_nbits = int(kwargs.get("pq_nbits", 8))
+        # k-means needs enough points per centroid, faiss recommends at least 39 * nlist
+        self._train_size = max(
+            int(kwargs.get("train_size", self._nlist * 39)),
+            self._nlist,
+            2**self._pq_nbits,
+        )
+        # HNSW cannot remove vectors, deleted ids are masked until this share is exceeded
+        self._compact_ratio = float(kwargs.get("compact_ratio", 0.2))
+
         # Where to save index file if you want persistent storage
         working_dir = self.global_config["working_dir"]
         if self.workspace:
@@ -60,13 +97,23 @@ class FaissVectorDBStorage(BaseVectorStorage):
         # Embedding dimension (e.g. 768) must match your embedding function
         self._dim = self.embedding_func.embedding_dim
 
-        # Create an empty Faiss index for inner product (useful for normalized vectors = cosine similarity).
-        # If you have a large number of vectors, you might want IVF or other indexes.
-        # For demonstration, we use a simple IndexFlatIP.
-        self._index = faiss.IndexFlatIP(self._dim)
+        # Inner product index over normalized vectors (= cosine similarity), keyed by
+        # stable faiss ids so vectors can be removed and reconstructed by id.
+        self._index = self._create_index()
         # Keep a local store for metadata, IDs, etc.
         # Maps <int faiss_id> → metadata (including your original ID).
         self._id_to_meta = {}
+        # Reverse map <custom id> → <int faiss_id> for O(1) lookups
+        self._custom_id_to_fid: dict[str, int] = {}
+        # Next faiss id to assign, faiss ids are never reused
+        self._next_fid = 0
+        # Faiss ids deleted from metadata but still present in an HNSW graph
+        self._tombstones: set[int] = set()
+        # Changes made since the last index_done_callback, published to other processes
+        self._pending_upserts: dict[str, dict[str, Any]] = {}
+        self._pending_deletes: set[str] = set()
+        # Version of the published changes already reflected in the index
+        self._change_version = 0
 
         self._load_faiss_index()
 
@@ -74,22 +121,21 @@ class FaissVectorDBStorage(BaseVectorStorage):
         """Initialize storage data"""
         # Get the update flag for cross-process update notification
         self.storage_updated = await get_update_flag(self.final_namespace)
+        self._change_version = await get_change_version(self.final_namespace)
         # Get the storage lock for use in other methods
-        self._storage_lock = get_storage_lock()
+        self._storage_lock = get_namespace_lock(self.final_namespace)
 
     async def _get_index(self):
-        """Check if the shtorage should be reloaded"""
-        # Acquire lock to prevent concurrent read and write
-        async with self._storage_lock:
+        """Check if the storage should be brought up to date with other processes"""
+        # Readers share the lock as long as there is nothing to apply
+        async with self._storage_lock.read():
+            if not self.storage_updated.value:
+                return self._index
+        # Applying changes of other processes needs exclusive access
+        async with self._storage_lock.write():
             # Check if storage was updated by another process
             if self.storage_updated.value:
-                logger.info(
-                    f"[{self.workspace}] Process {os.getpid()} FAISS reloading {self.namespace} due to update by another process"
-                )
-                # Reload data
-                self._index = faiss.IndexFlatIP(self._dim)
-                self._id_to_meta = {}
-                self._load_faiss_index()
+                await self._sync_changes()
                 self.storage_updated.value = False
             return self._index
 
@@ -154,7 +200,7 @@ class FaissVectorDBStorage(BaseVectorStorage):
         # 2. Remove them
         # 3. Add the new vectors
         existing_ids_to_remove = []
-        for meta, emb in zip(list_data, embeddings):
+        for meta in list_data:
             faiss_internal_id = self._find_faiss_id_by_custom_id(meta["__id__"])
             if faiss_internal_id is not None:
                 existing_ids_to_remove.append(faiss_internal_id)
@@ -162,17 +208,13 @@ class FaissVectorDBStorage(BaseVectorStorage):
         if existing_ids_to_remove:
             await self._remove_faiss_ids(existing_ids_to_remove)
 
-        # Step 2: Add new vectors
-        index = await self._get_index()
-        start_idx = index.ntotal
-        index.add(embeddings)
-
-        # Step 3: Store metadata + vector for each new ID
-        for i, meta in enumerate(list_data):
-            fid = start_idx + i
-            # Store the raw vector so we can rebuild if something is removed
-            meta["__vector__"] = embeddings[i].tolist()
-            self._id_to_meta.update({fid: meta})
+        # Step 2: Add new vectors under freshly assigned faiss ids
+        await self._get_index()
+        async with self._storage_lock.write():
+            self._add_vectors(list_data, embeddings)
+            for meta, vector in zip(list_data, embeddings):
+                self._pending_upserts[meta["__id__"]] = {**meta, "__vector__": vector}
+                self._pending_deletes.discard(meta["__id__"])
 
         logger.debug(
             f"[{self.workspace}] Upserted {len(list_data)} vectors into Faiss index."
@@ -180,10 +222,17 @@ class FaissVectorDBStorage(BaseVectorStorage):
         return [m["__id__"] for m in list_data]
 
     async def query(
-        self, query: str, top_k: int, query_embedding: list[float] = None
+        self,
+        query: str,
+        top_k: int,
+        query_embedding: list[float] = None,
+        nprobe: int | None = None,
+        ef_search: int | None = None,
     ) -> list[dict[str, Any]]:
         """
         Search by a textual query; returns top_k results with their metadata + similarity distance.
+
+        nprobe (IVF) and ef_search (HNSW) override the configured search breadth for this query.
         """
         if query_embedding is not None:
             embedding = np.array([query_embedding], dtype=np.float32)
@@ -198,7 +247,11 @@ class FaissVectorDBStorage(BaseVectorStorage):
 
         # Perform the similarity search
         index = await self._get_index()
-        distances, indices = index.search(embedding, top_k)
+        params = self._search_params(nprobe, ef_search)
+        if params is not None:
+            distances, indices = index.search(embedding, top_k, params=params)
+        else:
+            distances, indices = index.search(embedding, top_k)
 
         distances = distances[0]
         indices = indices[0]
@@ -213,7 +266,10 @@ class FaissVectorDBStorage(BaseVectorStorage):
             if dist < self.cosine_better_than_threshold:
                 continue
 
-            meta = self._id_to_meta.get(idx, {})
+            meta = self._id_to_meta.get(idx)
+            if meta is None:
+                # Deleted vector still present in the index
+                continue
             # Filter out __vector__ from query results to avoid returning large vector data
             filtered_meta = {k: v for k, v in meta.items() if k != "__vector__"}
             results.append(
@@ -227,6 +283,71 @@ class FaissVectorDBStorage(BaseVectorStorage):
 
         return results
 
+    async def evaluate_index(
+        self, num_queries: int = 100, top_k: int = 10
+    ) -> dict[str, Any]:
+        """
+        Compare the configured index against exact flat search over the same vectors.
+
+        A sample of stored vectors is used as queries. Returns recall@top_k of the
+        configured index relative to flat search, plus mean per-query latencies.
+        """
+        index = await self._get_index()
+        fids = np.fromiter(self._id_to_meta.keys(), dtype=np.int64)
+        report: dict[str, Any] = {
+            "index_type": self._index_type,
+            "active_index": type(index).__name__,
+            "ntotal": len(fids),
+            "top_k": top_k,
+            "num_queries": 0,
+            "recall": None,
+            "index_latency_ms": None,
+            "flat_latency_ms": None,
+        }
+        if len(fids) == 0:
+            return report
+
+        vectors = np.asarray(index.reconstruct_batch(fids), dtype=np.float32)
+        faiss.normalize_L2(vectors)
+        flat = faiss.IndexIDMap2(faiss.IndexFlatIP(self._dim))
+        flat.add_with_ids(vectors, fids)
+
+        rng = np.random.default_rng(0)
+        sample = rng.choice(len(fids), size=min(num_queries, len(fids)), replace=False)
+        queries = vectors[sample]
+        k = min(top_k, len(fids))
+
+        start = time.perf_counter()
+        _, exact = flat.search(queries, k)
+        flat_elapsed = time.perf_counter() - start
+
+        params = self._search_params()
+        start = time.perf_counter()
+        if params is not None:
+            _, approx = index.search(queries, k, params=params)
+        else:
+            _, approx = index.search(queries, k)
+        index_elapsed = time.perf_counter() - start
+
+        hits = sum(
+            len(set(exact_row.tolist()) & set(approx_row.tolist()))
+            for exact_row, approx_row in zip(exact, approx)
+        )
+        report.update(
+            {
+                "num_queries": len(queries),
+                "recall": hits / (len(queries) * k),
+                "index_latency_ms": index_elapsed * 1000 / len(queries),
+                "flat_latency_ms": flat_elapsed * 1000 / len(queries),
+            }
+        )
+        logger.info(
+            f"[{self.workspace}] Faiss {self._index_type} index report for {self.namespace}: "
+            f"recall@{k}={report['recall']:.3f}, "
+            f"{report['index_latency_ms']:.3f}ms vs flat {report['flat_latency_ms']:.3f}ms per query"
+        )
+        return report
+
     @property
     def client_storage(self):
         # Return whatever structure LightRAG might need for debugging
@@ -249,6 +370,8 @@ class FaissVectorDBStorage(BaseVectorStorage):
             fid = self._find_faiss_id_by_custom_id(cid)
             if fid is not None:
                 to_remove.append(fid)
+            self._pending_upserts.pop(cid, None)
+            self._pending_deletes.add(cid)
 
         if to_remove:
             await self._remove_faiss_ids(to_remove)
@@ -281,6 +404,8 @@ class FaissVectorDBStorage(BaseVectorStorage):
         for fid, meta in self._id_to_meta.items():
             if meta.get("src_id") == entity_name or meta.get("tgt_id") == entity_name:
                 relations.append(fid)
+                self._pending_upserts.pop(meta["__id__"], None)
+                self._pending_deletes.add(meta["__id__"])
 
         logger.debug(
             f"[{self.workspace}] Found {len(relations)} relations for {entity_name}"
@@ -295,48 +420,282 @@ class FaissVectorDBStorage(BaseVectorStorage):
     # Internal helper methods
     # --------------------------------------------------------------------------------
 
+    def _create_index(self):
+        """
+        Create an empty Faiss index that supports add_with_ids and reconstruct by faiss id.
+        IVF index types start as an exact flat index until they can be trained.
+        """
+        if self._index_type == "hnsw":
+            hnsw = faiss.IndexHNSWFlat(
+                self._dim, self._hnsw_m, faiss.METRIC_INNER_PRODUCT
+            )
+            hnsw.hnsw.efConstruction = self._ef_construction
+            hnsw.hnsw.efSearch = self._ef_search
+            return faiss.IndexIDMap2(hnsw)
+        return faiss.IndexIDMap2(faiss.IndexFlatIP(self._dim))
+
+    def _create_ivf_index(self):
+        """
+        Create an untrained IVF index with a hashtable direct map,
+        so vectors can be removed and reconstructed by faiss id.
+        """
+        quantizer = faiss.IndexFlatIP(self._dim)
+        if self._index_type == "ivf_pq":
+            index = faiss.IndexIVFPQ(
+                quantizer,
+                self._dim,
+                self._nlist,
+                self._pq_m,
+                self._pq_nbits,
+                faiss.METRIC_INNER_PRODUCT,
+            )
+        else:
+            index = faiss.IndexIVFFlat(
+                quantizer, self._dim, self._nlist, faiss.METRIC_INNER_PRODUCT
+            )
+        index.set_direct_map_type(faiss.DirectMap.Hashtable)
+        index.nprobe = self._nprobe
+        return index
+
+    def _is_hnsw(self, index) -> bool:
+        return isinstance(index, faiss.IndexIDMap2) and isinstance(
+            faiss.downcast_index(index.index), faiss.IndexHNSW
+        )
+
+    def _is_configured_type(self, index) -> bool:
+        """
+        Check whether a loaded index matches the configured index type
+        (an untrained-stage flat index counts as matching for IVF types).
+        """
+        if isinstance(index, faiss.IndexIVF):
+            expected = (
+                faiss.IndexIVFPQ if self._index_type == "ivf_pq" else faiss.IndexIVFFlat
+            )
+            return self._index_type in FAISS_IVF_INDEX_TYPES and isinstance(
+                index, expected
+            )
+        if not isinstance(index, faiss.IndexIDMap2):
+            return False
+        if self._is_hnsw(index):
+            return self._index_type == "hnsw"
+        return self._index_type != "hnsw"
+
+    def _rebuild_index(self, index, fids: list[int]):
+        """
+        Build a fresh index of the configured type holding only the given faiss ids,
+        reading their vectors from an existing index of any supported type.
+        """
+        new_index = self._create_index()
+        if fids:
+            ids = np.asarray(fids, dtype=np.int64)
+            vectors = np.asarray(index.reconstruct_batch(ids), dtype=np.float32)
+            new_index.add_with_ids(vectors, ids)
+        self._index = new_index
+        self._tombstones = set()
+        self._maybe_train_ivf()
+
+    def _maybe_train_ivf(self):
+        """
+        Switch an IVF-configured storage from its exact staging index to a trained
+        IVF index once train_size vectors exist. Training happens only once.
+        """
+        if self._index_type not in FAISS_IVF_INDEX_TYPES:
+            return
+        if isinstance(self._index, faiss.IndexIVF):
+            return
+        if self._index.ntotal < self._train_size:
+            return
+
+        ids = faiss.vector_to_array(self._index.id_map).astype(np.int64)
+        vectors = self._index.index.reconstruct_n(0, self._index.ntotal)
+        ivf = self._create_ivf_index()
+        start = time.perf_counter()
+        ivf.train(vectors)
+        ivf.add_with_ids(vectors, ids)
+        self._index = ivf
+        logger.info(
+            f"[{self.workspace}] Trained Faiss {self._index_type} index for {self.namespace} "
+            f"on {len(ids)} vectors in {time.perf_counter() - start:.2f}s"
+        )
+
+    def _search_params(self, nprobe: int | None = None, ef_search: int | None = None):
+        """
+        Build per-query Faiss search parameters for the current index, or None for flat search.
+        """
+        if isinstance(self._index, faiss.IndexIVF):
+            return faiss.SearchParametersIVF(nprobe=nprobe or self._nprobe)
+        if self._is_hnsw(self._index):
+            params = faiss.SearchParametersHNSW(efSearch=ef_search or self._ef_search)
+            if self._tombstones:
+                # Keep deleted vectors out of the candidate set
+                params.sel = faiss.IDSelectorNot(
+                    faiss.IDSelectorBatch(np.fromiter(self._tombstones, dtype=np.int64))
+                )
+            return params
+        return None
+
+    def _compact_if_needed(self, force: bool = False):
+        """
+        Rebuild an HNSW index without its deleted vectors once they exceed compact_ratio.
+        """
+        if not self._tombstones:
+            return
+        if not force and len(self._tombstones) <= self._compact_ratio * max(
+            self._index.ntotal, 1
+        ):
+            return
+        logger.info(
+            f"[{self.workspace}] Compacting Faiss index for {self.namespace}, "
+            f"dropping {len(self._tombstones)} deleted vectors"
+        )
+        self._rebuild_index(self._index, list(self._id_to_meta.keys()))
+
+    def _reset_index(self):
+        """
+        Reset the in-memory index and all id bookkeeping to an empty state.
+        """
+        self._index = self._create_index()
+        self._id_to_meta = {}
+        self._custom_id_to_fid = {}
+        self._next_fid = 0
+        self._tombstones = set()
+
     def _find_faiss_id_by_custom_id(self, custom_id: str):
         """
         Return the Faiss internal ID for a given custom ID, or None if not found.
         """
-        for fid, meta in self._id_to_meta.items():
-            if meta.get("__id__") == custom_id:
-                return fid
-        return None
+        return self._custom_id_to_fid.get(custom_id)
+
+    def _get_vector(self, fid: int) -> list[float] | None:
+        """
+        Reconstruct the stored (normalized) vector for a Faiss internal ID.
+        """
+        try:
+            return self._index.reconstruct(int(fid)).tolist()
+        except RuntimeError:
+            return None
+
+    def _add_vectors(self, list_data: list[dict[str, Any]], embeddings: np.ndarray):
+        """
+        Add normalized vectors under freshly assigned faiss ids and store their metadata.
+        """
+        start_fid = self._next_fid
+        fids = np.arange(start_fid, start_fid + len(list_data), dtype=np.int64)
+        self._index.add_with_ids(embeddings, fids)
+        self._next_fid = start_fid + len(list_data)
+        # Train the IVF index once enough vectors have been loaded
+        self._maybe_train_ivf()
+
+        # Store metadata for each new ID, vectors live in the index only
+        for fid, meta in zip(fids.tolist(), list_data):
+            self._id_to_meta[fid] = meta
+            self._custom_id_to_fid[meta["__id__"]] = fid
+
+    def _remove_fids(self, fid_list):
+        """
+        Remove a list of internal Faiss IDs from the index in place.
+        Only the given ids are touched, no Python-side rebuild of the index.
+        HNSW graphs do not support removal, their ids are masked at query time instead.
+        """
+        if not fid_list:
+            return
+
+        if self._is_hnsw(self._index):
+            self._tombstones.update(int(fid) for fid in fid_list)
+        else:
+            self._index.remove_ids(np.asarray(fid_list, dtype=np.int64))
+        for fid in fid_list:
+            meta = self._id_to_meta.pop(fid, None)
+            if meta is not None:
+                self._custom_id_to_fid.pop(meta.get("__id__"), None)
 
     async def _remove_faiss_ids(self, fid_list):
         """
-        Remove a list of internal Faiss IDs from the index.
-        Because IndexFlatIP doesn't support 'removals',
-        we rebuild the index excluding those vectors.
+        Remove a list of internal Faiss IDs from the index under the storage lock.
+        """
+        if not fid_list:
+            return
+
+        async with self._storage_lock.write():
+            self._remove_fids(fid_list)
+
+    def _apply_changes(self, changes: dict[str, Any]):
+        """
+        Apply a change set published by another process to the in-memory index.
+        Faiss ids are assigned locally, records are matched by their custom id.
         """
-        keep_fids = [fid for fid in self._id_to_meta if fid not in fid_list]
+        upserts = changes["upsert"]
+        stale_ids = list(changes["delete"]) + [meta["__id__"] for meta in upserts]
+        fids = [
+            fid
+            for fid in map(self._find_faiss_id_by_custom_id, stale_ids)
+            if fid is not None
+        ]
+        self._remove_fids(fids)
+        if upserts:
+            embeddings = np.stack([meta["__vector__"] for meta in upserts]).astype(
+                np.float32
+            )
+            metas = [
+                {k: v for k, v in meta.items() if k != "__vector__"} for meta in upserts
+            ]
+            self._add_vectors(metas, embeddings)
 
-        # Rebuild the index
-        vectors_to_keep = []
-        new_id_to_meta = {}
-        for new_fid, old_fid in enumerate(keep_fids):
-            vec_meta = self._id_to_meta[old_fid]
-            vectors_to_keep.append(vec_meta["__vector__"])  # stored as list
-            new_id_to_meta[new_fid] = vec_meta
+    def _take_changes(self) -> dict[str, Any] | None:
+        """
+        Return and reset the pending changes, None if too large to publish as a delta.
+        """
+        changes = {
+            "upsert": list(self._pending_upserts.values()),
+            "delete": list(self._pending_deletes),
+        }
+        self._pending_upserts = {}
+        self._pending_deletes = set()
+        if len(changes["upsert"]) + len(changes["delete"]) > CHANGE_SET_MAX_KEYS:
+            return None
+        return changes
 
-        async with self._storage_lock:
-            # Re-init index
-            self._index = faiss.IndexFlatIP(self._dim)
-            if vectors_to_keep:
-                arr = np.array(vectors_to_keep, dtype=np.float32)
-                self._index.add(arr)
+    async def _reload(self):
+        """
+        Reload the index from disk, discarding unsaved changes.
+        """
+        self._change_version = await get_change_version(self.final_namespace)
+        self._reset_index()
+        self._load_faiss_index()
+        self._pending_upserts = {}
+        self._pending_deletes = set()
 
-            self._id_to_meta = new_id_to_meta
+    async def _sync_changes(self):
+        """
+        Apply changes published by other processes, caller must hold the namespace write lock.
+        Falls back to a full reload when the published changes do not cover the gap.
+        """
+        latest, change_sets = await get_changes_since(
+            self.final_namespace, self._change_version
+        )
+        if change_sets is None:
+            logger.info(
+                f"[{self.workspace}] Process {os.getpid()} FAISS reloading {self.namespace} due to update by another process"
+            )
+            self._reset_index()
+            self._load_faiss_index()
+        else:
+            for changes in change_sets:
+                self._apply_changes(changes)
+            logger.debug(
+                f"[{self.workspace}] Process {os.getpid()} FAISS applied {len(change_sets)} change sets to {self.namespace}"
+            )
+        self._change_version = latest
 
     def _save_faiss_index(self):
         """
         Save the current Faiss index + metadata to disk so it can persist across runs.
         """
+        self._compact_if_needed()
         faiss.write_index(self._index, self._faiss_index_file)
 
         # Save metadata dict to JSON. Convert all keys to strings for JSON storage.
-        # _id_to_meta is { int: { '__id__': doc_id, '__vector__': [float,...], ... } }
+        # _id_to_meta is { int: { '__id__': doc_id, ... } }, vectors are kept in the index.
         # We'll keep the int -> dict, but JSON requires string keys.
         serializable_dict = {}
         for fid, meta in self._id_to_meta.items():
@@ -358,16 +717,40 @@ class FaissVectorDBStorage(BaseVectorStorage):
 
         try:
             # Load the Faiss index
-            self._index = faiss.read_index(self._faiss_index_file)
+            index = faiss.read_index(self._faiss_index_file)
             # Load metadata
             with open(self._meta_file, "r", encoding="utf-8") as f:
                 stored_dict = json.load(f)
 
-            # Convert string keys back to int
+            # Convert string keys back to int and rebuild the reverse id map
             self._id_to_meta = {}
+            self._custom_id_to_fid = {}
             for fid_str, meta in stored_dict.items():
                 fid = int(fid_str)
+                # Legacy metadata carried a copy of the vector, it lives in the index now
+                meta.pop("__vector__", None)
                 self._id_to_meta[fid] = meta
+                self._custom_id_to_fid[meta["__id__"]] = fid
+            self._next_fid = max(self._id_to_meta, default=-1) + 1
+
+            if self._is_configured_type(index):
+                self._index = index
+                if self._is_hnsw(index):
+                    stored_fids = faiss.vector_to_array(index.id_map)
+                    self._tombstones = set(stored_fids.tolist()) - set(self._id_to_meta)
+                    # Tombstoned fids stay in the graph, never hand them out again
+                    if stored_fids.size:
+                        self._next_fid = max(self._next_fid, int(stored_fids.max()) + 1)
+                    self._compact_if_needed()
+                else:
+                    self._maybe_train_ivf()
+            else:
+                # Legacy plain IndexFlatIP (faiss ids are sequential positions) or an
+                # index built with another index_type: rebuild into the configured type
+                logger.info(
+                    f"[{self.workspace}] Rebuilding Faiss index for {self.namespace} as {self._index_type}"
+                )
+                self._rebuild_index(index, list(self._id_to_meta.keys()))
 
             logger.info(
                 f"[{self.workspace}] Faiss index loaded with {self._index.ntotal} vectors from {self._faiss_index_file}"
@@ -377,30 +760,29 @@ class FaissVectorDBStorage(BaseVectorStorage):
                 f"[{self.workspace}] Failed to load Faiss index or metadata: {e}"
             )
             logger.warning(f"[{self.workspace}] Starting with an empty Faiss index.")
-            self._index = faiss.IndexFlatIP(self._dim)
-            self._id_to_meta = {}
+            self._reset_index()
 
     async def index_done_callback(self) -> None:
-        async with self._storage_lock:
+        async with self._storage_lock.write():
             # Check if storage was updated by another process
             if self.storage_updated.value:
                 # Storage was updated by another process, reload data instead of saving
                 logger.warning(
                     f"[{self.workspace}] Storage for FAISS {self.namespace} was updated by another process, reloading..."
                 )
-                self._index = faiss.IndexFlatIP(self._dim)
-                self._id_to_meta = {}
-                self._load_faiss_index()
+                await self._reload()
                 self.storage_updated.value = False
                 return False  # Return error
 
         # Acquire lock and perform persistence
-        async with self._storage_lock:
+        async with self._storage_lock.write():
             try:
                 # Save data to disk
                 self._save_faiss_index()
-                # Notify other processes that data has been updated
-                await set_all_update_flags(self.final_namespace)
+                # Publish the changes so other processes can apply them without reloading
+                self._change_version = await publish_changes(
+                    self.final_namespace, self._take_changes()
+                )
                 # Reset own update flag to avoid self-reloading
                 self.storage_updated.value = False
             except Exception as e:
@@ -487,14 +869,54 @@ class FaissVectorDBStorage(BaseVectorStorage):
         for id in ids:
             # Find the Faiss internal ID for the custom ID
             fid = self._find_faiss_id_by_custom_id(id)
-            if fid is not None and fid in self._id_to_meta:
-                metadata = self._id_to_meta[fid]
-                # Get the stored vector from metadata
-                if "__vector__" in metadata:
-                    vectors_dict[id] = metadata["__vector__"]
+            if fid is not None:
+                # Reconstruct the stored vector from the index
+                vector = self._get_vector(fid)
+                if vector is not None:
+                    vectors_dict[id] = vector
 
         return vectors_dict
 
+    async def score_by_ids(
+        self, query_vector: list[float], ids: list[str]
+    ) -> dict[str, float]:
+        """Get the cosine similarity between a query vector and the vectors of the given IDs
+
+        Reconstructs the stored (normalized) vectors in one batch and scores them in
+        one matrix-vector product.
+
+        Args:
+            query_vector: The query embedding
+            ids: List of unique identifiers
+
+        Returns:
+            Dictionary mapping IDs to their cosine similarity, IDs not found are omitted
+            Format: {id: score, ...}
+        """
+        if not ids:
+            return {}
+
+        index = await self._get_index()
+        found = {}
+        for id in ids:
+            fid = self._find_faiss_id_by_custom_id(id)
+            if fid is not None:
+                found[id] = fid
+        if not found:
+            return {}
+
+        query = np.array(query_vector, dtype=np.float32).reshape(1, -1)
+        faiss.normalize_L2(query)
+        try:
+            vectors = index.reconstruct_batch(
+                np.fromiter(found.values(), dtype=np.int64, count=len(found))
+            )
+        except RuntimeError:
+            # Fall back to the vectors that can be reconstructed one by one
+            return await super().score_by_ids(query_vector, ids)
+        scores = np.asarray(vectors, dtype=np.float32) @ query[0]
+        return dict(zip(found.keys(), scores.tolist()))
+
     async def drop(self) -> dict[str, str]:
         """Drop all vector data from storage and clean up resources
 
@@ -512,10 +934,9 @@ class FaissVectorDBStorage(BaseVectorStorage):
             - On failure: {"status": "error", "message": "<error details>"}
         """
         try:
-            async with self._storage_lock:
+            async with self._storage_lock.write():
                 # Reset the index
-                self._index = faiss.IndexFlatIP(self._dim)
-                self._id_to_meta = {}
+                self._reset_index()
 
                 # Remove storage files if they exist
                 if os.path.exists(self._faiss_index_file):
@@ -523,11 +944,12 @@ class FaissVectorDBStorage(BaseVectorStorage):
                 if os.path.exists(self._meta_file):
                     os.remove(self._meta_file)
 
-                self._id_to_meta = {}
                 self._load_faiss_index()
+                self._pending_upserts = {}
+                self._pending_deletes = set()
 
-                # Notify other processes
-                await set_all_update_flags(self.final_namespace)
+                # Notify other processes that data has been replaced, forcing a full reload
+                self._change_version = await publish_changes(self.final_namespace, None)
                 self.storage_updated.value = False
 
                 logger.info(
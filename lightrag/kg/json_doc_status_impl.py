@@ -1,3 +1,5 @@
+from bisect import bisect_left, insort
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
 import os
 from typing import Any, Union, final
@@ -15,15 +17,43 @@ from lightrag.utils import (
 )
 from lightrag.exceptions import StorageNotInitializedError
 from .shared_storage import (
+    SharedDictReplica,
     get_namespace_data,
-    get_storage_lock,
+    get_namespace_lock,
     get_data_init_lock,
     get_update_flag,
-    set_all_update_flags,
     clear_all_update_flags,
     try_initialize_namespace,
 )
 
+# Fields get_docs_paginated can sort by, each kept as a sorted index
+DOC_STATUS_SORT_FIELDS = ("created_at", "updated_at", "id", "file_path")
+
+
+def _doc_sort_key(doc_id: str, doc_data: dict[str, Any], sort_field: str) -> str:
+    if sort_field == "id":
+        return doc_id
+    if sort_field == "file_path":
+        # Use pinyin sorting for file_path field to support Chinese characters
+        return get_pinyin_sort_key(doc_data.get("file_path", "no-file-path"))
+    return str(doc_data.get(sort_field) or "")
+
+
+def _to_doc_processing_status(doc_data: dict[str, Any]) -> DocProcessingStatus:
+    # Make a copy of the data to avoid modifying the original
+    data = doc_data.copy()
+    # Remove deprecated content field if it exists
+    data.pop("content", None)
+    # If file_path is not in data, use document id as file path
+    if "file_path" not in data:
+        data["file_path"] = "no-file-path"
+    # Ensure new fields exist with default values
+    if "metadata" not in data:
+        data["metadata"] = {}
+    if "error_msg" not in data:
+        data["error_msg"] = None
+    return DocProcessingStatus(**data)
+
 
 @final
 @dataclass
@@ -45,12 +75,23 @@ class JsonDocStatusStorage(DocStatusStorage):
         os.makedirs(workspace_dir, exist_ok=True)
         self._file_name = os.path.join(workspace_dir, f"kv_store_{self.namespace}.json")
         self._data = None
+        # Worker view of self._data, a local copy when JSON_STORAGE_REPLICA is enabled
+        self._replica: SharedDictReplica | None = None
         self._storage_lock = None
         self.storage_updated = None
+        # Per-process secondary indexes over the replica, built on first use and kept
+        # current by re-indexing the doc ids of every change the replica applies
+        self._index_built = False
+        self._status_index: dict[str, set[str]] = {}
+        self._track_id_index: dict[str, set[str]] = {}
+        # (sort_field, status or None) -> sorted list of (sort_key, doc_id)
+        self._sorted_index: dict[tuple[str, str | None], list[tuple[str, str]]] = {}
+        # doc_id -> (status, track_id, sort keys) the document is indexed under
+        self._indexed_docs: dict[str, tuple[str, str | None, tuple[str, ...]]] = {}
 
     async def initialize(self):
         """Initialize storage data"""
-        self._storage_lock = get_storage_lock()
+        self._storage_lock = get_namespace_lock(self.final_namespace)
         self.storage_updated = await get_update_flag(self.final_namespace)
         async with get_data_init_lock():
             # check need_init must before get_namespace_data
@@ -58,26 +99,139 @@ class JsonDocStatusStorage(DocStatusStorage):
             self._data = await get_namespace_data(self.final_namespace)
             if need_init:
                 loaded_data = load_json(self._file_name) or {}
-                async with self._storage_lock:
+                async with self._storage_lock.write():
                     self._data.update(loaded_data)
                     logger.info(
                         f"[{self.workspace}] Process {os.getpid()} doc status load {self.namespace} with {len(loaded_data)} records"
                     )
+            self._replica = SharedDictReplica(
+                self.final_namespace, self._data, on_change=self._on_replica_change
+            )
+            await self._replica.initialize()
 
-    async def filter_keys(self, keys: set[str]) -> set[str]:
-        """Return keys that should be processed (not in storage or not successfully processed)"""
+    def _unindex_doc(self, doc_id: str) -> None:
+        indexed = self._indexed_docs.pop(doc_id, None)
+        if indexed is None:
+            return
+        status, track_id, sort_keys = indexed
+        self._status_index[status].discard(doc_id)
+        if track_id is not None:
+            ids = self._track_id_index[track_id]
+            ids.discard(doc_id)
+            if not ids:
+                del self._track_id_index[track_id]
+        for sort_field, sort_key in zip(DOC_STATUS_SORT_FIELDS, sort_keys):
+            for bucket in (None, status):
+                entries = self._sorted_index[(sort_field, bucket)]
+                pos = bisect_left(entries, (sort_key, doc_id))
+                if pos < len(entries) and entries[pos] == (sort_key, doc_id):
+                    del entries[pos]
+
+    def _index_doc(self, doc_id: str, doc_data: dict[str, Any] | None) -> None:
+        self._unindex_doc(doc_id)
+        if doc_data is None:
+            return
+        status = doc_data.get("status")
+        track_id = doc_data.get("track_id")
+        sort_keys = tuple(
+            _doc_sort_key(doc_id, doc_data, sort_field)
+            for sort_field in DOC_STATUS_SORT_FIELDS
+        )
+        self._indexed_docs[doc_id] = (status, track_id, sort_keys)
+        self._status_index.setdefault(status, set()).add(doc_id)
+        if track_id is not None:
+            self._track_id_index.setdefault(track_id, set()).add(doc_id)
+        for sort_field, sort_key in zip(DOC_STATUS_SORT_FIELDS, sort_keys):
+            for bucket in (None, status):
+                insort(
+                    self._sorted_index.setdefault((sort_field, bucket), []),
+                    (sort_key, doc_id),
+                )
+
+    def _rebuild_index(self) -> None:
+        self._status_index = {}
+        self._track_id_index = {}
+        self._sorted_index = {}
+        self._indexed_docs = {}
+        for doc_id, doc_data in self._snapshot_data().items():
+            status = doc_data.get("status")
+            track_id = doc_data.get("track_id")
+            sort_keys = tuple(
+                _doc_sort_key(doc_id, doc_data, sort_field)
+                for sort_field in DOC_STATUS_SORT_FIELDS
+            )
+            self._indexed_docs[doc_id] = (status, track_id, sort_keys)
+            self._status_index.setdefault(status, set()).add(doc_id)
+            if track_id is not None:
+                self._track_id_index.setdefault(track_id, set()).add(doc_id)
+        # Sort once instead of inserting one by one
+        for i, sort_field in enumerate(DOC_STATUS_SORT_FIELDS):
+            for bucket in [None, *self._status_index]:
+                self._sorted_index[(sort_field, bucket)] = sorted(
+                    (sort_keys[i], doc_id)
+                    for doc_id, (status, _, sort_keys) in self._indexed_docs.items()
+                    if bucket is None or status == bucket
+                )
+
+    def _on_replica_change(self, doc_ids: list[str] | None) -> None:
+        if not self._index_built:
+            return
+        if doc_ids is None:
+            self._rebuild_index()
+            return
+        for doc_id in doc_ids:
+            self._index_doc(doc_id, self._replica.data.get(doc_id))
+
+    async def _sync_index(self) -> None:
+        """Bring the replica and the secondary indexes up to date"""
+        await self._replica.sync()
+        if not self._index_built:
+            self._rebuild_index()
+            self._index_built = True
+
+    @asynccontextmanager
+    async def _reading(self):
+        """Read context, a local replica is read without the namespace lock"""
         if self._storage_lock is None:
             raise StorageNotInitializedError("JsonDocStatusStorage")
-        async with self._storage_lock:
-            return set(keys) - set(self._data.keys())
+        if self._replica.local:
+            yield
+        else:
+            async with self._storage_lock.read():
+                yield
+
+    def _snapshot_data(self) -> dict[str, Any]:
+        # One transfer from the shared dict instead of a round trip per document
+        data = self._replica.data
+        return data._getvalue() if hasattr(data, "_getvalue") else data
+
+    def _load_doc_statuses(self, doc_ids: list[str]) -> dict[str, DocProcessingStatus]:
+        result = {}
+        docs = self._snapshot_data() if len(doc_ids) > 100 else self._replica.data
+        for k in doc_ids:
+            v = docs.get(k)
+            if v is None:
+                continue
+            try:
+                result[k] = _to_doc_processing_status(v)
+            except KeyError as e:
+                logger.error(
+                    f"[{self.workspace}] Missing required field for document {k}: {e}"
+                )
+        return result
+
+    async def filter_keys(self, keys: set[str]) -> set[str]:
+        """Return keys that should be processed (not in storage or not successfully processed)"""
+        async with self._reading():
+            await self._replica.sync()
+            return set(keys) - set(self._replica.data.keys())
 
     async def get_by_ids(self, ids: list[str]) -> list[dict[str, Any]]:
         result: list[dict[str, Any]] = []
-        if self._storage_lock is None:
-            raise StorageNotInitializedError("JsonDocStatusStorage")
-        async with self._storage_lock:
+        async with self._reading():
+            await self._replica.sync()
             for id in ids:
-                data = self._data.get(id, None)
+                data = self._replica.data.get(id, None)
                 if data:
                     result.append(data)
         return result
@@ -85,77 +239,42 @@ class JsonDocStatusStorage(DocStatusStorage):
     async def get_status_counts(self) -> dict[str, int]:
         """Get counts of documents in each status"""
         counts = {status.value: 0 for status in DocStatus}
-        if self._storage_lock is None:
-            raise StorageNotInitializedError("JsonDocStatusStorage")
-        async with self._storage_lock:
-            for doc in self._data.values():
-                counts[doc["status"]] += 1
+        async with self._reading():
+            await self._sync_index()
+            for status, ids in self._status_index.items():
+                counts[status] = counts.get(status, 0) + len(ids)
         return counts
 
     async def get_docs_by_status(
         self, status: DocStatus
     ) -> dict[str, DocProcessingStatus]:
         """Get all documents with a specific status"""
-        result = {}
-        async with self._storage_lock:
-            for k, v in self._data.items():
-                if v["status"] == status.value:
-                    try:
-                        # Make a copy of the data to avoid modifying the original
-                        data = v.copy()
-                        # Remove deprecated content field if it exists
-                        data.pop("content", None)
-                        # If file_path is not in data, use document id as file path
-                        if "file_path" not in data:
-                            data["file_path"] = "no-file-path"
-                        # Ensure new fields exist with default values
-                        if "metadata" not in data:
-                            data["metadata"] = {}
-                        if "error_msg" not in data:
-                            data["error_msg"] = None
-                        result[k] = DocProcessingStatus(**data)
-                    except KeyError as e:
-                        logger.error(
-                            f"[{self.workspace}] Missing required field for document {k}: {e}"
-                        )
-                        continue
-        return result
+        async with self._reading():
+            await self._sync_index()
+            doc_ids = list(self._status_index.get(status.value, ()))
+            return self._load_doc_statuses(doc_ids)
 
     async def get_docs_by_track_id(
         self, track_id: str
     ) -> dict[str, DocProcessingStatus]:
         """Get all documents with a specific track_id"""
-        result = {}
-        async with self._storage_lock:
-            for k, v in self._data.items():
-                if v.get("track_id") == track_id:
-                    try:
-                        # Make a copy of the data to avoid modifying the original
-                        data = v.copy()
-                        # Remove deprecated content field if it exists
-                        data.pop("content", None)
-                        # If file_path is not in data, use document id as file path
-                        if "file_path" not in data:
-                            data["file_path"] = "no-file-path"
-                        # Ensure new fields exist with default values
-                        if "metadata" not in data:
-                            data["metadata"] = {}
-                        if "error_msg" not in data:
-                            data["error_msg"] = None
-                        result[k] = DocProcessingStatus(**data)
-                    except KeyError as e:
-                        logger.error(
-                            f"[{self.workspace}] Missing required field for document {k}: {e}"
-                        )
-                        continue
-        return result
+        async with self._reading():
+            await self._sync_index()
+            doc_ids = list(self._track_id_index.get(track_id, ()))
+            return self._load_doc_statuses(doc_ids)
 
     async def index_done_callback(self) -> None:
-        async with self._storage_lock:
+        async with self._storage_lock.write():
             if self.storage_updated.value:
-                data_dict = (
-                    dict(self._data) if hasattr(self._data, "_getvalue") else self._data
-                )
+                if self._replica.local:
+                    await self._replica.sync()
+                    data_dict = self._replica.data
+                else:
+                    data_dict = (
+                        dict(self._data)
+                        if hasattr(self._data, "_getvalue")
+                        else self._data
+                    )
                 logger.debug(
                     f"[{self.workspace}] Process {os.getpid()} doc status writting {len(data_dict)} records to {self.namespace}"
                 )
@@ -175,19 +294,20 @@ class JsonDocStatusStorage(DocStatusStorage):
         )
         if self._storage_lock is None:
             raise StorageNotInitializedError("JsonDocStatusStorage")
-        async with self._storage_lock:
+        async with self._storage_lock.write():
             # Ensure chunks_list field exists for new documents
             for doc_id, doc_data in data.items():
                 if "chunks_list" not in doc_data:
                     doc_data["chunks_list"] = []
-            self._data.update(data)
-            await set_all_update_flags(self.final_namespace)
+            # Also sets the update flags so the changes get persisted
+            await self._replica.write(upserts=data)
 
         await self.index_done_callback()
 
     async def get_by_id(self, id: str) -> Union[dict[str, Any], None]:
-        async with self._storage_lock:
-            return self._data.get(id)
+        async with self._reading():
+            await self._replica.sync()
+            return self._replica.data.get(id)
 
     async def get_docs_paginated(
         self,
@@ -223,66 +343,33 @@ class JsonDocStatusStorage(DocStatusStorage):
         if sort_direction.lower() not in ["asc", "desc"]:
             sort_direction = "desc"
 
-        # For JSON storage, we load all data and sort/filter in memory
-        all_docs = []
-
-        async with self._storage_lock:
-            for doc_id, doc_data in self._data.items():
-                # Apply status filter
-                if (
-                    status_filter is not None
-                    and doc_data.get("status") != status_filter.value
-                ):
+        # Slice the page straight out of the sorted index, only its documents are loaded
+        status_key = status_filter.value if status_filter is not None else None
+        start_idx = (page - 1) * page_size
+        end_idx = start_idx + page_size
+        paginated_docs = []
+
+        async with self._reading():
+            await self._sync_index()
+            entries = self._sorted_index.get((sort_field, status_key), [])
+            total_count = len(entries)
+            if sort_direction.lower() == "desc":
+                page_entries = entries[
+                    max(total_count - end_idx, 0) : max(total_count - start_idx, 0)
+                ][::-1]
+            else:
+                page_entries = entries[start_idx:end_idx]
+
+            for _, doc_id in page_entries:
+                doc_data = self._replica.data.get(doc_id)
+                if doc_data is None:
                     continue
-
                 try:
-                    # Prepare document data
-                    data = doc_data.copy()
-                    data.pop("content", None)
-                    if "file_path" not in data:
-                        data["file_path"] = "no-file-path"
-                    if "metadata" not in data:
-                        data["metadata"] = {}
-                    if "error_msg" not in data:
-                        data["error_msg"] = None
-
-                    doc_status = DocProcessingStatus(**data)
-
-                    # Add sort key for sorting
-                    if sort_field == "id":
-                        doc_status._sort_key = doc_id
-                    elif sort_field == "file_path":
-                        # Use pinyin sorting for file_path field to support Chinese characters
-                        file_path_value = getattr(doc_status, sort_field, "")
-                        doc_status._sort_key = get_pinyin_sort_key(file_path_value)
-                    else:
-                        doc_status._sort_key = getattr(doc_status, sort_field, "")
-
-                    all_docs.append((doc_id, doc_status))
-
+                    paginated_docs.append((doc_id, _to_doc_processing_status(doc_data)))
                 except KeyError as e:
                     logger.error(
                         f"[{self.workspace}] Error processing document {doc_id}: {e}"
                     )
-                    continue
-
-        # Sort documents
-        reverse_sort = sort_direction.lower() == "desc"
-        all_docs.sort(
-            key=lambda x: getattr(x[1], "_sort_key", ""), reverse=reverse_sort
-        )
-
-        # Remove sort key from documents
-        for doc_id, doc in all_docs:
-            if hasattr(doc, "_sort_key"):
-                delattr(doc, "_sort_key")
-
-        total_count = len(all_docs)
-
-        # Apply pagination
-        start_idx = (page - 1) * page_size
-        end_idx = start_idx + page_size
-        paginated_docs = all_docs[start_idx:end_idx]
 
         return paginated_docs, total_count
 
@@ -313,15 +400,15 @@ class JsonDocStatusStorage(DocStatusStorage):
         Returns:
             None
         """
-        async with self._storage_lock:
-            any_deleted = False
-            for doc_id in doc_ids:
-                result = self._data.pop(doc_id, None)
-                if result is not None:
-                    any_deleted = True
-
-            if any_deleted:
-                await set_all_update_flags(self.final_namespace)
+        async with self._storage_lock.write():
+            await self._replica.sync()
+            deleted_ids = [
+                doc_id
+                for doc_id in doc_ids
+                if self._replica.data.get(doc_id) is not None
+            ]
+            if deleted_ids:
+                await self._replica.write(deletes=deleted_ids)
 
     async def drop(self) -> dict[str, str]:
         """Drop all document status data from storage and clean up resources
@@ -337,9 +424,8 @@ class JsonDocStatusStorage(DocStatusStorage):
             - On failure: {"status": "error", "message": "<error details>"}
         """
         try:
-            async with self._storage_lock:
-                self._data.clear()
-                await set_all_update_flags(self.final_namespace)
+            async with self._storage_lock.write():
+                await self._replica.write(clear=True)
 
             await self.index_done_callback()
             logger.info(
@@ -1,4 +1,5 @@
 import os
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from typing import Any, final
 
@@ -12,11 +13,11 @@ from lightrag.utils import (
 )
 from lightrag.exceptions import StorageNotInitializedError
 from .shared_storage import (
+    SharedDictReplica,
     get_namespace_data,
-    get_storage_lock,
+    get_namespace_lock,
     get_data_init_lock,
     get_update_flag,
-    set_all_update_flags,
     clear_all_update_flags,
     try_initialize_namespace,
 )
@@ -41,12 +42,14 @@ class JsonKVStorage(BaseKVStorage):
         self._file_name = os.path.join(workspace_dir, f"kv_store_{self.namespace}.json")
 
         self._data = None
+        # Worker view of self._data, a local copy when JSON_STORAGE_REPLICA is enabled
+        self._replica: SharedDictReplica | None = None
         self._storage_lock = None
         self.storage_updated = None
 
     async def initialize(self):
         """Initialize storage data"""
-        self._storage_lock = get_storage_lock()
+        self._storage_lock = get_namespace_lock(self.final_namespace)
         self.storage_updated = await get_update_flag(self.final_namespace)
         async with get_data_init_lock():
             # check need_init must before get_namespace_data
@@ -54,7 +57,7 @@ class JsonKVStorage(BaseKVStorage):
             self._data = await get_namespace_data(self.final_namespace)
             if need_init:
                 loaded_data = load_json(self._file_name) or {}
-                async with self._storage_lock:
+                async with self._storage_lock.write():
                     # Migrate legacy cache structure if needed
                     if self.namespace.endswith("_cache"):
                         loaded_data = await self._migrate_legacy_cache_structure(
@@ -67,13 +70,33 @@ class JsonKVStorage(BaseKVStorage):
                     logger.info(
                         f"[{self.workspace}] Process {os.getpid()} KV load {self.namespace} with {data_count} records"
                     )
+            self._replica = SharedDictReplica(self.final_namespace, self._data)
+            await self._replica.initialize()
+
+    @asynccontextmanager
+    async def _reading(self):
+        """Yield the data to read from, a local replica is read without the namespace lock"""
+        if self._storage_lock is None:
+            raise StorageNotInitializedError("JsonKVStorage")
+        if self._replica.local:
+            await self._replica.sync()
+            yield self._replica.data
+        else:
+            async with self._storage_lock.read():
+                yield self._data
 
     async def index_done_callback(self) -> None:
-        async with self._storage_lock:
+        async with self._storage_lock.write():
             if self.storage_updated.value:
-                data_dict = (
-                    dict(self._data) if hasattr(self._data, "_getvalue") else self._data
-                )
+                if self._replica.local:
+                    await self._replica.sync()
+                    data_dict = self._replica.data
+                else:
+                    data_dict = (
+                        dict(self._data)
+                        if hasattr(self._data, "_getvalue")
+                        else self._data
+                    )
 
                 # Calculate data count - all data is now flattened
                 data_count = len(data_dict)
@@ -90,9 +113,9 @@ class JsonKVStorage(BaseKVStorage):
         Returns:
             Dictionary containing all stored data
         """
-        async with self._storage_lock:
+        async with self._reading() as stored:
             result = {}
-            for key, value in self._data.items():
+            for key, value in stored.items():
                 if value:
                     # Create a copy to avoid modifying the original data
                     data = dict(value)
@@ -105,8 +128,8 @@ class JsonKVStorage(BaseKVStorage):
             return result
 
     async def get_by_id(self, id: str) -> dict[str, Any] | None:
-        async with self._storage_lock:
-            result = self._data.get(id)
+        async with self._reading() as stored:
+            result = stored.get(id)
             if result:
                 # Create a copy to avoid modifying the original data
                 result = dict(result)
@@ -118,10 +141,10 @@ class JsonKVStorage(BaseKVStorage):
             return result
 
     async def get_by_ids(self, ids: list[str]) -> list[dict[str, Any]]:
-        async with self._storage_lock:
+        async with self._reading() as stored:
             results = []
             for id in ids:
-                data = self._data.get(id, None)
+                data = stored.get(id, None)
                 if data:
                     # Create a copy to avoid modifying the original data
                     result = {k: v for k, v in data.items()}
@@ -136,8 +159,8 @@ class JsonKVStorage(BaseKVStorage):
             return results
 
     async def filter_keys(self, keys: set[str]) -> set[str]:
-        async with self._storage_lock:
-            return set(keys) - set(self._data.keys())
+        async with self._reading() as stored:
+            return set(keys) - set(stored.keys())
 
     async def upsert(self, data: dict[str, dict[str, Any]]) -> None:
         """
@@ -157,7 +180,9 @@ class JsonKVStorage(BaseKVStorage):
         )
         if self._storage_lock is None:
             raise StorageNotInitializedError("JsonKVStorage")
-        async with self._storage_lock:
+        async with self._storage_lock.write():
+            await self._replica.sync()
+            stored = self._replica.data
             # Add timestamps to data based on whether key exists
             for k, v in data.items():
                 # For text_chunks namespace, ensure llm_cache_list field exists
@@ -166,7 +191,7 @@ class JsonKVStorage(BaseKVStorage):
                         v["llm_cache_list"] = []
 
                 # Add timestamps based on whether key exists
-                if k in self._data:  # Key exists, only update update_time
+                if k in stored:  # Key exists, only update update_time
                     v["update_time"] = current_time
                 else:  # New key, set both create_time and update_time
                     v["create_time"] = current_time
@@ -174,8 +199,8 @@ class JsonKVStorage(BaseKVStorage):
 
                 v["_id"] = k
 
-            self._data.update(data)
-            await set_all_update_flags(self.final_namespace)
+            # Also sets the update flags so the changes get persisted
+            await self._replica.write(upserts=data)
 
     async def delete(self, ids: list[str]) -> None:
         """Delete specific records from storage by their IDs
@@ -190,15 +215,11 @@ class JsonKVStorage(BaseKVStorage):
         Returns:
             None
         """
-        async with self._storage_lock:
-            any_deleted = False
-            for doc_id in ids:
-                result = self._data.pop(doc_id, None)
-                if result is not None:
-                    any_deleted = True
-
-            if any_deleted:
-                await set_all_update_flags(self.final_namespace)
+        async with self._storage_lock.write():
+            await self._replica.sync()
+            deleted_ids = [doc_id for doc_id in ids if doc_id in self._replica.data]
+            if deleted_ids:
+                await self._replica.write(deletes=deleted_ids)
 
     async def drop(self) -> dict[str, str]:
         """Drop all data from storage and clean up resources
@@ -215,9 +236,8 @@ class JsonKVStorage(BaseKVStorage):
             - On failure: {"status": "error", "message": "<error details>"}
         """
         try:
-            async with self._storage_lock:
-                self._data.clear()
-                await set_all_update_flags(self.final_namespace)
+            async with self._storage_lock.write():
+                await self._replica.write(clear=True)
 
             await self.index_done_callback()
             logger.info(
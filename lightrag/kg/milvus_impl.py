@@ -1303,6 +1303,49 @@ class MilvusVectorDBStorage(BaseVectorStorage):
             )
             return {}
 
+    async def score_by_ids(
+        self, query_vector: list[float], ids: list[str]
+    ) -> dict[str, float]:
+        """Get the cosine similarity between a query vector and the vectors of the given IDs
+
+        Runs a search filtered to the given IDs, so Milvus computes the similarities
+        and no vector is transferred.
+
+        Args:
+            query_vector: The query embedding
+            ids: List of unique identifiers
+
+        Returns:
+            Dictionary mapping IDs to their cosine similarity, IDs not found are omitted
+            Format: {id: score, ...}
+        """
+        if not ids:
+            return {}
+
+        try:
+            # Ensure collection is loaded before querying
+            self._ensure_collection_loaded()
+
+            # Prepare the ID filter expression
+            id_list = '", "'.join(ids)
+            filter_expr = f'id in ["{id_list}"]'
+
+            results = self._client.search(
+                collection_name=self.final_namespace,
+                data=[list(query_vector)],
+                filter=filter_expr,
+                limit=len(ids),
+                output_fields=["id"],
+                search_params={"metric_type": "COSINE"},
+            )
+
+            return {dp["id"]: float(dp["distance"]) for dp in results[0]}
+        except Exception as e:
+            logger.error(
+                f"[{self.workspace}] Error scoring vectors by IDs from {self.namespace}: {e}"
+            )
+            return {}
+
     async def drop(self) -> dict[str, str]:
         """Drop all vector data from storage and clean up resources
 
@@ -1,7 +1,6 @@
 import asyncio
-import base64
+import json
 import os
-import zlib
 from typing import Any, final
 from dataclasses import dataclass
 import numpy as np
@@ -15,12 +14,115 @@ from lightrag.utils import (
 from lightrag.base import BaseVectorStorage
 from nano_vectordb import NanoVectorDB
 from .shared_storage import (
-    get_storage_lock,
+    CHANGE_SET_MAX_KEYS,
+    get_change_version,
+    get_changes_since,
+    get_namespace_lock,
     get_update_flag,
-    set_all_update_flags,
+    publish_changes,
 )
 
 
+@dataclass
+class MmapNanoVectorDB(NanoVectorDB):
+    """NanoVectorDB persisted as a raw float32 matrix plus a JSON metadata sidecar.
+
+    The normalized matrix is saved as a .npy file and opened with np.load(mmap_mode="c")
+    on load, so startup and reload skip JSON/base64 decoding and processes sharing the
+    file share page-cache memory. In-place updates are copy-on-write and never touch
+    the file; save() writes new files and atomically replaces the old ones.
+    A legacy single-file JSON database at storage_file is loaded if no binary files
+    exist yet, and is migrated on the next save.
+    """
+
+    matrix_file: str = "nano-vectordb.npy"
+    meta_file: str = "nano-vectordb.meta.json"
+
+    def __post_init__(self):
+        # id -> matrix row, built on first use and dropped whenever rows change
+        self._rows: dict[str, int] | None = None
+        storage = self._load_binary_storage()
+        if storage is None:
+            # Fall back to the legacy JSON format (or an empty database)
+            super().__post_init__()
+            for data in self._NanoVectorDB__storage["data"]:
+                # Legacy per-record compressed vector copies, the matrix holds the vectors
+                data.pop("vector", None)
+            return
+
+        self._NanoVectorDB__storage = storage
+        self.usable_metrics = {
+            "cosine": self._cosine_query,
+        }
+        assert self.metric in self.usable_metrics, f"Metric {self.metric} not supported"
+        # The saved matrix is already normalized, no pre_process copy needed
+
+    def _load_binary_storage(self) -> dict[str, Any] | None:
+        if not (os.path.exists(self.matrix_file) and os.path.exists(self.meta_file)):
+            return None
+
+        with open(self.meta_file, encoding="utf-8") as f:
+            storage = json.load(f)
+        assert (
+            storage["embedding_dim"] == self.embedding_dim
+        ), f"Embedding dim mismatch, expected: {self.embedding_dim}, but loaded: {storage['embedding_dim']}"
+
+        if storage["data"]:
+            matrix = np.load(self.matrix_file, mmap_mode="c")
+        else:
+            # Zero-length data cannot be memory-mapped
+            matrix = np.empty((0, self.embedding_dim), dtype=np.float32)
+        if matrix.shape != (len(storage["data"]), self.embedding_dim):
+            raise ValueError(
+                f"Vector matrix {self.matrix_file} has shape {matrix.shape}, "
+                f"expected ({len(storage['data'])}, {self.embedding_dim})"
+            )
+        storage["matrix"] = matrix
+        return storage
+
+    def save(self):
+        storage = self._NanoVectorDB__storage
+        matrix = np.ascontiguousarray(storage["matrix"], dtype=np.float32)
+        meta = {k: v for k, v in storage.items() if k != "matrix"}
+
+        # Write the matrix before the metadata, each through an atomic rename so
+        # processes still mapping the previous file keep a consistent view
+        tmp_matrix_file = f"{self.matrix_file}.{os.getpid()}.tmp"
+        with open(tmp_matrix_file, "wb") as f:
+            np.save(f, matrix)
+        os.replace(tmp_matrix_file, self.matrix_file)
+
+        tmp_meta_file = f"{self.meta_file}.{os.getpid()}.tmp"
+        with open(tmp_meta_file, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_meta_file, self.meta_file)
+
+        # Legacy JSON database has been migrated to the binary files
+        if os.path.exists(self.storage_file):
+            os.remove(self.storage_file)
+
+    def upsert(self, datas: list[dict[str, Any]]):
+        self._rows = None
+        return super().upsert(datas)
+
+    def delete(self, ids: list[str]):
+        self._rows = None
+        return super().delete(ids)
+
+    def row_of(self, ids: list[str]) -> dict[str, int]:
+        """Map ids to their row in the vector matrix, missing ids are omitted"""
+        if self._rows is None:
+            self._rows = {
+                data["__id__"]: i
+                for i, data in enumerate(self._NanoVectorDB__storage["data"])
+            }
+        return {id: self._rows[id] for id in ids if id in self._rows}
+
+    def vectors(self) -> np.ndarray:
+        """The normalized float32 vector matrix, rows aligned with the data list"""
+        return self._NanoVectorDB__storage["matrix"]
+
+
 @final
 @dataclass
 class NanoVectorDBStorage(BaseVectorStorage):
@@ -29,6 +131,11 @@ class NanoVectorDBStorage(BaseVectorStorage):
         self._client = None
         self._storage_lock = None
         self.storage_updated = None
+        # Changes made since the last index_done_callback, published to other processes
+        self._pending_upserts: dict[str, dict[str, Any]] = {}
+        self._pending_deletes: set[str] = set()
+        # Version of the published changes already reflected in self._client
+        self._change_version = 0
 
         # Use global config value if specified, otherwise use default
         kwargs = self.global_config.get("vector_db_storage_cls_kwargs", {})
@@ -51,38 +158,102 @@ class NanoVectorDBStorage(BaseVectorStorage):
             workspace_dir = working_dir
 
         os.makedirs(workspace_dir, exist_ok=True)
+        # Legacy single-file JSON database, migrated to the binary files on save
         self._client_file_name = os.path.join(
             workspace_dir, f"vdb_{self.namespace}.json"
         )
+        self._matrix_file_name = os.path.join(
+            workspace_dir, f"vdb_{self.namespace}.npy"
+        )
+        self._meta_file_name = os.path.join(
+            workspace_dir, f"vdb_{self.namespace}.meta.json"
+        )
 
         self._max_batch_size = self.global_config["embedding_batch_num"]
 
-        self._client = NanoVectorDB(
+        self._client = self._create_client()
+
+    def _create_client(self) -> MmapNanoVectorDB:
+        """Load the vector database from disk (or create an empty one)"""
+        return MmapNanoVectorDB(
             self.embedding_func.embedding_dim,
             storage_file=self._client_file_name,
+            matrix_file=self._matrix_file_name,
+            meta_file=self._meta_file_name,
         )
 
     async def initialize(self):
         """Initialize storage data"""
         # Get the update flag for cross-process update notification
         self.storage_updated = await get_update_flag(self.final_namespace)
+        self._change_version = await get_change_version(self.final_namespace)
         # Get the storage lock for use in other methods
-        self._storage_lock = get_storage_lock(enable_logging=False)
+        self._storage_lock = get_namespace_lock(self.final_namespace)
+
+    def _record_upserts(self, list_data: list[dict[str, Any]]) -> None:
+        for d in list_data:
+            # Copy before NanoVectorDB.upsert normalizes and drops the vector
+            record = {**d, "__vector__": np.asarray(d["__vector__"], dtype=np.float32)}
+            self._pending_upserts[d["__id__"]] = record
+            self._pending_deletes.discard(d["__id__"])
+
+    def _record_deletes(self, ids: list[str]) -> None:
+        for id in ids:
+            self._pending_upserts.pop(id, None)
+            self._pending_deletes.add(id)
+
+    def _take_changes(self) -> dict[str, Any] | None:
+        """Return and reset the pending changes, None if too large to publish as a delta"""
+        changes = {
+            "upsert": list(self._pending_upserts.values()),
+            "delete": list(self._pending_deletes),
+        }
+        self._pending_upserts = {}
+        self._pending_deletes = set()
+        if len(changes["upsert"]) + len(changes["delete"]) > CHANGE_SET_MAX_KEYS:
+            return None
+        return changes
+
+    async def _reload(self) -> None:
+        """Reload the whole database from disk, discarding unsaved changes"""
+        self._change_version = await get_change_version(self.final_namespace)
+        self._client = self._create_client()
+        self._pending_upserts = {}
+        self._pending_deletes = set()
+
+    async def _sync_changes(self) -> None:
+        """Apply changes published by other processes, caller must hold the namespace write lock"""
+        latest, change_sets = await get_changes_since(
+            self.final_namespace, self._change_version
+        )
+        if change_sets is None:
+            logger.info(
+                f"[{self.workspace}] Process {os.getpid()} reloading {self.namespace} due to update by another process"
+            )
+            self._client = self._create_client()
+        else:
+            for changes in change_sets:
+                if changes["delete"]:
+                    self._client.delete(changes["delete"])
+                if changes["upsert"]:
+                    # Shallow copies, NanoVectorDB.upsert rewrites the records it is given
+                    self._client.upsert(datas=[dict(d) for d in changes["upsert"]])
+            logger.debug(
+                f"[{self.workspace}] Process {os.getpid()} applied {len(change_sets)} change sets to {self.namespace}"
+            )
+        self._change_version = latest
 
     async def _get_client(self):
-        """Check if the storage should be reloaded"""
-        # Acquire lock to prevent concurrent read and write
-        async with self._storage_lock:
-            # Check if data needs to be reloaded
+        """Check if the storage should be brought up to date with other processes"""
+        # Readers share the lock as long as there is nothing to apply
+        async with self._storage_lock.read():
+            if not self.storage_updated.value:
+                return self._client
+        # Applying changes of other processes needs exclusive access
+        async with self._storage_lock.write():
+            # Check if data was updated by another process
             if self.storage_updated.value:
-                logger.info(
-                    f"[{self.workspace}] Process {os.getpid()} reloading {self.namespace} due to update by another process"
-                )
-                # Reload data
-                self._client = NanoVectorDB(
-                    self.embedding_func.embedding_dim,
-                    storage_file=self._client_file_name,
-                )
+                await self._sync_changes()
                 # Reset update flag
                 self.storage_updated.value = False
 
@@ -121,13 +292,10 @@ class NanoVectorDBStorage(BaseVectorStorage):
         embeddings = np.concatenate(embeddings_list)
         if len(embeddings) == len(list_data):
             for i, d in enumerate(list_data):
-                # Compress vector using Float16 + zlib + Base64 for storage optimization
-                vector_f16 = embeddings[i].astype(np.float16)
-                compressed_vector = zlib.compress(vector_f16.tobytes())
-                encoded_vector = base64.b64encode(compressed_vector).decode("utf-8")
-                d["vector"] = encoded_vector
+                # Vectors are kept only in the float32 matrix file
                 d["__vector__"] = embeddings[i]
             client = await self._get_client()
+            self._record_upserts(list_data)
             results = client.upsert(datas=list_data)
             return results
         else:
@@ -185,6 +353,7 @@ class NanoVectorDBStorage(BaseVectorStorage):
         try:
             client = await self._get_client()
             client.delete(ids)
+            self._record_deletes(ids)
             logger.debug(
                 f"[{self.workspace}] Successfully deleted {len(ids)} vectors from {self.namespace}"
             )
@@ -211,6 +380,7 @@ class NanoVectorDBStorage(BaseVectorStorage):
             client = await self._get_client()
             if client.get([entity_id]):
                 client.delete([entity_id])
+                self._record_deletes([entity_id])
                 logger.debug(
                     f"[{self.workspace}] Successfully deleted entity {entity_name}"
                 )
@@ -245,6 +415,7 @@ class NanoVectorDBStorage(BaseVectorStorage):
             if ids_to_delete:
                 client = await self._get_client()
                 client.delete(ids_to_delete)
+                self._record_deletes(ids_to_delete)
                 logger.debug(
                     f"[{self.workspace}] Deleted {len(ids_to_delete)} relations for {entity_name}"
                 )
@@ -259,28 +430,27 @@ class NanoVectorDBStorage(BaseVectorStorage):
 
     async def index_done_callback(self) -> bool:
         """Save data to disk"""
-        async with self._storage_lock:
+        async with self._storage_lock.write():
             # Check if storage was updated by another process
             if self.storage_updated.value:
                 # Storage was updated by another process, reload data instead of saving
                 logger.warning(
                     f"[{self.workspace}] Storage for {self.namespace} was updated by another process, reloading..."
                 )
-                self._client = NanoVectorDB(
-                    self.embedding_func.embedding_dim,
-                    storage_file=self._client_file_name,
-                )
+                await self._reload()
                 # Reset update flag
                 self.storage_updated.value = False
                 return False  # Return error
 
         # Acquire lock and perform persistence
-        async with self._storage_lock:
+        async with self._storage_lock.write():
             try:
                 # Save data to disk
                 self._client.save()
-                # Notify other processes that data has been updated
-                await set_all_update_flags(self.final_namespace)
+                # Publish the changes so other processes can apply them without reloading
+                self._change_version = await publish_changes(
+                    self.final_namespace, self._take_changes()
+                )
                 # Reset own update flag to avoid self-reloading
                 self.storage_updated.value = False
                 return True  # Return success
@@ -349,19 +519,43 @@ class NanoVectorDBStorage(BaseVectorStorage):
             return {}
 
         client = await self._get_client()
-        results = client.get(ids)
+        rows = client.row_of(ids)
+        if not rows:
+            return {}
+
+        # Read the (normalized) vectors straight from the matrix rows
+        matrix = client.vectors()[list(rows.values())]
+        return {id: vector.tolist() for id, vector in zip(rows.keys(), matrix)}
+
+    async def score_by_ids(
+        self, query_vector: list[float], ids: list[str]
+    ) -> dict[str, float]:
+        """Get the cosine similarity between a query vector and the vectors of the given IDs
+
+        Scores the normalized float32 matrix rows in one matrix-vector product.
+
+        Args:
+            query_vector: The query embedding
+            ids: List of unique identifiers
 
-        vectors_dict = {}
-        for result in results:
-            if result and "vector" in result and "__id__" in result:
-                # Decompress vector data (Base64 + zlib + Float16 compressed)
-                decoded = base64.b64decode(result["vector"])
-                decompressed = zlib.decompress(decoded)
-                vector_f16 = np.frombuffer(decompressed, dtype=np.float16)
-                vector_f32 = vector_f16.astype(np.float32).tolist()
-                vectors_dict[result["__id__"]] = vector_f32
+        Returns:
+            Dictionary mapping IDs to their cosine similarity, IDs not found are omitted
+            Format: {id: score, ...}
+        """
+        if not ids:
+            return {}
 
-        return vectors_dict
+        client = await self._get_client()
+        rows = client.row_of(ids)
+        if not rows:
+            return {}
+
+        query = np.asarray(query_vector, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return dict.fromkeys(rows, 0.0)
+        scores = client.vectors()[list(rows.values())] @ (query / norm)
+        return dict(zip(rows.keys(), scores.tolist()))
 
     async def drop(self) -> dict[str, str]:
         """Drop all vector data from storage and clean up resources
@@ -380,23 +574,27 @@ class NanoVectorDBStorage(BaseVectorStorage):
             - On failure: {"status": "error", "message": "<error details>"}
         """
         try:
-            async with self._storage_lock:
-                # delete _client_file_name
-                if os.path.exists(self._client_file_name):
-                    os.remove(self._client_file_name)
-
-                self._client = NanoVectorDB(
-                    self.embedding_func.embedding_dim,
-                    storage_file=self._client_file_name,
-                )
-
-                # Notify other processes that data has been updated
-                await set_all_update_flags(self.final_namespace)
+            async with self._storage_lock.write():
+                # delete the binary files and any legacy JSON database
+                for file_name in (
+                    self._matrix_file_name,
+                    self._meta_file_name,
+                    self._client_file_name,
+                ):
+                    if os.path.exists(file_name):
+                        os.remove(file_name)
+
+                self._client = self._create_client()
+                self._pending_upserts = {}
+                self._pending_deletes = set()
+
+                # Notify other processes that data has been replaced, forcing a full reload
+                self._change_version = await publish_changes(self.final_namespace, None)
                 # Reset own update flag to avoid self-reloading
                 self.storage_updated.value = False
 
                 logger.info(
-                    f"[{self.workspace}] Process {os.getpid()} drop {self.namespace}(file:{self._client_file_name})"
+                    f"[{self.workspace}] Process {os.getpid()} drop {self.namespace}(file:{self._matrix_file_name})"
                 )
             return {"status": "success", "message": "data dropped"}
         except Exception as e:
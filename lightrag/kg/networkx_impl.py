@@ -1,6 +1,8 @@
 import os
+import json
+import pickle
 from dataclasses import dataclass
-from typing import final
+from typing import Any, final
 
 from lightrag.types import KnowledgeGraph, KnowledgeGraphNode, KnowledgeGraphEdge
 from lightrag.utils import logger
@@ -8,9 +10,12 @@ from lightrag.base import BaseGraphStorage
 from lightrag.constants import GRAPH_FIELD_SEP
 import networkx as nx
 from .shared_storage import (
-    get_storage_lock,
+    CHANGE_SET_MAX_KEYS,
+    get_change_version,
+    get_changes_since,
+    get_namespace_lock,
     get_update_flag,
-    set_all_update_flags,
+    publish_changes,
 )
 
 from dotenv import load_dotenv
@@ -20,6 +25,43 @@ from dotenv import load_dotenv
 # the OS environment variables take precedence over the .env file
 load_dotenv(dotenv_path=".env", override=False)
 
+# Change log is compacted into a new snapshot once it holds more operations than
+# this minimum and more operations than the graph has nodes + edges
+NETWORKX_COMPACT_MIN_OPS = 1000
+
+
+class _ChunkIndex:
+    """Inverted index from chunk id to the graph elements whose source_id lists it"""
+
+    def __init__(self):
+        self._index: dict[str, set] = {}
+
+    def add(self, key, source_id: str | None) -> None:
+        if not source_id:
+            return
+        for chunk_id in source_id.split(GRAPH_FIELD_SEP):
+            self._index.setdefault(chunk_id, set()).add(key)
+
+    def remove(self, key, source_id: str | None) -> None:
+        if not source_id:
+            return
+        for chunk_id in source_id.split(GRAPH_FIELD_SEP):
+            keys = self._index.get(chunk_id)
+            if keys is None:
+                continue
+            keys.discard(key)
+            if not keys:
+                del self._index[chunk_id]
+
+    def lookup(self, chunk_ids: list[str]) -> set:
+        result = set()
+        for chunk_id in chunk_ids:
+            result.update(self._index.get(chunk_id, ()))
+        return result
+
+    def clear(self) -> None:
+        self._index.clear()
+
 
 @final
 @dataclass
@@ -37,6 +79,23 @@ class NetworkXStorage(BaseGraphStorage):
         )
         nx.write_graphml(graph, file_name)
 
+    @staticmethod
+    def apply_change(graph: nx.Graph, change: dict[str, Any]) -> None:
+        """Apply one change log operation to a graph, replaying is idempotent"""
+        op = change["op"]
+        if op == "upsert_node":
+            graph.add_node(change["id"], **change["data"])
+        elif op == "upsert_edge":
+            graph.add_edge(change["src"], change["tgt"], **change["data"])
+        elif op == "delete_node":
+            if graph.has_node(change["id"]):
+                graph.remove_node(change["id"])
+        elif op == "delete_edge":
+            if graph.has_edge(change["src"], change["tgt"]):
+                graph.remove_edge(change["src"], change["tgt"])
+        else:
+            raise ValueError(f"Unknown graph change operation: {op}")
+
     def __post_init__(self):
         working_dir = self.global_config["working_dir"]
         if self.workspace:
@@ -50,45 +109,241 @@ class NetworkXStorage(BaseGraphStorage):
             self.workspace = "_"
 
         os.makedirs(workspace_dir, exist_ok=True)
+        # GraphML export, rewritten on compaction for external tools
         self._graphml_xml_file = os.path.join(
             workspace_dir, f"graph_{self.namespace}.graphml"
         )
+        # Binary snapshot plus append-only change log applied on top of it
+        self._snapshot_file = os.path.join(workspace_dir, f"graph_{self.namespace}.pkl")
+        self._changelog_file = os.path.join(
+            workspace_dir, f"graph_{self.namespace}.changes.jsonl"
+        )
         self._storage_lock = None
         self.storage_updated = None
         self._graph = None
+        # Chunk id -> node ids / edge keys, kept in step with every change to self._graph
+        self._node_chunk_index = _ChunkIndex()
+        self._edge_chunk_index = _ChunkIndex()
+        # Node id -> insertion rank, to return index lookups in graph iteration order
+        self._node_order: dict[str, int] = {}
+        self._next_node_order = 0
+        # Changes made since the last index_done_callback, not yet in the change log
+        self._pending_changes: list[dict[str, Any]] = []
+        # Snapshot generation the change log belongs to, and operations in the log
+        self._generation = 0
+        self._changelog_ops = 0
+        # Version of the published changes already reflected in self._graph
+        self._change_version = 0
 
         # Load initial graph
-        preloaded_graph = NetworkXStorage.load_nx_graph(self._graphml_xml_file)
-        if preloaded_graph is not None:
-            logger.info(
-                f"[{self.workspace}] Loaded graph from {self._graphml_xml_file} with {preloaded_graph.number_of_nodes()} nodes, {preloaded_graph.number_of_edges()} edges"
-            )
+        self._set_graph(self._load_graph())
+        logger.info(
+            f"[{self.workspace}] Loaded graph {self.namespace} with {self._graph.number_of_nodes()} nodes, {self._graph.number_of_edges()} edges"
+        )
+
+    def _load_graph(self) -> nx.Graph:
+        """Load the latest snapshot (or legacy GraphML file) and replay the change log"""
+        graph = None
+        generation = None
+        if os.path.exists(self._snapshot_file):
+            with open(self._snapshot_file, "rb") as f:
+                snapshot = pickle.load(f)
+            graph = snapshot["graph"]
+            generation = snapshot["generation"]
         else:
-            logger.info(
-                f"[{self.workspace}] Created new empty graph fiel: {self._graphml_xml_file}"
+            graph = NetworkXStorage.load_nx_graph(self._graphml_xml_file)
+        if graph is None:
+            graph = nx.Graph()
+
+        self._changelog_ops = 0
+        self._pending_changes = []
+        self._generation = generation or 0
+        if not os.path.exists(self._changelog_file):
+            return graph
+
+        with open(self._changelog_file, "r", encoding="utf-8") as f:
+            header = json.loads(f.readline() or "{}")
+            log_generation = header.get("generation", 0)
+            if generation is not None and log_generation != generation:
+                # Snapshot was written but the log was not reset yet, it is already included
+                return graph
+            self._generation = log_generation
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    change = json.loads(line)
+                except json.JSONDecodeError:
+                    # Incomplete trailing write, everything before it is valid
+                    logger.warning(
+                        f"[{self.workspace}] Ignoring truncated change log entry in {self._changelog_file}"
+                    )
+                    break
+                NetworkXStorage.apply_change(graph, change)
+                self._changelog_ops += 1
+        return graph
+
+    def _record_change(self, change: dict[str, Any]) -> None:
+        self._pending_changes.append(change)
+
+    @staticmethod
+    def _edge_key(source: str, target: str) -> tuple[str, str]:
+        # The graph is undirected, index each edge under one orientation
+        return (source, target) if source <= target else (target, source)
+
+    def _set_graph(self, graph: nx.Graph) -> None:
+        """Replace the in-memory graph and rebuild the chunk indexes from it"""
+        self._graph = graph
+        self._node_chunk_index.clear()
+        self._edge_chunk_index.clear()
+        self._node_order = {node_id: rank for rank, node_id in enumerate(graph)}
+        self._next_node_order = len(self._node_order)
+        for node_id, node_data in graph.nodes(data=True):
+            self._node_chunk_index.add(node_id, node_data.get("source_id"))
+        for u, v, edge_data in graph.edges(data=True):
+            self._edge_chunk_index.add(self._edge_key(u, v), edge_data.get("source_id"))
+
+    def _unindex_node(self, node_id: str) -> None:
+        """Drop a node and its incident edges from the chunk indexes"""
+        node_data = self._graph.nodes.get(node_id)
+        if node_data is None:
+            return
+        self._node_chunk_index.remove(node_id, node_data.get("source_id"))
+        for u, v, edge_data in self._graph.edges(node_id, data=True):
+            self._edge_chunk_index.remove(
+                self._edge_key(u, v), edge_data.get("source_id")
+            )
+
+    def _apply_change(self, change: dict[str, Any]) -> None:
+        """Apply one change log operation to self._graph and the chunk indexes"""
+        op = change["op"]
+        if op == "upsert_node":
+            node_id = change["id"]
+            self._node_chunk_index.remove(
+                node_id, (self._graph.nodes.get(node_id) or {}).get("source_id")
+            )
+        elif op == "delete_node":
+            self._unindex_node(change["id"])
+        elif op in ("upsert_edge", "delete_edge"):
+            key = self._edge_key(change["src"], change["tgt"])
+            self._edge_chunk_index.remove(
+                key, (self._graph.edges.get(key) or {}).get("source_id")
             )
-        self._graph = preloaded_graph or nx.Graph()
+        NetworkXStorage.apply_change(self._graph, change)
+        if op == "upsert_node":
+            self._rank_node(node_id)
+            self._node_chunk_index.add(
+                node_id, self._graph.nodes[node_id].get("source_id")
+            )
+        elif op == "upsert_edge":
+            # Missing endpoints are added by the edge, source first
+            self._rank_node(change["src"])
+            self._rank_node(change["tgt"])
+            self._edge_chunk_index.add(key, self._graph.edges[key].get("source_id"))
+        elif op == "delete_node":
+            self._node_order.pop(change["id"], None)
+
+    def _rank_node(self, node_id: str) -> None:
+        if node_id not in self._node_order:
+            self._node_order[node_id] = self._next_node_order
+            self._next_node_order += 1
+
+    def _append_changes(self) -> list[dict[str, Any]]:
+        """Append pending changes to the change log, cost proportional to the changes"""
+        changes = self._pending_changes
+        if not changes:
+            return changes
+        is_new = not os.path.exists(self._changelog_file)
+        with open(self._changelog_file, "a", encoding="utf-8") as f:
+            if is_new:
+                f.write(json.dumps({"generation": self._generation}) + "\n")
+            f.write(
+                "".join(
+                    json.dumps(change, ensure_ascii=False) + "\n"
+                    for change in self._pending_changes
+                )
+            )
+            f.flush()
+            os.fsync(f.fileno())
+        self._changelog_ops += len(self._pending_changes)
+        self._pending_changes = []
+        return changes
+
+    def _needs_compaction(self) -> bool:
+        if not os.path.exists(self._snapshot_file):
+            return True
+        graph_size = self._graph.number_of_nodes() + self._graph.number_of_edges()
+        return self._changelog_ops > max(NETWORKX_COMPACT_MIN_OPS, graph_size)
+
+    def _compact(self) -> None:
+        """Write a new binary snapshot (and GraphML export) and start an empty change log"""
+        generation = self._generation + 1
+        tmp_file = f"{self._snapshot_file}.{os.getpid()}.tmp"
+        with open(tmp_file, "wb") as f:
+            pickle.dump(
+                {"generation": generation, "graph": self._graph},
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(tmp_file, self._snapshot_file)
+
+        tmp_file = f"{self._changelog_file}.{os.getpid()}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"generation": generation}) + "\n")
+        os.replace(tmp_file, self._changelog_file)
+
+        self._generation = generation
+        self._changelog_ops = 0
+        NetworkXStorage.write_nx_graph(
+            self._graph, self._graphml_xml_file, self.workspace
+        )
 
     async def initialize(self):
         """Initialize storage data"""
         # Get the update flag for cross-process update notification
         self.storage_updated = await get_update_flag(self.final_namespace)
+        self._change_version = await get_change_version(self.final_namespace)
         # Get the storage lock for use in other methods
-        self._storage_lock = get_storage_lock()
+        self._storage_lock = get_namespace_lock(self.final_namespace)
+
+    async def _reload(self) -> None:
+        """Reload the graph from disk, discarding unsaved changes"""
+        self._change_version = await get_change_version(self.final_namespace)
+        self._set_graph(self._load_graph())
+
+    async def _sync_changes(self) -> None:
+        """Apply changes published by other processes, caller must hold the namespace write lock"""
+        latest, change_sets = await get_changes_since(
+            self.final_namespace, self._change_version
+        )
+        if change_sets is None:
+            logger.info(
+                f"[{self.workspace}] Process {os.getpid()} reloading graph {self._graphml_xml_file} due to modifications by another process"
+            )
+            self._set_graph(self._load_graph())
+        else:
+            for change_set in change_sets:
+                for change in change_set["changes"]:
+                    self._apply_change(change)
+                # Follow the writer's change log so compaction stays consistent
+                self._generation = change_set["generation"]
+                self._changelog_ops = change_set["changelog_ops"]
+            logger.debug(
+                f"[{self.workspace}] Process {os.getpid()} applied {len(change_sets)} change sets to graph {self.namespace}"
+            )
+        self._change_version = latest
 
     async def _get_graph(self):
-        """Check if the storage should be reloaded"""
-        # Acquire lock to prevent concurrent read and write
-        async with self._storage_lock:
-            # Check if data needs to be reloaded
+        """Check if the storage should be brought up to date with other processes"""
+        # Readers share the lock as long as there is nothing to apply
+        async with self._storage_lock.read():
+            if not self.storage_updated.value:
+                return self._graph
+        # Applying changes of other processes needs exclusive access
+        async with self._storage_lock.write():
+            # Check if data was updated by another process
             if self.storage_updated.value:
-                logger.info(
-                    f"[{self.workspace}] Process {os.getpid()} reloading graph {self._graphml_xml_file} due to modifications by another process"
-                )
-                # Reload data
-                self._graph = (
-                    NetworkXStorage.load_nx_graph(self._graphml_xml_file) or nx.Graph()
-                )
+                await self._sync_changes()
                 # Reset update flag
                 self.storage_updated.value = False
 
@@ -135,8 +390,10 @@ class NetworkXStorage(BaseGraphStorage):
         2. Only one process should updating the storage at a time before index_done_callback,
            KG-storage-log should be used to avoid data corruption
         """
-        graph = await self._get_graph()
-        graph.add_node(node_id, **node_data)
+        await self._get_graph()
+        change = {"op": "upsert_node", "id": node_id, "data": dict(node_data)}
+        self._apply_change(change)
+        self._record_change(change)
 
     async def upsert_edge(
         self, source_node_id: str, target_node_id: str, edge_data: dict[str, str]
@@ -147,8 +404,15 @@ class NetworkXStorage(BaseGraphStorage):
         2. Only one process should updating the storage at a time before index_done_callback,
            KG-storage-log should be used to avoid data corruption
         """
-        graph = await self._get_graph()
-        graph.add_edge(source_node_id, target_node_id, **edge_data)
+        await self._get_graph()
+        change = {
+            "op": "upsert_edge",
+            "src": source_node_id,
+            "tgt": target_node_id,
+            "data": dict(edge_data),
+        }
+        self._apply_change(change)
+        self._record_change(change)
 
     async def delete_node(self, node_id: str) -> None:
         """
@@ -159,7 +423,9 @@ class NetworkXStorage(BaseGraphStorage):
         """
         graph = await self._get_graph()
         if graph.has_node(node_id):
-            graph.remove_node(node_id)
+            change = {"op": "delete_node", "id": node_id}
+            self._apply_change(change)
+            self._record_change(change)
             logger.debug(f"[{self.workspace}] Node {node_id} deleted from the graph")
         else:
             logger.warning(
@@ -180,7 +446,9 @@ class NetworkXStorage(BaseGraphStorage):
         graph = await self._get_graph()
         for node in nodes:
             if graph.has_node(node):
-                graph.remove_node(node)
+                change = {"op": "delete_node", "id": node}
+                self._apply_change(change)
+                self._record_change(change)
 
     async def remove_edges(self, edges: list[tuple[str, str]]):
         """Delete multiple edges
@@ -196,7 +464,9 @@ class NetworkXStorage(BaseGraphStorage):
         graph = await self._get_graph()
         for source, target in edges:
             if graph.has_edge(source, target):
-                graph.remove_edge(source, target)
+                change = {"op": "delete_edge", "src": source, "tgt": target}
+                self._apply_change(change)
+                self._record_change(change)
 
     async def get_all_labels(self) -> list[str]:
         """
@@ -375,30 +645,34 @@ class NetworkXStorage(BaseGraphStorage):
         return result
 
     async def get_nodes_by_chunk_ids(self, chunk_ids: list[str]) -> list[dict]:
-        chunk_ids_set = set(chunk_ids)
         graph = await self._get_graph()
         matching_nodes = []
-        for node_id, node_data in graph.nodes(data=True):
-            if "source_id" in node_data:
-                node_source_ids = set(node_data["source_id"].split(GRAPH_FIELD_SEP))
-                if not node_source_ids.isdisjoint(chunk_ids_set):
-                    node_data_with_id = node_data.copy()
-                    node_data_with_id["id"] = node_id
-                    matching_nodes.append(node_data_with_id)
+        node_ids = self._node_chunk_index.lookup(chunk_ids)
+        for node_id in sorted(node_ids, key=self._node_order.__getitem__):
+            node_data_with_id = graph.nodes[node_id].copy()
+            node_data_with_id["id"] = node_id
+            matching_nodes.append(node_data_with_id)
         return matching_nodes
 
     async def get_edges_by_chunk_ids(self, chunk_ids: list[str]) -> list[dict]:
-        chunk_ids_set = set(chunk_ids)
         graph = await self._get_graph()
+        # Like graph.edges(), report each edge from the endpoint that comes first in
+        # the graph, and edges of one endpoint in its adjacency order
+        targets_by_source: dict[str, set[str]] = {}
+        for u, v in self._edge_chunk_index.lookup(chunk_ids):
+            if self._node_order[u] > self._node_order[v]:
+                u, v = v, u
+            targets_by_source.setdefault(u, set()).add(v)
         matching_edges = []
-        for u, v, edge_data in graph.edges(data=True):
-            if "source_id" in edge_data:
-                edge_source_ids = set(edge_data["source_id"].split(GRAPH_FIELD_SEP))
-                if not edge_source_ids.isdisjoint(chunk_ids_set):
-                    edge_data_with_nodes = edge_data.copy()
-                    edge_data_with_nodes["source"] = u
-                    edge_data_with_nodes["target"] = v
-                    matching_edges.append(edge_data_with_nodes)
+        for u in sorted(targets_by_source, key=self._node_order.__getitem__):
+            targets = targets_by_source[u]
+            for v in graph.adj[u]:
+                if v not in targets:
+                    continue
+                edge_data_with_nodes = graph.edges[u, v].copy()
+                edge_data_with_nodes["source"] = u
+                edge_data_with_nodes["target"] = v
+                matching_edges.append(edge_data_with_nodes)
         return matching_edges
 
     async def get_all_nodes(self) -> list[dict]:
@@ -432,29 +706,36 @@ class NetworkXStorage(BaseGraphStorage):
 
     async def index_done_callback(self) -> bool:
         """Save data to disk"""
-        async with self._storage_lock:
+        async with self._storage_lock.write():
             # Check if storage was updated by another process
             if self.storage_updated.value:
                 # Storage was updated by another process, reload data instead of saving
                 logger.info(
                     f"[{self.workspace}] Graph was updated by another process, reloading..."
                 )
-                self._graph = (
-                    NetworkXStorage.load_nx_graph(self._graphml_xml_file) or nx.Graph()
-                )
+                await self._reload()
                 # Reset update flag
                 self.storage_updated.value = False
                 return False  # Return error
 
         # Acquire lock and perform persistence
-        async with self._storage_lock:
+        async with self._storage_lock.write():
             try:
-                # Save data to disk
-                NetworkXStorage.write_nx_graph(
-                    self._graph, self._graphml_xml_file, self.workspace
+                # Append changes to the log, compact into a snapshot when it grows too long
+                changes = self._append_changes()
+                if self._needs_compaction():
+                    self._compact()
+                # Publish the changes so other processes can apply them without reloading
+                change_set = None
+                if len(changes) <= CHANGE_SET_MAX_KEYS:
+                    change_set = {
+                        "changes": changes,
+                        "generation": self._generation,
+                        "changelog_ops": self._changelog_ops,
+                    }
+                self._change_version = await publish_changes(
+                    self.final_namespace, change_set
                 )
-                # Notify other processes that data has been updated
-                await set_all_update_flags(self.final_namespace)
                 # Reset own update flag to avoid self-reloading
                 self.storage_updated.value = False
                 return True  # Return success
@@ -464,6 +745,18 @@ class NetworkXStorage(BaseGraphStorage):
 
         return True
 
+    async def finalize(self):
+        """Compact the change log on shutdown so the snapshot and GraphML export are current"""
+        if self._storage_lock is None:
+            return
+        async with self._storage_lock.write():
+            if self.storage_updated.value or self._changelog_ops == 0:
+                return
+            try:
+                self._compact()
+            except Exception as e:
+                logger.error(f"[{self.workspace}] Error compacting graph: {e}")
+
     async def drop(self) -> dict[str, str]:
         """Drop all graph data from storage and clean up resources
 
@@ -479,13 +772,20 @@ class NetworkXStorage(BaseGraphStorage):
             - On failure: {"status": "error", "message": "<error details>"}
         """
         try:
-            async with self._storage_lock:
-                # delete _client_file_name
-                if os.path.exists(self._graphml_xml_file):
-                    os.remove(self._graphml_xml_file)
-                self._graph = nx.Graph()
-                # Notify other processes that data has been updated
-                await set_all_update_flags(self.final_namespace)
+            async with self._storage_lock.write():
+                # delete snapshot, change log and GraphML export
+                for file_name in (
+                    self._snapshot_file,
+                    self._changelog_file,
+                    self._graphml_xml_file,
+                ):
+                    if os.path.exists(file_name):
+                        os.remove(file_name)
+                self._set_graph(nx.Graph())
+                self._pending_changes = []
+                self._changelog_ops = 0
+                # Notify other processes that data has been replaced, forcing a full reload
+                self._change_version = await publish_changes(self.final_namespace, None)
                 # Reset own update flag to avoid self-reloading
                 self.storage_updated.value = False
                 logger.info(
@@ -9,6 +9,7 @@ from typing import Any, Union, final
 import numpy as np
 import configparser
 import ssl
+import struct
 import itertools
 
 from lightrag.types import KnowledgeGraph, KnowledgeGraphNode, KnowledgeGraphEdge
@@ -49,6 +50,26 @@ from dotenv import load_dotenv
 load_dotenv(dotenv_path=".env", override=False)
 
 
+def _encode_vector(value: Any) -> bytes:
+    """Encode a vector into pgvector's binary wire format.
+
+    Layout: uint16 dimension, uint16 unused, then big-endian float32 values.
+    """
+    if isinstance(value, str):
+        # Accept the legacy '[x,y,...]' text form for backward compatibility
+        value = json.loads(value)
+    vector = np.asarray(value, dtype=">f4")
+    if vector.ndim != 1:
+        raise ValueError(f"Expected a 1-D vector, got shape {vector.shape}")
+    return struct.pack(">HH", vector.shape[0], 0) + vector.tobytes()
+
+
+def _decode_vector(data: bytes) -> list[float]:
+    """Decode pgvector's binary wire format into a list of floats."""
+    dim, _ = struct.unpack_from(">HH", data)
+    return np.frombuffer(data, dtype=">f4", count=dim, offset=4).tolist()
+
+
 class PostgreSQLDB:
     def __init__(self, config: dict[str, Any], **kwargs: Any):
         self.host = config["host"]
@@ -74,6 +95,9 @@ class PostgreSQLDB:
         self.hnsw_ef = config.get("hnsw_ef")
         self.ivfflat_lists = config.get("ivfflat_lists")
 
+        # Batch write configuration
+        self.upsert_batch_size = max(1, int(config.get("upsert_batch_size") or 500))
+
         if self.user is None or self.password is None or self.database is None:
             raise ValueError("Missing database user, password, or database")
 
@@ -158,6 +182,8 @@ class PostgreSQLDB:
                 "port": self.port,
                 "min_size": 1,
                 "max_size": self.max,
+                # Register the binary VECTOR codec on every new pooled connection
+                "init": self.configure_vector_codec,
             }
 
             # Add SSL configuration if provided
@@ -179,6 +205,10 @@ class PostgreSQLDB:
             async with self.pool.acquire() as connection:
                 await self.configure_vector_extension(connection)
 
+            # Connections opened before the extension existed have no VECTOR codec,
+            # recycle them so the pool init hook registers it
+            await self.pool.expire_connections()
+
             ssl_status = "with SSL" if connection_params.get("ssl") else "without SSL"
             logger.info(
                 f"PostgreSQL, Connected to database at {self.host}:{self.port}/{self.database} {ssl_status}"
@@ -199,6 +229,30 @@ class PostgreSQLDB:
             logger.warning(f"Could not create VECTOR extension: {e}")
             # Don't raise - let the system continue without vector extension
 
+    @staticmethod
+    async def configure_vector_codec(connection: asyncpg.Connection) -> None:
+        """Register a binary codec for the pgvector VECTOR type.
+
+        Vectors are then sent as bound float32 parameters instead of being
+        formatted into SQL text, so query statements stay constant and can be
+        reused from asyncpg's prepared statement cache.
+        """
+        schema = await connection.fetchval(  # type: ignore
+            """SELECT n.nspname FROM pg_type t
+               JOIN pg_namespace n ON n.oid = t.typnamespace
+               WHERE t.typname = 'vector' LIMIT 1"""
+        )
+        if schema is None:
+            # Extension not created yet, the connection is recycled after creation
+            return
+        await connection.set_type_codec(  # type: ignore
+            "vector",
+            schema=schema,
+            encoder=_encode_vector,
+            decoder=_decode_vector,
+            format="binary",
+        )
+
     @staticmethod
     async def configure_age_extension(connection: asyncpg.Connection) -> None:
         """Create AGE extension if it doesn't exist for graph operations."""
@@ -1288,6 +1342,38 @@ class PostgreSQLDB:
             logger.error(f"PostgreSQL database,\nsql:{sql},\ndata:{data},\nerror:{e}")
             raise
 
+    async def executemany(
+        self,
+        sql: str,
+        data: list[dict[str, Any]],
+        batch_size: int | None = None,
+    ) -> None:
+        """Execute one statement for many rows using pipelined batches.
+
+        Each batch is sent with asyncpg's executemany, which prepares the
+        statement once and streams all argument rows in a single round-trip
+        inside an implicit transaction.
+
+        Args:
+            sql: Parameterized statement executed for every row
+            data: Rows to bind, each dict's values must follow the $n order of sql
+            batch_size: Rows per round-trip, defaults to upsert_batch_size
+        """
+        if not data:
+            return
+
+        batch_size = batch_size or self.upsert_batch_size
+        rows = [tuple(row.values()) for row in data]
+        try:
+            async with self.pool.acquire() as connection:  # type: ignore
+                for i in range(0, len(rows), batch_size):
+                    await connection.executemany(sql, rows[i : i + batch_size])
+        except Exception as e:
+            logger.error(
+                f"PostgreSQL database,\nsql:{sql},\nrows:{len(rows)},\nerror:{e}"
+            )
+            raise
+
 
 class ClientManager:
     _instances: dict[str, Any] = {"db": None, "ref_count": 0}
@@ -1368,6 +1454,12 @@ class ClientManager:
                     config.get("postgres", "ivfflat_lists", fallback="100"),
                 )
             ),
+            "upsert_batch_size": int(
+                os.environ.get(
+                    "POSTGRES_UPSERT_BATCH_SIZE",
+                    config.get("postgres", "upsert_batch_size", fallback="500"),
+                )
+            ),
         }
 
     @classmethod
@@ -1726,12 +1818,12 @@ class PGKVStorage(BaseKVStorage):
         if not data:
             return
 
+        # Get current UTC time and convert to naive datetime for database storage
+        current_time = datetime.datetime.now(timezone.utc).replace(tzinfo=None)
         if is_namespace(self.namespace, NameSpace.KV_STORE_TEXT_CHUNKS):
-            # Get current UTC time and convert to naive datetime for database storage
-            current_time = datetime.datetime.now(timezone.utc).replace(tzinfo=None)
-            for k, v in data.items():
-                upsert_sql = SQL_TEMPLATES["upsert_text_chunk"]
-                _data = {
+            upsert_sql = SQL_TEMPLATES["upsert_text_chunk"]
+            rows = [
+                {
                     "workspace": self.workspace,
                     "id": k,
                     "tokens": v["tokens"],
@@ -1743,20 +1835,22 @@ class PGKVStorage(BaseKVStorage):
                     "create_time": current_time,
                     "update_time": current_time,
                 }
-                await self.db.execute(upsert_sql, _data)
+                for k, v in data.items()
+            ]
         elif is_namespace(self.namespace, NameSpace.KV_STORE_FULL_DOCS):
-            for k, v in data.items():
-                upsert_sql = SQL_TEMPLATES["upsert_doc_full"]
-                _data = {
+            upsert_sql = SQL_TEMPLATES["upsert_doc_full"]
+            rows = [
+                {
                     "id": k,
                     "content": v["content"],
                     "workspace": self.workspace,
                 }
-                await self.db.execute(upsert_sql, _data)
+                for k, v in data.items()
+            ]
         elif is_namespace(self.namespace, NameSpace.KV_STORE_LLM_RESPONSE_CACHE):
-            for k, v in data.items():
-                upsert_sql = SQL_TEMPLATES["upsert_llm_response_cache"]
-                _data = {
+            upsert_sql = SQL_TEMPLATES["upsert_llm_response_cache"]
+            rows = [
+                {
                     "workspace": self.workspace,
                     "id": k,  # Use flattened key as id
                     "original_prompt": v["original_prompt"],
@@ -1769,14 +1863,12 @@ class PGKVStorage(BaseKVStorage):
                     if v.get("queryparam")
                     else None,
                 }
-
-                await self.db.execute(upsert_sql, _data)
+                for k, v in data.items()
+            ]
         elif is_namespace(self.namespace, NameSpace.KV_STORE_FULL_ENTITIES):
-            # Get current UTC time and convert to naive datetime for database storage
-            current_time = datetime.datetime.now(timezone.utc).replace(tzinfo=None)
-            for k, v in data.items():
-                upsert_sql = SQL_TEMPLATES["upsert_full_entities"]
-                _data = {
+            upsert_sql = SQL_TEMPLATES["upsert_full_entities"]
+            rows = [
+                {
                     "workspace": self.workspace,
                     "id": k,
                     "entity_names": json.dumps(v["entity_names"]),
@@ -1784,13 +1876,12 @@ class PGKVStorage(BaseKVStorage):
                     "create_time": current_time,
                     "update_time": current_time,
                 }
-                await self.db.execute(upsert_sql, _data)
+                for k, v in data.items()
+            ]
         elif is_namespace(self.namespace, NameSpace.KV_STORE_FULL_RELATIONS):
-            # Get current UTC time and convert to naive datetime for database storage
-            current_time = datetime.datetime.now(timezone.utc).replace(tzinfo=None)
-            for k, v in data.items():
-                upsert_sql = SQL_TEMPLATES["upsert_full_relations"]
-                _data = {
+            upsert_sql = SQL_TEMPLATES["upsert_full_relations"]
+            rows = [
+                {
                     "workspace": self.workspace,
                     "id": k,
                     "relation_pairs": json.dumps(v["relation_pairs"]),
@@ -1798,7 +1889,16 @@ class PGKVStorage(BaseKVStorage):
                     "create_time": current_time,
                     "update_time": current_time,
                 }
-                await self.db.execute(upsert_sql, _data)
+                for k, v in data.items()
+            ]
+        else:
+            logger.error(
+                f"[{self.workspace}] Unknown namespace for upsert: {self.namespace}"
+            )
+            return
+
+        # One pipelined executemany per batch instead of a round-trip per row
+        await self.db.executemany(upsert_sql, rows)
 
     async def index_done_callback(self) -> None:
         # PG handles persistence automatically
@@ -1904,7 +2004,7 @@ class PGVectorStorage(BaseVectorStorage):
                 "chunk_order_index": item["chunk_order_index"],
                 "full_doc_id": item["full_doc_id"],
                 "content": item["content"],
-                "content_vector": json.dumps(item["__vector__"].tolist()),
+                "content_vector": item["__vector__"],
                 "file_path": item["file_path"],
                 "create_time": current_time,
                 "update_time": current_time,
@@ -1932,7 +2032,7 @@ class PGVectorStorage(BaseVectorStorage):
             "id": item["__id__"],
             "entity_name": item["entity_name"],
             "content": item["content"],
-            "content_vector": json.dumps(item["__vector__"].tolist()),
+            "content_vector": item["__vector__"],
             "chunk_ids": chunk_ids,
             "file_path": item.get("file_path", None),
             "create_time": current_time,
@@ -1956,7 +2056,7 @@ class PGVectorStorage(BaseVectorStorage):
             "source_id": item["src_id"],
             "target_id": item["tgt_id"],
             "content": item["content"],
-            "content_vector": json.dumps(item["__vector__"].tolist()),
+            "content_vector": item["__vector__"],
             "chunk_ids": chunk_ids,
             "file_path": item.get("file_path", None),
             "create_time": current_time,
@@ -1990,17 +2090,24 @@ class PGVectorStorage(BaseVectorStorage):
         embeddings = np.concatenate(embeddings_list)
         for i, d in enumerate(list_data):
             d["__vector__"] = embeddings[i]
+
+        if is_namespace(self.namespace, NameSpace.VECTOR_STORE_CHUNKS):
+            prepare = self._upsert_chunks
+        elif is_namespace(self.namespace, NameSpace.VECTOR_STORE_ENTITIES):
+            prepare = self._upsert_entities
+        elif is_namespace(self.namespace, NameSpace.VECTOR_STORE_RELATIONSHIPS):
+            prepare = self._upsert_relationships
+        else:
+            raise ValueError(f"{self.namespace} is not supported")
+
+        upsert_sql = None
+        rows = []
         for item in list_data:
-            if is_namespace(self.namespace, NameSpace.VECTOR_STORE_CHUNKS):
-                upsert_sql, data = self._upsert_chunks(item, current_time)
-            elif is_namespace(self.namespace, NameSpace.VECTOR_STORE_ENTITIES):
-                upsert_sql, data = self._upsert_entities(item, current_time)
-            elif is_namespace(self.namespace, NameSpace.VECTOR_STORE_RELATIONSHIPS):
-                upsert_sql, data = self._upsert_relationships(item, current_time)
-            else:
-                raise ValueError(f"{self.namespace} is not supported")
+            upsert_sql, row = prepare(item, current_time)
+            rows.append(row)
 
-            await self.db.execute(upsert_sql, data)
+        # One pipelined executemany per batch instead of a round-trip per row
+        await self.db.executemany(upsert_sql, rows)
 
     #################### query method ###############
     async def query(
@@ -2014,13 +2121,12 @@ class PGVectorStorage(BaseVectorStorage):
             )  # higher priority for query
             embedding = embeddings[0]
 
-        embedding_string = ",".join(map(str, embedding))
-
-        sql = SQL_TEMPLATES[self.namespace].format(embedding_string=embedding_string)
+        sql = SQL_TEMPLATES[self.namespace]
         params = {
             "workspace": self.workspace,
             "closer_than_threshold": 1 - self.cosine_better_than_threshold,
             "top_k": top_k,
+            "embedding": embedding,
         }
         results = await self.db.query(sql, params=list(params.values()), multirows=True)
         return results
@@ -2192,8 +2298,10 @@ class PGVectorStorage(BaseVectorStorage):
             for result in results:
                 if result and "content_vector" in result and "id" in result:
                     try:
-                        # Parse JSON string to get vector as list of floats
-                        vector_data = json.loads(result["content_vector"])
+                        # Binary codec yields a list of floats, text form needs parsing
+                        vector_data = result["content_vector"]
+                        if isinstance(vector_data, str):
+                            vector_data = json.loads(vector_data)
                         if isinstance(vector_data, list):
                             vectors_dict[result["id"]] = vector_data
                     except (json.JSONDecodeError, TypeError) as e:
@@ -2208,6 +2316,51 @@ class PGVectorStorage(BaseVectorStorage):
             )
             return {}
 
+    async def score_by_ids(
+        self, query_vector: list[float], ids: list[str]
+    ) -> dict[str, float]:
+        """Get the cosine similarity between a query vector and the vectors of the given IDs
+
+        The similarities are computed by pgvector, no vector leaves the database.
+
+        Args:
+            query_vector: The query embedding
+            ids: List of unique identifiers
+
+        Returns:
+            Dictionary mapping IDs to their cosine similarity, IDs not found are omitted
+            Format: {id: score, ...}
+        """
+        if not ids:
+            return {}
+
+        table_name = namespace_to_table_name(self.namespace)
+        if not table_name:
+            logger.error(
+                f"[{self.workspace}] Unknown namespace for vector scoring: {self.namespace}"
+            )
+            return {}
+
+        query = f"SELECT id, 1 - (content_vector <=> $2::vector) AS score FROM {table_name} WHERE workspace=$1 AND id = ANY($3)"
+        params = {
+            "workspace": self.workspace,
+            "embedding": [float(x) for x in query_vector],
+            "ids": list(ids),
+        }
+
+        try:
+            results = await self.db.query(query, list(params.values()), multirows=True)
+            return {
+                result["id"]: float(result["score"])
+                for result in results
+                if result["score"] is not None
+            }
+        except Exception as e:
+            logger.error(
+                f"[{self.workspace}] Error scoring vectors by IDs from {self.namespace}: {e}"
+            )
+            return {}
+
     async def drop(self) -> dict[str, str]:
         """Drop the storage"""
         async with get_storage_lock():
@@ -3216,6 +3369,43 @@ class PGGraphStorage(BaseGraphStorage):
 
         return edges
 
+    def _upsert_node_query(self, node_id: str, node_data: dict[str, str]) -> str:
+        label = self._normalize_node_id(node_id)
+        properties = self._format_properties(node_data)
+
+        return """SELECT * FROM cypher('%s', $$
+                     MERGE (n:base {entity_id: "%s"})
+                     SET n += %s
+                     RETURN n
+                   $$) AS (n agtype)""" % (
+            self.graph_name,
+            label,
+            properties,
+        )
+
+    def _upsert_edge_query(
+        self, source_node_id: str, target_node_id: str, edge_data: dict[str, str]
+    ) -> str:
+        src_label = self._normalize_node_id(source_node_id)
+        tgt_label = self._normalize_node_id(target_node_id)
+        edge_properties = self._format_properties(edge_data)
+
+        return """SELECT * FROM cypher('%s', $$
+                     MATCH (source:base {entity_id: "%s"})
+                     WITH source
+                     MATCH (target:base {entity_id: "%s"})
+                     MERGE (source)-[r:DIRECTED]-(target)
+                     SET r += %s
+                     SET r += %s
+                     RETURN r
+                   $$) AS (r agtype)""" % (
+            self.graph_name,
+            src_label,
+            tgt_label,
+            edge_properties,
+            edge_properties,  # https://github.com/HKUDS/LightRAG/issues/1438#issuecomment-2826000195
+        )
+
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=4, max=10),
@@ -3234,18 +3424,7 @@ class PGGraphStorage(BaseGraphStorage):
                 "PostgreSQL: node properties must contain an 'entity_id' field"
             )
 
-        label = self._normalize_node_id(node_id)
-        properties = self._format_properties(node_data)
-
-        query = """SELECT * FROM cypher('%s', $$
-                     MERGE (n:base {entity_id: "%s"})
-                     SET n += %s
-                     RETURN n
-                   $$) AS (n agtype)""" % (
-            self.graph_name,
-            label,
-            properties,
-        )
+        query = self._upsert_node_query(node_id, node_data)
 
         try:
             await self._query(query, readonly=False, upsert=True)
@@ -3272,25 +3451,7 @@ class PGGraphStorage(BaseGraphStorage):
             target_node_id (str): Label of the target node (used as identifier)
             edge_data (dict): dictionary of properties to set on the edge
         """
-        src_label = self._normalize_node_id(source_node_id)
-        tgt_label = self._normalize_node_id(target_node_id)
-        edge_properties = self._format_properties(edge_data)
-
-        query = """SELECT * FROM cypher('%s', $$
-                     MATCH (source:base {entity_id: "%s"})
-                     WITH source
-                     MATCH (target:base {entity_id: "%s"})
-                     MERGE (source)-[r:DIRECTED]-(target)
-                     SET r += %s
-                     SET r += %s
-                     RETURN r
-                   $$) AS (r agtype)""" % (
-            self.graph_name,
-            src_label,
-            tgt_label,
-            edge_properties,
-            edge_properties,  # https://github.com/HKUDS/LightRAG/issues/1438#issuecomment-2826000195
-        )
+        query = self._upsert_edge_query(source_node_id, target_node_id, edge_data)
 
         try:
             await self._query(query, readonly=False, upsert=True)
@@ -3301,6 +3462,69 @@ class PGGraphStorage(BaseGraphStorage):
             )
             raise
 
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=4, max=10),
+        retry=retry_if_exception_type((PGGraphQueryException,)),
+    )
+    async def upsert_nodes_batch(self, nodes: list[tuple[str, dict[str, str]]]) -> None:
+        """
+        Upsert multiple nodes, sending the MERGE statements of a batch in one round trip.
+
+        Args:
+            nodes: List of (node_id, node_data) tuples
+        """
+        for node_id, node_data in nodes:
+            if "entity_id" not in node_data:
+                raise ValueError(
+                    "PostgreSQL: node properties must contain an 'entity_id' field"
+                )
+
+        batch_size = self.db.upsert_batch_size
+        for i in range(0, len(nodes), batch_size):
+            # Statements sent together run in one implicit transaction
+            query = ";\n".join(
+                self._upsert_node_query(node_id, node_data)
+                for node_id, node_data in nodes[i : i + batch_size]
+            )
+            try:
+                await self._query(query, readonly=False, upsert=True)
+            except Exception:
+                logger.error(
+                    f"[{self.workspace}] POSTGRES, upsert_nodes_batch error on {len(nodes[i : i + batch_size])} nodes"
+                )
+                raise
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=4, max=10),
+        retry=retry_if_exception_type((PGGraphQueryException,)),
+    )
+    async def upsert_edges_batch(
+        self, edges: list[tuple[str, str, dict[str, str]]]
+    ) -> None:
+        """
+        Upsert multiple edges, sending the MERGE statements of a batch in one round trip.
+
+        Args:
+            edges: List of (source_node_id, target_node_id, edge_data) tuples
+        """
+        batch_size = self.db.upsert_batch_size
+        for i in range(0, len(edges), batch_size):
+            query = ";\n".join(
+                self._upsert_edge_query(source_node_id, target_node_id, edge_data)
+                for source_node_id, target_node_id, edge_data in edges[
+                    i : i + batch_size
+                ]
+            )
+            try:
+                await self._query(query, readonly=False, upsert=True)
+            except Exception:
+                logger.error(
+                    f"[{self.workspace}] POSTGRES, upsert_edges_batch error on {len(edges[i : i + batch_size])} edges"
+                )
+                raise
+
     async def delete_node(self, node_id: str) -> None:
         """
         Delete a node from the graph.
@@ -4568,8 +4792,8 @@ SQL_TEMPLATES = {
                             EXTRACT(EPOCH FROM r.create_time)::BIGINT AS created_at
                      FROM LIGHTRAG_VDB_RELATION r
                      WHERE r.workspace = $1
-                       AND r.content_vector <=> '[{embedding_string}]'::vector < $2
-                     ORDER BY r.content_vector <=> '[{embedding_string}]'::vector
+                       AND r.content_vector <=> $4::vector < $2
+                     ORDER BY r.content_vector <=> $4::vector
                      LIMIT $3;
                      """,
     "entities": """
@@ -4577,8 +4801,8 @@ SQL_TEMPLATES = {
                        EXTRACT(EPOCH FROM e.create_time)::BIGINT AS created_at
                 FROM LIGHTRAG_VDB_ENTITY e
                 WHERE e.workspace = $1
-                  AND e.content_vector <=> '[{embedding_string}]'::vector < $2
-                ORDER BY e.content_vector <=> '[{embedding_string}]'::vector
+                  AND e.content_vector <=> $4::vector < $2
+                ORDER BY e.content_vector <=> $4::vector
                 LIMIT $3;
                 """,
     "chunks": """
@@ -4588,8 +4812,8 @@ SQL_TEMPLATES = {
                      EXTRACT(EPOCH FROM c.create_time)::BIGINT AS created_at
               FROM LIGHTRAG_VDB_CHUNKS c
               WHERE c.workspace = $1
-                AND c.content_vector <=> '[{embedding_string}]'::vector < $2
-              ORDER BY c.content_vector <=> '[{embedding_string}]'::vector
+                AND c.content_vector <=> $4::vector < $2
+              ORDER BY c.content_vector <=> $4::vector
               LIMIT $3;
               """,
     # DROP tables
@@ -463,6 +463,52 @@ class QdrantVectorDBStorage(BaseVectorStorage):
             )
             return {}
 
+    async def score_by_ids(
+        self, query_vector: list[float], ids: list[str]
+    ) -> dict[str, float]:
+        """Get the cosine similarity between a query vector and the vectors of the given IDs
+
+        Runs a search restricted to the given points, so Qdrant computes the
+        similarities and no vector is transferred.
+
+        Args:
+            query_vector: The query embedding
+            ids: List of unique identifiers
+
+        Returns:
+            Dictionary mapping IDs to their cosine similarity, IDs not found are omitted
+            Format: {id: score, ...}
+        """
+        if not ids:
+            return {}
+
+        try:
+            # Convert to Qdrant compatible IDs
+            qdrant_ids = [compute_mdhash_id_for_qdrant(id) for id in ids]
+
+            results = self._client.search(
+                collection_name=self.final_namespace,
+                query_vector=list(query_vector),
+                query_filter=models.Filter(
+                    must=[models.HasIdCondition(has_id=qdrant_ids)]
+                ),
+                limit=len(qdrant_ids),
+                with_payload=["id"],
+                # Exact scores for every requested point
+                search_params=models.SearchParams(exact=True),
+            )
+
+            return {
+                point.payload["id"]: point.score
+                for point in results
+                if point.payload and point.payload.get("id")
+            }
+        except Exception as e:
+            logger.error(
+                f"[{self.workspace}] Error scoring vectors by IDs from {self.namespace}: {e}"
+            )
+            return {}
+
     async def drop(self) -> dict[str, str]:
         """Drop all vector data from storage and clean up resources
 
@@ -12,7 +12,12 @@ if not pm.is_installed("redis"):
 
 # aioredis is a depricated library, replaced with redis
 from redis.asyncio import Redis, ConnectionPool  # type: ignore
-from redis.exceptions import RedisError, ConnectionError, TimeoutError  # type: ignore
+from redis.exceptions import (  # type: ignore
+    RedisError,
+    ConnectionError,
+    TimeoutError,
+    WatchError,
+)
 from lightrag.utils import logger, get_pinyin_sort_key
 
 from lightrag.base import (
@@ -23,6 +28,7 @@ from lightrag.base import (
 )
 from ..kg.shared_storage import get_data_init_lock, get_storage_lock
 import json
+from datetime import datetime
 
 # Import tenacity for retry logic
 from tenacity import (
@@ -42,6 +48,11 @@ SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "30.0"))
 SOCKET_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", "10.0"))
 RETRY_ATTEMPTS = int(os.getenv("REDIS_RETRY_ATTEMPTS", "3"))
 
+# Doc status fields kept in sorted sets for pagination, other fields are sorted in memory
+DOC_STATUS_SORT_FIELDS = ("created_at", "updated_at", "id")
+# Version of the doc status index layout, indexes are rebuilt when it changes
+DOC_STATUS_INDEX_VERSION = "1"
+
 # Tenacity retry decorator for Redis operations
 redis_retry = retry(
     stop=stop_after_attempt(RETRY_ATTEMPTS),
@@ -617,6 +628,7 @@ class RedisDocStatusStorage(DocStatusStorage):
                     logger.info(
                         f"[{self.workspace}] Connected to Redis for doc status namespace {self.namespace}"
                     )
+                    await self._ensure_indexes(redis)
                     self._initialized = True
             except Exception as e:
                 logger.error(
@@ -680,6 +692,135 @@ class RedisDocStatusStorage(DocStatusStorage):
         """Ensure Redis resources are cleaned up when exiting context."""
         await self.close()
 
+    def _index_key(self, *parts: str) -> str:
+        """Key of a secondary index, outside the `{final_namespace}:` document keyspace"""
+        return ":".join((f"{self.final_namespace}#idx", *parts))
+
+    @staticmethod
+    def _sort_score(field: str, doc_data: dict[str, Any]) -> float:
+        if field == "id":
+            # Equal scores make the sorted set order members (doc ids) lexicographically
+            return 0
+        value = doc_data.get(field)
+        if not value:
+            return 0
+        try:
+            return datetime.fromisoformat(str(value)).timestamp()
+        except ValueError:
+            return 0
+
+    def _doc_index_entries(
+        self, doc_id: str, doc_data: dict[str, Any]
+    ) -> tuple[list[str], dict[str, float]]:
+        """Return the sets and sorted sets (with scores) a document belongs to"""
+        status = doc_data.get("status")
+        if isinstance(status, DocStatus):
+            status = status.value
+        sets = [self._index_key("status", str(status))]
+        if doc_data.get("track_id"):
+            sets.append(self._index_key("track", doc_data["track_id"]))
+        zsets = {}
+        for field in DOC_STATUS_SORT_FIELDS:
+            score = self._sort_score(field, doc_data)
+            zsets[self._index_key("sort", field)] = score
+            zsets[self._index_key("sort", field, str(status))] = score
+        return sets, zsets
+
+    def _queue_index_add(self, pipe, doc_id: str, doc_data: dict[str, Any]) -> None:
+        sets, zsets = self._doc_index_entries(doc_id, doc_data)
+        for key in sets:
+            pipe.sadd(key, doc_id)
+        for key, score in zsets.items():
+            pipe.zadd(key, {doc_id: score})
+
+    def _queue_index_remove(self, pipe, doc_id: str, doc_data: dict[str, Any]) -> None:
+        sets, zsets = self._doc_index_entries(doc_id, doc_data)
+        for key in sets:
+            pipe.srem(key, doc_id)
+        for key in zsets:
+            pipe.zrem(key, doc_id)
+
+    async def _delete_index_keys(self, redis) -> int:
+        deleted_count = 0
+        cursor = 0
+        while True:
+            cursor, keys = await redis.scan(
+                cursor, match=f"{self.final_namespace}#idx*", count=1000
+            )
+            if keys:
+                deleted_count += await redis.delete(*keys)
+            if cursor == 0:
+                break
+        return deleted_count
+
+    async def _ensure_indexes(self, redis) -> None:
+        """Build the secondary indexes once for data written before they existed"""
+        version_key = self._index_key("version")
+        if await redis.get(version_key) == DOC_STATUS_INDEX_VERSION:
+            return
+
+        await self._delete_index_keys(redis)
+        indexed_count = 0
+        cursor = 0
+        while True:
+            cursor, keys = await redis.scan(
+                cursor, match=f"{self.final_namespace}:*", count=1000
+            )
+            if keys:
+                values = await redis.mget(keys)
+                pipe = redis.pipeline(transaction=False)
+                for key, value in zip(keys, values):
+                    if not value:
+                        continue
+                    try:
+                        doc_data = json.loads(value)
+                    except json.JSONDecodeError:
+                        continue
+                    self._queue_index_add(pipe, key.split(":", 1)[1], doc_data)
+                    indexed_count += 1
+                await pipe.execute()
+            if cursor == 0:
+                break
+        await redis.set(version_key, DOC_STATUS_INDEX_VERSION)
+        logger.info(
+            f"[{self.workspace}] Built doc status indexes for {indexed_count} documents in {self.namespace}"
+        )
+
+    @staticmethod
+    def _to_doc_status(doc_data: dict[str, Any]) -> DocProcessingStatus:
+        # Make a copy of the data to avoid modifying the original
+        data = doc_data.copy()
+        # Remove deprecated content field if it exists
+        data.pop("content", None)
+        # If file_path is not in data, use document id as file path
+        if "file_path" not in data:
+            data["file_path"] = "no-file-path"
+        # Ensure new fields exist with default values
+        if "metadata" not in data:
+            data["metadata"] = {}
+        if "error_msg" not in data:
+            data["error_msg"] = None
+        return DocProcessingStatus(**data)
+
+    async def _get_doc_statuses(
+        self, redis, doc_ids: list[str]
+    ) -> list[tuple[str, DocProcessingStatus]]:
+        """Load documents by id, skipping missing or malformed entries"""
+        if not doc_ids:
+            return []
+        values = await redis.mget([f"{self.final_namespace}:{id}" for id in doc_ids])
+        result = []
+        for doc_id, value in zip(doc_ids, values):
+            if not value:
+                continue
+            try:
+                result.append((doc_id, self._to_doc_status(json.loads(value))))
+            except (json.JSONDecodeError, KeyError, TypeError) as e:
+                logger.error(
+                    f"[{self.workspace}] Error processing document {doc_id}: {e}"
+                )
+        return result
+
     async def filter_keys(self, keys: set[str]) -> set[str]:
         """Return keys that should be processed (not in storage or not successfully processed)"""
         async with self._get_redis_connection() as redis:
@@ -719,32 +860,11 @@ class RedisDocStatusStorage(DocStatusStorage):
         counts = {status.value: 0 for status in DocStatus}
         async with self._get_redis_connection() as redis:
             try:
-                # Use SCAN to iterate through all keys in the namespace
-                cursor = 0
-                while True:
-                    cursor, keys = await redis.scan(
-                        cursor, match=f"{self.final_namespace}:*", count=1000
-                    )
-                    if keys:
-                        # Get all values in batch
-                        pipe = redis.pipeline()
-                        for key in keys:
-                            pipe.get(key)
-                        values = await pipe.execute()
-
-                        # Count statuses
-                        for value in values:
-                            if value:
-                                try:
-                                    doc_data = json.loads(value)
-                                    status = doc_data.get("status")
-                                    if status in counts:
-                                        counts[status] += 1
-                                except json.JSONDecodeError:
-                                    continue
-
-                    if cursor == 0:
-                        break
+                pipe = redis.pipeline(transaction=False)
+                for status in counts:
+                    pipe.scard(self._index_key("status", status))
+                for status, count in zip(list(counts), await pipe.execute()):
+                    counts[status] = count
             except Exception as e:
                 logger.error(f"[{self.workspace}] Error getting status counts: {e}")
 
@@ -754,113 +874,25 @@ class RedisDocStatusStorage(DocStatusStorage):
         self, status: DocStatus
     ) -> dict[str, DocProcessingStatus]:
         """Get all documents with a specific status"""
-        result = {}
         async with self._get_redis_connection() as redis:
             try:
-                # Use SCAN to iterate through all keys in the namespace
-                cursor = 0
-                while True:
-                    cursor, keys = await redis.scan(
-                        cursor, match=f"{self.final_namespace}:*", count=1000
-                    )
-                    if keys:
-                        # Get all values in batch
-                        pipe = redis.pipeline()
-                        for key in keys:
-                            pipe.get(key)
-                        values = await pipe.execute()
-
-                        # Filter by status and create DocProcessingStatus objects
-                        for key, value in zip(keys, values):
-                            if value:
-                                try:
-                                    doc_data = json.loads(value)
-                                    if doc_data.get("status") == status.value:
-                                        # Extract document ID from key
-                                        doc_id = key.split(":", 1)[1]
-
-                                        # Make a copy of the data to avoid modifying the original
-                                        data = doc_data.copy()
-                                        # Remove deprecated content field if it exists
-                                        data.pop("content", None)
-                                        # If file_path is not in data, use document id as file path
-                                        if "file_path" not in data:
-                                            data["file_path"] = "no-file-path"
-                                        # Ensure new fields exist with default values
-                                        if "metadata" not in data:
-                                            data["metadata"] = {}
-                                        if "error_msg" not in data:
-                                            data["error_msg"] = None
-
-                                        result[doc_id] = DocProcessingStatus(**data)
-                                except (json.JSONDecodeError, KeyError) as e:
-                                    logger.error(
-                                        f"[{self.workspace}] Error processing document {key}: {e}"
-                                    )
-                                    continue
-
-                    if cursor == 0:
-                        break
+                doc_ids = await redis.smembers(self._index_key("status", status.value))
+                return dict(await self._get_doc_statuses(redis, list(doc_ids)))
             except Exception as e:
                 logger.error(f"[{self.workspace}] Error getting docs by status: {e}")
-
-        return result
+                return {}
 
     async def get_docs_by_track_id(
         self, track_id: str
     ) -> dict[str, DocProcessingStatus]:
         """Get all documents with a specific track_id"""
-        result = {}
         async with self._get_redis_connection() as redis:
             try:
-                # Use SCAN to iterate through all keys in the namespace
-                cursor = 0
-                while True:
-                    cursor, keys = await redis.scan(
-                        cursor, match=f"{self.final_namespace}:*", count=1000
-                    )
-                    if keys:
-                        # Get all values in batch
-                        pipe = redis.pipeline()
-                        for key in keys:
-                            pipe.get(key)
-                        values = await pipe.execute()
-
-                        # Filter by track_id and create DocProcessingStatus objects
-                        for key, value in zip(keys, values):
-                            if value:
-                                try:
-                                    doc_data = json.loads(value)
-                                    if doc_data.get("track_id") == track_id:
-                                        # Extract document ID from key
-                                        doc_id = key.split(":", 1)[1]
-
-                                        # Make a copy of the data to avoid modifying the original
-                                        data = doc_data.copy()
-                                        # Remove deprecated content field if it exists
-                                        data.pop("content", None)
-                                        # If file_path is not in data, use document id as file path
-                                        if "file_path" not in data:
-                                            data["file_path"] = "no-file-path"
-                                        # Ensure new fields exist with default values
-                                        if "metadata" not in data:
-                                            data["metadata"] = {}
-                                        if "error_msg" not in data:
-                                            data["error_msg"] = None
-
-                                        result[doc_id] = DocProcessingStatus(**data)
-                                except (json.JSONDecodeError, KeyError) as e:
-                                    logger.error(
-                                        f"[{self.workspace}] Error processing document {key}: {e}"
-                                    )
-                                    continue
-
-                    if cursor == 0:
-                        break
+                doc_ids = await redis.smembers(self._index_key("track", track_id))
+                return dict(await self._get_doc_statuses(redis, list(doc_ids)))
             except Exception as e:
                 logger.error(f"[{self.workspace}] Error getting docs by track_id: {e}")
-
-        return result
+                return {}
 
     async def index_done_callback(self) -> None:
         """Redis handles persistence automatically"""
@@ -882,10 +914,7 @@ class RedisDocStatusStorage(DocStatusStorage):
                     if "chunks_list" not in doc_data:
                         doc_data["chunks_list"] = []
 
-                pipe = redis.pipeline()
-                for k, v in data.items():
-                    pipe.set(f"{self.final_namespace}:{k}", json.dumps(v))
-                await pipe.execute()
+                await self._write_docs(redis, data)
             except json.JSONDecodeError as e:
                 logger.error(f"[{self.workspace}] JSON decode error during upsert: {e}")
                 raise
@@ -906,16 +935,50 @@ class RedisDocStatusStorage(DocStatusStorage):
             return
 
         async with self._get_redis_connection() as redis:
-            pipe = redis.pipeline()
-            for doc_id in doc_ids:
-                pipe.delete(f"{self.final_namespace}:{doc_id}")
-
-            results = await pipe.execute()
-            deleted_count = sum(results)
+            deleted_count = await self._write_docs(
+                redis, {doc_id: None for doc_id in doc_ids}
+            )
             logger.info(
                 f"[{self.workspace}] Deleted {deleted_count} of {len(doc_ids)} doc status entries from {self.namespace}"
             )
 
+    async def _write_docs(self, redis, data: dict[str, dict[str, Any] | None]) -> int:
+        """Set (or delete, for None values) documents together with their index entries
+
+        Old values are read under WATCH and the writes are applied in one MULTI/EXEC,
+        so the indexes always match the stored documents. Returns the number of
+        existing documents that were deleted.
+        """
+        doc_ids = list(data)
+        keys = [f"{self.final_namespace}:{doc_id}" for doc_id in doc_ids]
+        async with redis.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(*keys)
+                    old_values = await pipe.mget(keys)
+                    pipe.multi()
+                    deleted_count = 0
+                    for doc_id, key, old_value in zip(doc_ids, keys, old_values):
+                        if old_value:
+                            try:
+                                self._queue_index_remove(
+                                    pipe, doc_id, json.loads(old_value)
+                                )
+                            except json.JSONDecodeError:
+                                pass
+                        doc_data = data[doc_id]
+                        if doc_data is None:
+                            pipe.delete(key)
+                            deleted_count += 1 if old_value else 0
+                        else:
+                            pipe.set(key, json.dumps(doc_data))
+                            self._queue_index_add(pipe, doc_id, doc_data)
+                    await pipe.execute()
+                    return deleted_count
+                except WatchError:
+                    # A document changed between the read and the write, retry with fresh values
+                    continue
+
     async def get_docs_paginated(
         self,
         status_filter: DocStatus | None = None,
@@ -950,93 +1013,38 @@ class RedisDocStatusStorage(DocStatusStorage):
         if sort_direction.lower() not in ["asc", "desc"]:
             sort_direction = "desc"
 
-        # For Redis, we need to load all data and sort/filter in memory
-        all_docs = []
-        total_count = 0
+        start_idx = (page - 1) * page_size
+        end_idx = start_idx + page_size
+        reverse_sort = sort_direction.lower() == "desc"
+        status_parts = () if status_filter is None else (status_filter.value,)
 
         async with self._get_redis_connection() as redis:
             try:
-                # Use SCAN to iterate through all keys in the namespace
-                cursor = 0
-                while True:
-                    cursor, keys = await redis.scan(
-                        cursor, match=f"{self.final_namespace}:*", count=1000
+                if sort_field in DOC_STATUS_SORT_FIELDS:
+                    # Read only the requested page from the sorted set
+                    sort_key = self._index_key("sort", sort_field, *status_parts)
+                    total_count = await redis.zcard(sort_key)
+                    doc_ids = await redis.zrange(
+                        sort_key, start_idx, end_idx - 1, desc=reverse_sort
                     )
-                    if keys:
-                        # Get all values in batch
-                        pipe = redis.pipeline()
-                        for key in keys:
-                            pipe.get(key)
-                        values = await pipe.execute()
-
-                        # Process documents
-                        for key, value in zip(keys, values):
-                            if value:
-                                try:
-                                    doc_data = json.loads(value)
-
-                                    # Apply status filter
-                                    if (
-                                        status_filter is not None
-                                        and doc_data.get("status")
-                                        != status_filter.value
-                                    ):
-                                        continue
-
-                                    # Extract document ID from key
-                                    doc_id = key.split(":", 1)[1]
-
-                                    # Prepare document data
-                                    data = doc_data.copy()
-                                    data.pop("content", None)
-                                    if "file_path" not in data:
-                                        data["file_path"] = "no-file-path"
-                                    if "metadata" not in data:
-                                        data["metadata"] = {}
-                                    if "error_msg" not in data:
-                                        data["error_msg"] = None
-
-                                    # Calculate sort key for sorting (but don't add to data)
-                                    if sort_field == "id":
-                                        sort_key = doc_id
-                                    elif sort_field == "file_path":
-                                        # Use pinyin sorting for file_path field to support Chinese characters
-                                        file_path_value = data.get(sort_field, "")
-                                        sort_key = get_pinyin_sort_key(file_path_value)
-                                    else:
-                                        sort_key = data.get(sort_field, "")
-
-                                    doc_status = DocProcessingStatus(**data)
-                                    all_docs.append((doc_id, doc_status, sort_key))
-
-                                except (json.JSONDecodeError, KeyError) as e:
-                                    logger.error(
-                                        f"[{self.workspace}] Error processing document {key}: {e}"
-                                    )
-                                    continue
-
-                    if cursor == 0:
-                        break
-
+                    return await self._get_doc_statuses(redis, doc_ids), total_count
+
+                # file_path uses pinyin ordering, sort the matching documents in memory
+                if status_filter is None:
+                    doc_ids = await redis.zrange(self._index_key("sort", "id"), 0, -1)
+                else:
+                    doc_ids = await redis.smembers(
+                        self._index_key("status", status_filter.value)
+                    )
+                all_docs = await self._get_doc_statuses(redis, list(doc_ids))
             except Exception as e:
                 logger.error(f"[{self.workspace}] Error getting paginated docs: {e}")
                 return [], 0
 
-        # Sort documents using the separate sort key
-        reverse_sort = sort_direction.lower() == "desc"
-        all_docs.sort(key=lambda x: x[2], reverse=reverse_sort)
-
-        # Remove sort key from tuples and keep only (doc_id, doc_status)
-        all_docs = [(doc_id, doc_status) for doc_id, doc_status, _ in all_docs]
-
-        total_count = len(all_docs)
-
-        # Apply pagination
-        start_idx = (page - 1) * page_size
-        end_idx = start_idx + page_size
-        paginated_docs = all_docs[start_idx:end_idx]
-
-        return paginated_docs, total_count
+        all_docs.sort(
+            key=lambda x: get_pinyin_sort_key(x[1].file_path), reverse=reverse_sort
+        )
+        return all_docs[start_idx:end_idx], len(all_docs)
 
     async def get_all_status_counts(self) -> dict[str, int]:
         """Get counts of documents in each status for all documents
@@ -1077,6 +1085,11 @@ class RedisDocStatusStorage(DocStatusStorage):
                         if cursor == 0:
                             break
 
+                    deleted_count += await self._delete_index_keys(redis)
+                    await redis.set(
+                        self._index_key("version"), DOC_STATUS_INDEX_VERSION
+                    )
+
                     logger.info(
                         f"[{self.workspace}] Dropped {deleted_count} doc status keys from {self.namespace}"
                     )
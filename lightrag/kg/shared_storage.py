@@ -6,7 +6,8 @@ from multiprocessing.synchronize import Lock as ProcessLock
 from multiprocessing import Manager
 import time
 import logging
-from typing import Any, Dict, List, Optional, Union, TypeVar, Generic
+import pickle
+from typing import Any, Callable, Dict, List, Optional, Union, TypeVar, Generic
 
 from lightrag.exceptions import PipelineNotInitializedError
 
@@ -78,6 +79,41 @@ _initialized = None
 _shared_dicts: Optional[Dict[str, Any]] = None
 _init_flags: Optional[Dict[str, bool]] = None  # namespace -> initialized
 _update_flags: Optional[Dict[str, bool]] = None  # namespace -> updated
+# namespace -> latest published change version
+_change_versions: Optional[Dict[str, int]] = None
+# namespace -> list of (version, changes) for the most recent change sets
+_change_feeds: Optional[Dict[str, list]] = None
+# namespace -> pickled size of each change set in its feed, in feed order
+_change_feed_sizes: Optional[Dict[str, list]] = None
+
+# Number of change sets kept per namespace; workers lagging further behind reload fully
+CHANGE_FEED_MAX_ENTRIES = 32
+# Total pickled size of the change sets kept per namespace
+CHANGE_FEED_MAX_BYTES = 64 * 1024 * 1024
+# Change sets touching more keys are published as full-reload markers instead
+CHANGE_SET_MAX_KEYS = 20000
+
+# Shared memory copy of the change versions, so workers can check for changes
+# without a round trip to the manager process, and namespace -> slot in it
+_change_version_slots = None
+_change_version_slot_index: Optional[Dict[str, int]] = None
+# Namespaces beyond this read their change version from the manager instead
+CHANGE_VERSION_SLOTS = 1024
+# Whether JSON storages keep a local replica per worker instead of reading the
+# manager-proxied dict (JSON_STORAGE_REPLICA, multi-process mode only)
+_use_replicas = False
+
+# Reader count and writer pid of every namespace lock, in shared memory so readers
+# in different workers share the lock (multi-process mode only)
+_namespace_lock_states = None
+_namespace_lock_slot_index: Optional[Dict[str, int]] = None
+# Maximum number of namespaces with a cross-process reader/writer lock
+NAMESPACE_LOCK_SLOTS = 1024
+# Backoff bounds (seconds) when waiting for a namespace lock held by another process
+NAMESPACE_LOCK_POLL_MIN = 0.001
+NAMESPACE_LOCK_POLL_MAX = 0.05
+# Process local reader/writer locks by namespace
+_namespace_locks: Optional[Dict[str, "NamespaceLock"]] = None
 
 # locks for mutex access
 _storage_lock: Optional[LockType] = None
@@ -825,6 +861,206 @@ class _KeyedLockContext:
         self._ul = None
 
 
+class NamespaceLock:
+    """
+    Reader/writer lock scoped to one storage namespace.
+
+    Readers share the lock while writers (including reloads of the in-memory data)
+    get exclusive access; waiting writers block new readers so they are not starved.
+    Coroutines of one process coordinate through asyncio primitives. In multi-process
+    mode the reader count and writer of the namespace are additionally kept in shared
+    memory, so readers in different workers proceed concurrently; waiting on another
+    process polls with a short backoff instead of blocking the event loop.
+    """
+
+    def __init__(self, namespace: str):
+        self.namespace = namespace
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+        self._cond = asyncio.Condition()
+        # Shared memory slot, resolved on first cross-process acquisition
+        self._slot: Optional[int] = None
+        self._fallback_lock: Optional[UnifiedLock] = None
+        self._metrics = {
+            "read_acquired": 0,
+            "write_acquired": 0,
+            "read_wait_seconds": 0.0,
+            "write_wait_seconds": 0.0,
+            "max_read_wait_seconds": 0.0,
+            "max_write_wait_seconds": 0.0,
+        }
+
+    def read(self, enable_logging: bool = False) -> "_NamespaceLockContext":
+        return _NamespaceLockContext(self, write=False, enable_logging=enable_logging)
+
+    def write(self, enable_logging: bool = False) -> "_NamespaceLockContext":
+        return _NamespaceLockContext(self, write=True, enable_logging=enable_logging)
+
+    async def acquire_read(self) -> None:
+        started = time.perf_counter()
+        async with self._cond:
+            await self._cond.wait_for(
+                lambda: not self._writer and not self._waiting_writers
+            )
+            self._readers += 1
+        try:
+            await self._acquire_shared(write=False)
+        except BaseException:
+            await self._release_local(write=False)
+            raise
+        self._record_wait("read", time.perf_counter() - started)
+
+    async def release_read(self) -> None:
+        await self._release_shared(write=False)
+        await self._release_local(write=False)
+
+    async def acquire_write(self) -> None:
+        started = time.perf_counter()
+        async with self._cond:
+            self._waiting_writers += 1
+            try:
+                await self._cond.wait_for(
+                    lambda: not self._writer and not self._readers
+                )
+            finally:
+                self._waiting_writers -= 1
+            self._writer = True
+        try:
+            await self._acquire_shared(write=True)
+        except BaseException:
+            await self._release_local(write=True)
+            raise
+        self._record_wait("write", time.perf_counter() - started)
+
+    async def release_write(self) -> None:
+        await self._release_shared(write=True)
+        await self._release_local(write=True)
+
+    async def _release_local(self, write: bool) -> None:
+        async with self._cond:
+            if write:
+                self._writer = False
+            else:
+                self._readers -= 1
+            self._cond.notify_all()
+
+    def _record_wait(self, mode: str, waited: float) -> None:
+        self._metrics[f"{mode}_acquired"] += 1
+        self._metrics[f"{mode}_wait_seconds"] += waited
+        if waited > self._metrics[f"max_{mode}_wait_seconds"]:
+            self._metrics[f"max_{mode}_wait_seconds"] = waited
+
+    def get_metrics(self) -> Dict[str, Any]:
+        metrics = dict(self._metrics)
+        metrics["readers"] = self._readers
+        metrics["writer"] = self._writer
+        metrics["waiting_writers"] = self._waiting_writers
+        return metrics
+
+    async def _get_slot(self) -> Optional[int]:
+        if self._slot is None and self._fallback_lock is None:
+            async with get_internal_lock():
+                slot = _namespace_lock_slot_index.get(self.namespace)
+                if (
+                    slot is None
+                    and len(_namespace_lock_slot_index) < NAMESPACE_LOCK_SLOTS
+                ):
+                    slot = len(_namespace_lock_slot_index)
+                    _namespace_lock_slot_index[self.namespace] = slot
+            if slot is None:
+                direct_log(
+                    f"Process {os.getpid()} no lock slot left for namespace: [{self.namespace}], using the storage lock",
+                    level="WARNING",
+                )
+                self._fallback_lock = get_storage_lock()
+            else:
+                self._slot = slot
+        return self._slot
+
+    async def _acquire_shared(self, write: bool) -> None:
+        """Acquire the cross-process part of the lock, no-op in single-process mode"""
+        if not _is_multiprocess:
+            return
+        slot = await self._get_slot()
+        if slot is None:
+            # Out of slots: readers and writers all take the exclusive storage lock
+            await self._fallback_lock.__aenter__()
+            return
+
+        states = _namespace_lock_states
+        readers, writer = 2 * slot, 2 * slot + 1
+        delay = NAMESPACE_LOCK_POLL_MIN
+        # Claim the writer flag (or a reader share) as soon as no writer holds it
+        while True:
+            with states.get_lock():
+                if states[writer] == 0:
+                    if write:
+                        states[writer] = os.getpid()
+                    else:
+                        states[readers] += 1
+                    break
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, NAMESPACE_LOCK_POLL_MAX)
+        if not write:
+            return
+        # New readers are held off by the writer flag, wait for current ones to leave
+        try:
+            delay = NAMESPACE_LOCK_POLL_MIN
+            while True:
+                with states.get_lock():
+                    if states[readers] == 0:
+                        return
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, NAMESPACE_LOCK_POLL_MAX)
+        except BaseException:
+            with states.get_lock():
+                states[writer] = 0
+            raise
+
+    async def _release_shared(self, write: bool) -> None:
+        if not _is_multiprocess:
+            return
+        if self._slot is None:
+            await self._fallback_lock.__aexit__(None, None, None)
+            return
+        states = _namespace_lock_states
+        with states.get_lock():
+            if write:
+                states[2 * self._slot + 1] = 0
+            else:
+                states[2 * self._slot] -= 1
+
+
+class _NamespaceLockContext:
+    def __init__(self, parent: NamespaceLock, write: bool, enable_logging: bool):
+        self._parent = parent
+        self._write = write
+        self._mode = "write" if write else "read"
+        self._enable_logging = enable_logging
+
+    async def __aenter__(self) -> NamespaceLock:
+        if self._write:
+            await self._parent.acquire_write()
+        else:
+            await self._parent.acquire_read()
+        direct_log(
+            f"== Lock == Process {os.getpid()}: Namespace lock '{self._parent.namespace}' acquired ({self._mode})",
+            enable_output=self._enable_logging,
+        )
+        return self._parent
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if self._write:
+            await self._parent.release_write()
+        else:
+            await self._parent.release_read()
+        direct_log(
+            f"== Lock == Process {os.getpid()}: Namespace lock '{self._parent.namespace}' released ({self._mode})",
+            enable_output=self._enable_logging,
+        )
+
+
 def get_internal_lock(enable_logging: bool = False) -> UnifiedLock:
     """return unified storage lock for data consistency"""
     async_lock = _async_locks.get("internal_lock") if _is_multiprocess else None
@@ -885,6 +1121,30 @@ def get_storage_keyed_lock(
     return _storage_keyed_lock(namespace, keys, enable_logging=enable_logging)
 
 
+def get_namespace_lock(namespace: str) -> NamespaceLock:
+    """
+    Return the reader/writer lock guarding the in-memory data of a storage namespace.
+
+    Use `async with lock.read()` for reads and `async with lock.write()` for writes
+    and reloads. Locks of different namespaces are independent.
+    """
+    if _namespace_locks is None:
+        raise RuntimeError("Shared-Data is not initialized")
+    lock = _namespace_locks.get(namespace)
+    if lock is None:
+        lock = _namespace_locks[namespace] = NamespaceLock(namespace)
+    return lock
+
+
+def get_namespace_lock_metrics() -> Dict[str, Dict[str, Any]]:
+    """Return the lock-wait metrics of the namespace locks used by this process"""
+    if _namespace_locks is None:
+        return {}
+    return {
+        namespace: lock.get_metrics() for namespace, lock in _namespace_locks.items()
+    }
+
+
 def get_data_init_lock(enable_logging: bool = False) -> UnifiedLock:
     """return unified data initialization lock for ensuring atomic data initialization"""
     async_lock = _async_locks.get("data_init_lock") if _is_multiprocess else None
@@ -987,6 +1247,15 @@ def initialize_share_data(workers: int = 1):
         _init_flags, \
         _initialized, \
         _update_flags, \
+        _change_versions, \
+        _change_feeds, \
+        _change_feed_sizes, \
+        _change_version_slots, \
+        _change_version_slot_index, \
+        _use_replicas, \
+        _namespace_lock_states, \
+        _namespace_lock_slot_index, \
+        _namespace_locks, \
         _async_locks, \
         _storage_keyed_lock, \
         _earliest_mp_cleanup_time, \
@@ -1016,6 +1285,22 @@ def initialize_share_data(workers: int = 1):
         _shared_dicts = _manager.dict()
         _init_flags = _manager.dict()
         _update_flags = _manager.dict()
+        _change_versions = _manager.dict()
+        _change_feeds = _manager.dict()
+        _change_feed_sizes = _manager.dict()
+        # Raw shared memory inherited by the forked workers, reads need no locking
+        _change_version_slots = mp.Array("q", CHANGE_VERSION_SLOTS, lock=False)
+        _change_version_slot_index = _manager.dict()
+        _use_replicas = os.getenv("JSON_STORAGE_REPLICA", "false").lower() in (
+            "true",
+            "1",
+            "yes",
+            "t",
+            "on",
+        )
+        # Guarded by its own process-shared lock, acquired only for a few operations
+        _namespace_lock_states = mp.Array("q", 2 * NAMESPACE_LOCK_SLOTS)
+        _namespace_lock_slot_index = _manager.dict()
 
         _storage_keyed_lock = KeyedUnifiedLock()
 
@@ -1041,11 +1326,21 @@ def initialize_share_data(workers: int = 1):
         _shared_dicts = {}
         _init_flags = {}
         _update_flags = {}
+        _change_versions = {}
+        _change_feeds = {}
+        _change_feed_sizes = {}
+        _change_version_slots = None
+        _change_version_slot_index = None
+        _use_replicas = False
+        _namespace_lock_states = None
+        _namespace_lock_slot_index = None
         _async_locks = None  # No need for async locks in single process mode
 
         _storage_keyed_lock = KeyedUnifiedLock()
         direct_log(f"Process {os.getpid()} Shared-Data created for Single Process")
 
+    _namespace_locks = {}
+
     # Initialize multiprocess cleanup times
     _earliest_mp_cleanup_time = None
     _last_mp_cleanup_time = None
@@ -1146,6 +1441,249 @@ async def clear_all_update_flags(namespace: str):
             _update_flags[namespace][i].value = False
 
 
+async def get_change_version(namespace: str) -> int:
+    """Return the latest change version published for namespace (0 if none)"""
+    if _change_versions is None:
+        raise ValueError("Try to read change version before Shared-Data is initialized")
+
+    async with get_internal_lock():
+        return _change_versions.get(namespace, 0)
+
+
+async def publish_changes(namespace: str, changes: Any) -> int:
+    """
+    Publish a change set for namespace and flag every worker as updated.
+
+    Workers holding the previous version can apply the change set instead of
+    reloading the whole namespace from files. Passing None as changes records a
+    change that can not be expressed as a delta (e.g. drop), forcing a full reload.
+    In single-process mode no other worker reads the feed, only the version is kept.
+
+    Returns:
+        int: The version assigned to the change set
+    """
+    if _change_versions is None or _change_feeds is None:
+        raise ValueError("Try to publish changes before Shared-Data is initialized")
+
+    size = 0
+    if _is_multiprocess and changes is not None:
+        size = len(pickle.dumps(changes, protocol=pickle.HIGHEST_PROTOCOL))
+        if size > CHANGE_FEED_MAX_BYTES:
+            # Too large to keep, workers reload from files instead
+            changes, size = None, 0
+
+    async with get_internal_lock():
+        version = _change_versions.get(namespace, 0) + 1
+        _change_versions[namespace] = version
+        if _is_multiprocess and _manager is not None:
+            if namespace not in _change_feeds:
+                _change_feeds[namespace] = _manager.list()
+                _change_feed_sizes[namespace] = _manager.list()
+            feed = _change_feeds[namespace]
+            sizes = _change_feed_sizes[namespace]
+            feed.append((version, changes))
+            sizes.append(size)
+            # One round trip to the manager, then trim the oldest change sets at once
+            kept = sizes[:]
+            total = sum(kept)
+            trim = 0
+            while len(kept) - trim > 1 and (
+                len(kept) - trim > CHANGE_FEED_MAX_ENTRIES
+                or total > CHANGE_FEED_MAX_BYTES
+            ):
+                total -= kept[trim]
+                trim += 1
+            if trim:
+                del feed[:trim]
+                del sizes[:trim]
+        # Updated after the feed so a worker seeing the new version finds its change set
+        if _change_version_slot_index is not None:
+            slot = _change_version_slot_index.get(namespace)
+            if slot is not None:
+                _change_version_slots[slot] = version
+
+    await set_all_update_flags(namespace)
+    return version
+
+
+async def get_change_version_reader(namespace: str) -> Callable[[], int]:
+    """
+    Return a function reading the latest change version of namespace cheaply.
+
+    In multi-process mode the version is read from shared memory, without a round
+    trip to the manager process, so it can be checked on every read.
+    """
+    if _change_versions is None:
+        raise ValueError("Try to read change version before Shared-Data is initialized")
+
+    if _change_version_slot_index is None:
+        # Single process: the versions are a plain local dict
+        return lambda: _change_versions.get(namespace, 0)
+
+    async with get_internal_lock():
+        slot = _change_version_slot_index.get(namespace)
+        if slot is None and len(_change_version_slot_index) < CHANGE_VERSION_SLOTS:
+            slot = len(_change_version_slot_index)
+            _change_version_slot_index[namespace] = slot
+            _change_version_slots[slot] = _change_versions.get(namespace, 0)
+
+    if slot is None:
+        direct_log(
+            f"Process {os.getpid()} no change version slot left for namespace: [{namespace}]",
+            level="WARNING",
+        )
+        return lambda: _change_versions.get(namespace, 0)
+    slots = _change_version_slots
+    return lambda: slots[slot]
+
+
+async def get_changes_since(namespace: str, version: int) -> tuple[int, Optional[list]]:
+    """
+    Get the change sets published for namespace after version.
+
+    Returns:
+        tuple: (latest_version, change_sets). change_sets is None when the feed no
+        longer covers version or contains a change that can not be applied as a
+        delta; the caller must then reload the namespace from files.
+    """
+    if _change_versions is None or _change_feeds is None:
+        raise ValueError("Try to read changes before Shared-Data is initialized")
+
+    async with get_internal_lock():
+        latest = _change_versions.get(namespace, 0)
+        if latest <= version:
+            return latest, []
+        entries = list(_change_feeds.get(namespace, []))
+
+    pending = [(v, changes) for v, changes in entries if v > version]
+    # A gap means some change sets were trimmed before this worker applied them
+    if not pending or pending[0][0] != version + 1:
+        return latest, None
+    if any(changes is None for _, changes in pending):
+        return latest, None
+    return latest, [changes for _, changes in pending]
+
+
+class SharedDictReplica:
+    """
+    Worker view of a shared namespace dict, kept current through the change feed.
+
+    With replicas enabled (JSON_STORAGE_REPLICA in multi-process mode) `data` is a
+    plain dict local to the worker, so reads never touch the manager process.
+    Writers update the shared dict and publish the written values as a change set
+    while holding the namespace write lock; other workers notice the new version in shared
+    memory and apply the change sets to their replica. Otherwise `data` is the
+    shared dict itself and only the changed keys are published.
+
+    Change sets are {"ids": changed keys, "values": {key: value}}, keys listed in
+    ids but missing from values were deleted. on_change is called with the changed
+    keys after they are applied (own writes included), or None after a reload.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        shared: Dict[str, Any],
+        on_change: Optional[Callable[[Optional[List[str]]], None]] = None,
+    ):
+        self.namespace = namespace
+        self.local = _use_replicas
+        self._shared = shared
+        self._on_change = on_change
+        self.data: Dict[str, Any] = {} if self.local else shared
+        self._version: Optional[int] = None
+        self._read_version: Optional[Callable[[], int]] = None
+        self._sync_lock = asyncio.Lock()
+
+    async def initialize(self) -> None:
+        self._read_version = await get_change_version_reader(self.namespace)
+        await self.reload()
+
+    async def reload(self) -> None:
+        # Read the version first, replaying changes already in the snapshot is harmless
+        version = await get_change_version(self.namespace)
+        if self.local:
+            self.data = self._snapshot()
+        self._version = version
+        if self._on_change is not None:
+            self._on_change(None)
+
+    def _snapshot(self) -> Dict[str, Any]:
+        # One transfer from the shared dict instead of a round trip per key
+        if hasattr(self._shared, "_getvalue"):
+            return self._shared._getvalue()
+        return dict(self._shared)
+
+    def is_current(self) -> bool:
+        return self._version is not None and self._read_version() == self._version
+
+    async def sync(self) -> Optional[List[str]]:
+        """
+        Apply change sets published since the last sync.
+
+        Returns:
+            The changed keys, or None when the replica was reloaded because the
+            feed no longer covered its version.
+        """
+        if self.is_current():
+            return []
+        async with self._sync_lock:
+            latest, change_sets = await get_changes_since(
+                self.namespace, self._version or 0
+            )
+            if self._version is None or change_sets is None:
+                await self.reload()
+                return None
+            changed = []
+            for changes in change_sets:
+                self._apply(changes)
+                changed.extend(changes["ids"])
+            self._version = latest
+            return changed
+
+    def _apply(self, changes: Dict[str, Any]) -> None:
+        if self.local:
+            values = changes.get("values") or {}
+            for key in changes["ids"]:
+                if key in values:
+                    self.data[key] = values[key]
+                else:
+                    self.data.pop(key, None)
+        if self._on_change is not None:
+            self._on_change(changes["ids"])
+
+    async def write(
+        self,
+        upserts: Optional[Dict[str, Any]] = None,
+        deletes: Optional[List[str]] = None,
+        clear: bool = False,
+    ) -> None:
+        """Write to the shared dict and publish the change, caller must hold the namespace write lock
+
+        Also sets the update flags of the namespace, marking it for persistence.
+        """
+        upserts = upserts or {}
+        deletes = [key for key in deletes or [] if key not in upserts]
+        await self.sync()
+        if clear:
+            self._shared.clear()
+        if upserts:
+            self._shared.update(upserts)
+        for key in deletes:
+            self._shared.pop(key, None)
+
+        ids = [*upserts, *deletes]
+        changes = None
+        if not clear and len(ids) <= CHANGE_SET_MAX_KEYS:
+            changes = {"ids": ids, "values": upserts if self.local else None}
+        version = await publish_changes(self.namespace, changes)
+        if changes is None:
+            await self.reload()
+        elif version == (self._version or 0) + 1:
+            self._apply(changes)
+            self._version = version
+
+
 async def get_all_update_flags_status() -> Dict[str, list]:
     """
     Get update flags status for all namespaces.
@@ -1250,6 +1788,15 @@ def finalize_share_data():
         _init_flags, \
         _initialized, \
         _update_flags, \
+        _change_versions, \
+        _change_feeds, \
+        _change_feed_sizes, \
+        _change_version_slots, \
+        _change_version_slot_index, \
+        _use_replicas, \
+        _namespace_lock_states, \
+        _namespace_lock_slot_index, \
+        _namespace_locks, \
         _async_locks
 
     # Check if already initialized
@@ -1295,6 +1842,13 @@ def finalize_share_data():
                     pass  # Ignore any errors during update flags cleanup
                 _update_flags.clear()
 
+            if _change_feeds is not None:
+                _change_feeds.clear()
+            if _change_feed_sizes is not None:
+                _change_feed_sizes.clear()
+            if _change_versions is not None:
+                _change_versions.clear()
+
             # Shut down the Manager - this will automatically clean up all shared resources
             _manager.shutdown()
             direct_log(f"Process {os.getpid()} Manager shutdown complete")
@@ -1315,6 +1869,15 @@ def finalize_share_data():
     _graph_db_lock = None
     _data_init_lock = None
     _update_flags = None
+    _change_versions = None
+    _change_feeds = None
+    _change_feed_sizes = None
+    _change_version_slots = None
+    _change_version_slot_index = None
+    _use_replicas = False
+    _namespace_lock_states = None
+    _namespace_lock_slot_index = None
+    _namespace_locks = None
     _async_locks = None
 
     direct_log(f"Process {os.getpid()} storage data finalization complete")
@@ -0,0 +1,668 @@
+import os
+import re
+import json
+import time
+import asyncio
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Union, final
+
+from lightrag.base import (
+    BaseKVStorage,
+    DocProcessingStatus,
+    DocStatus,
+    DocStatusStorage,
+)
+from lightrag.utils import logger, get_pinyin_sort_key
+from lightrag.exceptions import StorageNotInitializedError
+
+# Seconds a connection waits for a write lock held by another connection or process
+SQLITE_BUSY_TIMEOUT = float(os.getenv("SQLITE_BUSY_TIMEOUT", "30"))
+# Connections (and worker threads) per database file in each process
+SQLITE_MAX_CONNECTIONS = int(os.getenv("SQLITE_MAX_CONNECTIONS", "4"))
+# Rows written per executemany call, also bounds the ids bound in one IN (...) query
+SQLITE_UPSERT_BATCH_SIZE = int(os.getenv("SQLITE_UPSERT_BATCH_SIZE", "500"))
+# Database file created in the working directory (or workspace subdirectory)
+SQLITE_DB_FILE = os.getenv("SQLITE_DB_FILE", "lightrag.sqlite")
+
+# Doc status columns get_docs_paginated can sort by
+DOC_STATUS_SORT_COLUMNS = {
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+    "id": "id",
+    "file_path": "file_path_sort",
+}
+
+
+def _table_name(prefix: str, namespace: str) -> str:
+    return f"{prefix}_" + re.sub(r"\W", "_", namespace)
+
+
+def _batches(items: list, size: int = SQLITE_UPSERT_BATCH_SIZE):
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+class SqliteDatabase:
+    """
+    Connections to one SQLite database file for the current process.
+
+    Every worker thread of the executor owns its own connection, so reads run
+    concurrently while SQLite (in WAL mode) serializes writers across threads and
+    processes. Write transactions start with BEGIN IMMEDIATE and wait up to
+    SQLITE_BUSY_TIMEOUT for the write lock instead of failing on contention.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=SQLITE_MAX_CONNECTIONS, thread_name_prefix="lightrag-sqlite"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode, transactions are opened explicitly
+            conn = sqlite3.connect(
+                self.path,
+                timeout=SQLITE_BUSY_TIMEOUT,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def _run_read(self, func: Callable[[sqlite3.Connection], Any]) -> Any:
+        return func(self._connection())
+
+    def _run_write(self, func: Callable[[sqlite3.Connection], Any]) -> Any:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = func(conn)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return result
+
+    async def read(self, func: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Run func(connection) in a worker thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._run_read, func)
+
+    async def write(self, func: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Run func(connection) in a worker thread inside a write transaction"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._run_write, func)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        with self._connections_lock:
+            for conn in self._connections:
+                try:
+                    conn.close()
+                except Exception as e:
+                    logger.error(f"Error closing SQLite connection {self.path}: {e}")
+            self._connections.clear()
+
+
+class SqliteConnectionManager:
+    """Shared SQLite databases by file path, reference counted per process"""
+
+    _databases: dict[tuple[int, str], SqliteDatabase] = {}
+    _refs: dict[tuple[int, str], int] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_database(cls, path: str) -> SqliteDatabase:
+        # Keyed by pid as well, connections must not be shared with forked workers
+        key = (os.getpid(), os.path.abspath(path))
+        with cls._lock:
+            if key not in cls._databases:
+                cls._databases[key] = SqliteDatabase(key[1])
+                cls._refs[key] = 0
+                logger.info(f"Opened SQLite database {key[1]}")
+            cls._refs[key] += 1
+            return cls._databases[key]
+
+    @classmethod
+    def release_database(cls, path: str) -> None:
+        key = (os.getpid(), os.path.abspath(path))
+        with cls._lock:
+            if key not in cls._refs:
+                return
+            cls._refs[key] -= 1
+            if cls._refs[key] <= 0:
+                cls._databases.pop(key).close()
+                del cls._refs[key]
+                logger.info(f"Closed SQLite database {key[1]}")
+
+
+def _database_path(storage) -> str:
+    """Set final_namespace and return the database path of a storage"""
+    working_dir = storage.global_config["working_dir"]
+    if storage.workspace:
+        # Include workspace in the file path for data isolation
+        workspace_dir = os.path.join(working_dir, storage.workspace)
+        storage.final_namespace = f"{storage.workspace}_{storage.namespace}"
+    else:
+        # Default behavior when workspace is empty
+        workspace_dir = working_dir
+        storage.final_namespace = storage.namespace
+        storage.workspace = "_"
+    os.makedirs(workspace_dir, exist_ok=True)
+    return os.path.join(workspace_dir, SQLITE_DB_FILE)
+
+
+@final
+@dataclass
+class SqliteKVStorage(BaseKVStorage):
+    """SQLite implementation of KV storage, one table per namespace
+
+    Writes are committed immediately, so nothing is kept in memory and
+    index_done_callback has nothing left to persist.
+    """
+
+    def __post_init__(self):
+        self._db_path = _database_path(self)
+        self._table = _table_name("kv", self.namespace)
+        self._db: SqliteDatabase | None = None
+
+    async def initialize(self):
+        """Open the database and create the namespace table"""
+        if self._db is None:
+            self._db = SqliteConnectionManager.get_database(self._db_path)
+        table = self._table
+
+        def create(conn: sqlite3.Connection) -> None:
+            conn.execute(
+                f'CREATE TABLE IF NOT EXISTS "{table}" ('
+                "id TEXT PRIMARY KEY, data TEXT NOT NULL, "
+                "create_time INTEGER NOT NULL, update_time INTEGER NOT NULL)"
+            )
+
+        await self._db.write(create)
+        logger.debug(
+            f"[{self.workspace}] SQLite KV {self.namespace} ready in {self._db_path}"
+        )
+
+    async def finalize(self):
+        if self._db is not None:
+            SqliteConnectionManager.release_database(self._db_path)
+            self._db = None
+
+    def _check_initialized(self) -> SqliteDatabase:
+        if self._db is None:
+            raise StorageNotInitializedError("SqliteKVStorage")
+        return self._db
+
+    @staticmethod
+    def _to_record(row: tuple) -> dict[str, Any]:
+        id, data, create_time, update_time = row
+        result = json.loads(data)
+        result["create_time"] = create_time
+        result["update_time"] = update_time
+        # Ensure _id field contains the clean ID
+        result["_id"] = id
+        return result
+
+    async def _fetch_by_ids(self, ids: list[str]) -> dict[str, dict[str, Any]]:
+        table = self._table
+
+        def fetch(conn: sqlite3.Connection) -> dict[str, dict[str, Any]]:
+            rows = {}
+            for batch in _batches(list(dict.fromkeys(ids))):
+                placeholders = ",".join("?" * len(batch))
+                for row in conn.execute(
+                    f'SELECT id, data, create_time, update_time FROM "{table}" '
+                    f"WHERE id IN ({placeholders})",
+                    batch,
+                ):
+                    rows[row[0]] = self._to_record(row)
+            return rows
+
+        return await self._check_initialized().read(fetch)
+
+    async def get_all(self) -> dict[str, Any]:
+        """Get all data from storage
+
+        Returns:
+            Dictionary containing all stored data
+        """
+        table = self._table
+
+        def fetch(conn: sqlite3.Connection) -> dict[str, Any]:
+            return {
+                row[0]: self._to_record(row)
+                for row in conn.execute(
+                    f'SELECT id, data, create_time, update_time FROM "{table}"'
+                )
+            }
+
+        return await self._check_initialized().read(fetch)
+
+    async def get_by_id(self, id: str) -> dict[str, Any] | None:
+        return (await self._fetch_by_ids([id])).get(id)
+
+    async def get_by_ids(self, ids: list[str]) -> list[dict[str, Any]]:
+        rows = await self._fetch_by_ids(ids)
+        return [rows.get(id) for id in ids]
+
+    async def filter_keys(self, keys: set[str]) -> set[str]:
+        table = self._table
+
+        def existing(conn: sqlite3.Connection) -> set[str]:
+            found = set()
+            for batch in _batches(list(keys)):
+                placeholders = ",".join("?" * len(batch))
+                found.update(
+                    row[0]
+                    for row in conn.execute(
+                        f'SELECT id FROM "{table}" WHERE id IN ({placeholders})',
+                        batch,
+                    )
+                )
+            return found
+
+        return set(keys) - await self._check_initialized().read(existing)
+
+    async def upsert(self, data: dict[str, dict[str, Any]]) -> None:
+        """Insert or update records, committed before returning
+
+        create_time of existing records is preserved, update_time is set to now.
+        """
+        if not data:
+            return
+        logger.debug(
+            f"[{self.workspace}] Inserting {len(data)} records to {self.namespace}"
+        )
+        current_time = int(time.time())
+        rows = []
+        for k, v in data.items():
+            # For text_chunks namespace, ensure llm_cache_list field exists
+            if self.namespace.endswith("text_chunks"):
+                if "llm_cache_list" not in v:
+                    v["llm_cache_list"] = []
+            v["_id"] = k
+            payload = {
+                key: value
+                for key, value in v.items()
+                if key not in ("create_time", "update_time")
+            }
+            rows.append(
+                (k, json.dumps(payload, ensure_ascii=False), current_time, current_time)
+            )
+        table = self._table
+
+        def write(conn: sqlite3.Connection) -> None:
+            for batch in _batches(rows):
+                conn.executemany(
+                    f'INSERT INTO "{table}" (id, data, create_time, update_time) '
+                    "VALUES (?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET "
+                    "data = excluded.data, update_time = excluded.update_time",
+                    batch,
+                )
+
+        await self._check_initialized().write(write)
+
+    async def delete(self, ids: list[str]) -> None:
+        """Delete specific records from storage by their IDs
+
+        Args:
+            ids (list[str]): List of document IDs to be deleted from storage
+
+        Returns:
+            None
+        """
+        if not ids:
+            return
+        table = self._table
+
+        def delete(conn: sqlite3.Connection) -> None:
+            for batch in _batches(list(ids)):
+                placeholders = ",".join("?" * len(batch))
+                conn.execute(
+                    f'DELETE FROM "{table}" WHERE id IN ({placeholders})', batch
+                )
+
+        await self._check_initialized().write(delete)
+
+    async def index_done_callback(self) -> None:
+        # Upserts and deletes are committed as they happen
+        pass
+
+    async def drop(self) -> dict[str, str]:
+        """Drop all data of the namespace
+
+        Returns:
+            dict[str, str]: Operation status and message
+            - On success: {"status": "success", "message": "data dropped"}
+            - On failure: {"status": "error", "message": "<error details>"}
+        """
+        table = self._table
+        try:
+            await self._check_initialized().write(
+                lambda conn: conn.execute(f'DELETE FROM "{table}"')
+            )
+            logger.info(
+                f"[{self.workspace}] Process {os.getpid()} drop {self.namespace}"
+            )
+            return {"status": "success", "message": "data dropped"}
+        except Exception as e:
+            logger.error(f"[{self.workspace}] Error dropping {self.namespace}: {e}")
+            return {"status": "error", "message": str(e)}
+
+
+def _to_doc_processing_status(doc_data: dict[str, Any]) -> DocProcessingStatus:
+    # Make a copy of the data to avoid modifying the original
+    data = doc_data.copy()
+    # Remove deprecated content field if it exists
+    data.pop("content", None)
+    # If file_path is not in data, use document id as file path
+    if "file_path" not in data:
+        data["file_path"] = "no-file-path"
+    # Ensure new fields exist with default values
+    if "metadata" not in data:
+        data["metadata"] = {}
+    if "error_msg" not in data:
+        data["error_msg"] = None
+    return DocProcessingStatus(**data)
+
+
+@final
+@dataclass
+class SqliteDocStatusStorage(DocStatusStorage):
+    """SQLite implementation of document status storage
+
+    status, track_id and the sort fields are stored in indexed columns next to
+    the JSON document, so counts, filters and pages are answered by SQLite.
+    """
+
+    def __post_init__(self):
+        self._db_path = _database_path(self)
+        self._table = _table_name("doc_status", self.namespace)
+        self._db: SqliteDatabase | None = None
+
+    async def initialize(self):
+        """Open the database and create the namespace table and its indexes"""
+        if self._db is None:
+            self._db = SqliteConnectionManager.get_database(self._db_path)
+        table = self._table
+
+        def create(conn: sqlite3.Connection) -> None:
+            conn.execute(
+                f'CREATE TABLE IF NOT EXISTS "{table}" ('
+                "id TEXT PRIMARY KEY, status TEXT, track_id TEXT, "
+                "created_at TEXT NOT NULL, updated_at TEXT NOT NULL, "
+                "file_path_sort TEXT NOT NULL, data TEXT NOT NULL)"
+            )
+            conn.execute(
+                f'CREATE INDEX IF NOT EXISTS "{table}_track_id" ON "{table}" (track_id)'
+            )
+            # (status, field) serves filtered pages, (field) unfiltered ones
+            for column in ("created_at", "updated_at", "file_path_sort"):
+                conn.execute(
+                    f'CREATE INDEX IF NOT EXISTS "{table}_status_{column}" '
+                    f'ON "{table}" (status, {column}, id)'
+                )
+                conn.execute(
+                    f'CREATE INDEX IF NOT EXISTS "{table}_{column}" '
+                    f'ON "{table}" ({column}, id)'
+                )
+
+        await self._db.write(create)
+        logger.debug(
+            f"[{self.workspace}] SQLite doc status {self.namespace} ready in {self._db_path}"
+        )
+
+    async def finalize(self):
+        if self._db is not None:
+            SqliteConnectionManager.release_database(self._db_path)
+            self._db = None
+
+    def _check_initialized(self) -> SqliteDatabase:
+        if self._db is None:
+            raise StorageNotInitializedError("SqliteDocStatusStorage")
+        return self._db
+
+    def _load_doc_statuses(self, rows) -> dict[str, DocProcessingStatus]:
+        result = {}
+        for doc_id, data in rows:
+            try:
+                result[doc_id] = _to_doc_processing_status(json.loads(data))
+            except KeyError as e:
+                logger.error(
+                    f"[{self.workspace}] Missing required field for document {doc_id}: {e}"
+                )
+        return result
+
+    async def _fetch_by_ids(self, ids: list[str]) -> dict[str, dict[str, Any]]:
+        table = self._table
+
+        def fetch(conn: sqlite3.Connection) -> dict[str, dict[str, Any]]:
+            rows = {}
+            for batch in _batches(list(dict.fromkeys(ids))):
+                placeholders = ",".join("?" * len(batch))
+                for doc_id, data in conn.execute(
+                    f'SELECT id, data FROM "{table}" WHERE id IN ({placeholders})',
+                    batch,
+                ):
+                    rows[doc_id] = json.loads(data)
+            return rows
+
+        return await self._check_initialized().read(fetch)
+
+    async def filter_keys(self, keys: set[str]) -> set[str]:
+        """Return keys that should be processed (not in storage or not successfully processed)"""
+        return set(keys) - set(await self._fetch_by_ids(list(keys)))
+
+    async def get_by_id(self, id: str) -> Union[dict[str, Any], None]:
+        return (await self._fetch_by_ids([id])).get(id)
+
+    async def get_by_ids(self, ids: list[str]) -> list[dict[str, Any]]:
+        rows = await self._fetch_by_ids(ids)
+        return [rows[id] for id in ids if rows.get(id)]
+
+    async def get_status_counts(self) -> dict[str, int]:
+        """Get counts of documents in each status"""
+        counts = {status.value: 0 for status in DocStatus}
+        table = self._table
+        rows = await self._check_initialized().read(
+            lambda conn: conn.execute(
+                f'SELECT status, COUNT(*) FROM "{table}" GROUP BY status'
+            ).fetchall()
+        )
+        for status, count in rows:
+            counts[status] = counts.get(status, 0) + count
+        return counts
+
+    async def get_docs_by_status(
+        self, status: DocStatus
+    ) -> dict[str, DocProcessingStatus]:
+        """Get all documents with a specific status"""
+        table = self._table
+        rows = await self._check_initialized().read(
+            lambda conn: conn.execute(
+                f'SELECT id, data FROM "{table}" WHERE status = ?', (status.value,)
+            ).fetchall()
+        )
+        return self._load_doc_statuses(rows)
+
+    async def get_docs_by_track_id(
+        self, track_id: str
+    ) -> dict[str, DocProcessingStatus]:
+        """Get all documents with a specific track_id"""
+        table = self._table
+        rows = await self._check_initialized().read(
+            lambda conn: conn.execute(
+                f'SELECT id, data FROM "{table}" WHERE track_id = ?', (track_id,)
+            ).fetchall()
+        )
+        return self._load_doc_statuses(rows)
+
+    async def upsert(self, data: dict[str, dict[str, Any]]) -> None:
+        """Insert or update document statuses, committed before returning"""
+        if not data:
+            return
+        logger.debug(
+            f"[{self.workspace}] Inserting {len(data)} records to {self.namespace}"
+        )
+        rows = []
+        for doc_id, doc_data in data.items():
+            # Ensure chunks_list field exists for new documents
+            if "chunks_list" not in doc_data:
+                doc_data["chunks_list"] = []
+            status = doc_data.get("status")
+            rows.append(
+                (
+                    doc_id,
+                    getattr(status, "value", status),
+                    doc_data.get("track_id"),
+                    str(doc_data.get("created_at") or ""),
+                    str(doc_data.get("updated_at") or ""),
+                    # Use pinyin sorting for file_path field to support Chinese characters
+                    get_pinyin_sort_key(doc_data.get("file_path", "no-file-path")),
+                    json.dumps(doc_data, ensure_ascii=False),
+                )
+            )
+        table = self._table
+
+        def write(conn: sqlite3.Connection) -> None:
+            for batch in _batches(rows):
+                conn.executemany(
+                    f'INSERT OR REPLACE INTO "{table}" (id, status, track_id, '
+                    "created_at, updated_at, file_path_sort, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    batch,
+                )
+
+        await self._check_initialized().write(write)
+
+    async def get_docs_paginated(
+        self,
+        status_filter: DocStatus | None = None,
+        page: int = 1,
+        page_size: int = 50,
+        sort_field: str = "updated_at",
+        sort_direction: str = "desc",
+    ) -> tuple[list[tuple[str, DocProcessingStatus]], int]:
+        """Get documents with pagination support
+
+        Args:
+            status_filter: Filter by document status, None for all statuses
+            page: Page number (1-based)
+            page_size: Number of documents per page (10-200)
+            sort_field: Field to sort by ('created_at', 'updated_at', 'id')
+            sort_direction: Sort direction ('asc' or 'desc')
+
+        Returns:
+            Tuple of (list of (doc_id, DocProcessingStatus) tuples, total_count)
+        """
+        # Validate parameters
+        if page < 1:
+            page = 1
+        if page_size < 10:
+            page_size = 10
+        elif page_size > 200:
+            page_size = 200
+
+        column = DOC_STATUS_SORT_COLUMNS.get(sort_field, "updated_at")
+        direction = "ASC" if sort_direction.lower() == "asc" else "DESC"
+
+        where, params = "", []
+        if status_filter is not None:
+            where, params = "WHERE status = ?", [status_filter.value]
+        order = f"{column} {direction}"
+        if column != "id":
+            # Same tie-break as the JSON storage, documents with equal keys by id
+            order += f", id {direction}"
+        table = self._table
+
+        def fetch(conn: sqlite3.Connection):
+            total = conn.execute(
+                f'SELECT COUNT(*) FROM "{table}" {where}', params
+            ).fetchone()[0]
+            rows = conn.execute(
+                f'SELECT id, data FROM "{table}" {where} ORDER BY {order} '
+                "LIMIT ? OFFSET ?",
+                [*params, page_size, (page - 1) * page_size],
+            ).fetchall()
+            return rows, total
+
+        rows, total_count = await self._check_initialized().read(fetch)
+        docs = self._load_doc_statuses(rows)
+        paginated_docs = [
+            (doc_id, docs[doc_id]) for doc_id, _ in rows if doc_id in docs
+        ]
+        return paginated_docs, total_count
+
+    async def get_all_status_counts(self) -> dict[str, int]:
+        """Get counts of documents in each status for all documents
+
+        Returns:
+            Dictionary mapping status names to counts, including 'all' field
+        """
+        counts = await self.get_status_counts()
+
+        # Add 'all' field with total count
+        total_count = sum(counts.values())
+        counts["all"] = total_count
+
+        return counts
+
+    async def delete(self, doc_ids: list[str]) -> None:
+        """Delete specific records from storage by their IDs
+
+        Args:
+            ids (list[str]): List of document IDs to be deleted from storage
+
+        Returns:
+            None
+        """
+        if not doc_ids:
+            return
+        table = self._table
+
+        def delete(conn: sqlite3.Connection) -> None:
+            for batch in _batches(list(doc_ids)):
+                placeholders = ",".join("?" * len(batch))
+                conn.execute(
+                    f'DELETE FROM "{table}" WHERE id IN ({placeholders})', batch
+                )
+
+        await self._check_initialized().write(delete)
+
+    async def index_done_callback(self) -> None:
+        # Upserts and deletes are committed as they happen
+        pass
+
+    async def drop(self) -> dict[str, str]:
+        """Drop all document status data of the namespace
+
+        Returns:
+            dict[str, str]: Operation status and message
+            - On success: {"status": "success", "message": "data dropped"}
+            - On failure: {"status": "error", "message": "<error details>"}
+        """
+        table = self._table
+        try:
+            await self._check_initialized().write(
+                lambda conn: conn.execute(f'DELETE FROM "{table}"')
+            )
+            logger.info(
+                f"[{self.workspace}] Process {os.getpid()} drop {self.namespace}"
+            )
+            return {"status": "success", "message": "data dropped"}
+        except Exception as e:
+            logger.error(f"[{self.workspace}] Error dropping {self.namespace}: {e}")
+            return {"status": "error", "message": str(e)}
@@ -13,12 +13,12 @@ from typing import (
     Any,
     AsyncIterator,
     Callable,
+    Iterable,
     Iterator,
     cast,
     final,
     Literal,
     Optional,
-    List,
     Dict,
 )
 from lightrag.constants import (
@@ -43,6 +43,7 @@ from lightrag.constants import (
     DEFAULT_SUMMARY_LANGUAGE,
     DEFAULT_LLM_TIMEOUT,
     DEFAULT_EMBEDDING_TIMEOUT,
+    DEFAULT_ADAPTIVE_ASYNC,
 )
 from lightrag.utils import get_env_value
 
@@ -85,6 +86,11 @@ from .constants import GRAPH_FIELD_SEP
 from .utils import (
     Tokenizer,
     TiktokenTokenizer,
+    TokenizerPool,
+    SemanticQueryCache,
+    LLMCacheLimiter,
+    release_shared_clients,
+    retain_shared_clients,
     EmbeddingFunc,
     always_get_an_event_loop,
     compute_mdhash_id,
@@ -231,7 +237,7 @@ class LightRAG:
             int,
             int,
         ],
-        List[Dict[str, Any]],
+        Iterable[Dict[str, Any]],
     ] = field(default_factory=lambda: chunking_by_token_size)
     """
     Custom chunking function for splitting text into chunks before processing.
@@ -245,13 +251,30 @@ class LightRAG:
         - `chunk_token_size`: The maximum number of tokens per chunk.
         - `chunk_overlap_token_size`: The number of overlapping tokens between consecutive chunks.
 
-    The function should return a list of dictionaries, where each dictionary contains the following keys:
+    The function should return a list (or yield a sequence) of dictionaries, where each dictionary contains the following keys:
         - `tokens`: The number of tokens in the chunk.
         - `content`: The text content of the chunk.
 
     Defaults to `chunking_by_token_size` if not specified.
     """
 
+    tokenizer_pool_mode: str = field(default=os.getenv("TOKENIZER_POOL_MODE", "none"))
+    """Where chunking and query-time token counting run: "none" (on the event loop), "thread" or "process" pool.
+    A process pool requires a picklable tokenizer and a module-level `chunking_func`."""
+
+    tokenizer_pool_workers: int = field(
+        default=get_env_value("TOKENIZER_POOL_WORKERS", 2, int)
+    )
+    """Number of workers in the tokenizer pool."""
+
+    tokenizer_pool_max_pending: int = field(
+        default=get_env_value("TOKENIZER_POOL_MAX_PENDING", 8, int)
+    )
+    """Maximum number of calls handed to the tokenizer pool at a time, further callers wait."""
+
+    tokenizer_pool: Optional[TokenizerPool] = field(default=None, init=False)
+    """Tokenizer pool created from the settings above, None when tokenizer_pool_mode is "none"."""
+
     # Embedding
     # ---
 
@@ -271,14 +294,26 @@ class LightRAG:
             "enabled": False,
             "similarity_threshold": 0.95,
             "use_llm_check": False,
+            "llm_check_threshold": 0.8,
+            "max_entries": 1000,
+            "ttl": 3600,
         }
     )
-    """Configuration for embedding cache.
-    - enabled: If True, enables caching to avoid redundant computations.
-    - similarity_threshold: Minimum similarity score to use cached embeddings.
-    - use_llm_check: If True, validates cached embeddings using an LLM.
+    """Configuration for the semantic query cache, which answers queries similar to an already answered one from memory.
+    - enabled: If True, caches query answers by query embedding.
+    - similarity_threshold: Minimum cosine similarity for a query to reuse a cached answer.
+    - use_llm_check: If True, asks the LLM to confirm that the two queries match before reusing an answer.
+    - llm_check_threshold: Minimum similarity (0-1) rated by the LLM check for a query to reuse a cached answer.
+    - max_entries: Maximum number of cached answers, least recently used answers are evicted first.
+    - ttl: Seconds after which a cached answer expires, None to keep answers until evicted.
+
+    The cache lives in the memory of each worker process. It is cleared when this instance changes
+    the knowledge graph, changes made by other workers only reach it through ttl expiry.
     """
 
+    semantic_query_cache: Optional[SemanticQueryCache] = field(default=None, init=False)
+    """Semantic query cache created from embedding_cache_config, None when it is disabled."""
+
     default_embedding_timeout: int = field(
         default=int(os.getenv("EMBEDDING_TIMEOUT", DEFAULT_EMBEDDING_TIMEOUT))
     )
@@ -314,6 +349,12 @@ class LightRAG:
     )
     """Maximum number of concurrent LLM calls."""
 
+    adaptive_async: bool = field(
+        default=get_env_value("ADAPTIVE_ASYNC", DEFAULT_ADAPTIVE_ASYNC, bool)
+    )
+    """Adapt LLM and embedding concurrency (AIMD) to provider latency and rate limits.
+    llm_model_max_async and embedding_func_max_async become the starting limits."""
+
     llm_model_kwargs: dict[str, Any] = field(default_factory=dict)
     """Additional keyword arguments passed to the LLM model function."""
 
@@ -344,6 +385,18 @@ class LightRAG:
     enable_llm_cache_for_entity_extract: bool = field(default=True)
     """If True, enables caching for entity extraction steps to reduce LLM costs."""
 
+    llm_cache_limits: dict[str, dict[str, Any]] = field(default_factory=dict)
+    """Size limits of the LLM response cache by cache type ("extract", "summary", "keywords", "query", ...), "*" applies to every cache type without limits of its own. Empty to keep every response.
+    - max_entries: Maximum number of cached responses.
+    - max_bytes: Maximum total size of the cached responses.
+    - policy: Eviction order once a limit is exceeded, "lru" (default), "lfu" or "ttl" (oldest first).
+    - ttl: Seconds after which a cached response expires.
+    Extraction results still referenced by a text chunk are kept, they are needed to rebuild the knowledge graph when documents are deleted.
+    """
+
+    llm_cache_limiter: Optional[LLMCacheLimiter] = field(default=None, init=False)
+    """Limiter enforcing llm_cache_limits, None when no limits are set."""
+
     # Extensions
     # ---
 
@@ -441,6 +494,14 @@ class LightRAG:
             else:
                 self.tokenizer = TiktokenTokenizer()
 
+        if self.tokenizer_pool_mode != "none":
+            self.tokenizer_pool = TokenizerPool(
+                self.tokenizer,
+                mode=self.tokenizer_pool_mode,
+                max_workers=self.tokenizer_pool_workers,
+                max_pending=self.tokenizer_pool_max_pending,
+            )
+
         # Initialize ollama_server_infos if not provided
         if self.ollama_server_infos is None:
             self.ollama_server_infos = OllamaServerInfos()
@@ -459,6 +520,9 @@ class LightRAG:
                 f"max_total_tokens({self.summary_max_tokens}) should greater than summary_length_recommended({self.summary_length_recommended})"
             )
 
+        if self.llm_cache_limits:
+            self.llm_cache_limiter = LLMCacheLimiter(self.llm_cache_limits)
+
         # Fix global_config now
         global_config = asdict(self)
 
@@ -470,6 +534,7 @@ class LightRAG:
             self.embedding_func_max_async,
             llm_timeout=self.default_embedding_timeout,
             queue_name="Embedding func",
+            adaptive=self.adaptive_async,
         )(self.embedding_func)
 
         # Initialize all storages
@@ -559,6 +624,9 @@ class LightRAG:
             embedding_func=None,
         )
 
+        if self.llm_cache_limiter is not None:
+            self.llm_cache_limiter.attach(self.llm_response_cache, self.text_chunks)
+
         # Directly use llm_response_cache, don't create a new object
         hashing_kv = self.llm_response_cache
 
@@ -567,6 +635,7 @@ class LightRAG:
             self.llm_model_max_async,
             llm_timeout=self.default_llm_timeout,
             queue_name="LLM func",
+            adaptive=self.adaptive_async,
         )(
             partial(
                 self.llm_model_func,  # type: ignore
@@ -575,6 +644,22 @@ class LightRAG:
             )
         )
 
+        if self.embedding_cache_config.get("enabled"):
+            self.semantic_query_cache = SemanticQueryCache(
+                self.embedding_func,
+                similarity_threshold=self.embedding_cache_config.get(
+                    "similarity_threshold", 0.95
+                ),
+                max_entries=self.embedding_cache_config.get("max_entries", 1000),
+                ttl=self.embedding_cache_config.get("ttl", 3600),
+                llm_check_func=partial(self.llm_model_func, _priority=5)
+                if self.embedding_cache_config.get("use_llm_check")
+                else None,
+                llm_check_threshold=self.embedding_cache_config.get(
+                    "llm_check_threshold", 0.8
+                ),
+            )
+
         self._storages_status = StoragesStatus.CREATED
 
     async def initialize_storages(self):
@@ -596,9 +681,22 @@ class LightRAG:
                     # logger.debug(f"Initializing storage: {storage}")
                     await storage.initialize()
 
+            # Keep the pooled HTTP clients open until the last instance on this loop finalizes
+            retain_shared_clients()
             self._storages_status = StoragesStatus.INITIALIZED
             logger.debug("All storage types initialized")
 
+    def get_concurrency_metrics(self) -> dict[str, dict[str, Any]]:
+        """Concurrency limits and call statistics of the LLM and embedding queues"""
+        metrics = {}
+        for name, func in (
+            ("llm", self.llm_model_func),
+            ("embedding", self.embedding_func),
+        ):
+            if callable(getattr(func, "metrics", None)):
+                metrics[name] = func.metrics()
+        return metrics
+
     async def finalize_storages(self):
         """Asynchronously finalize the storages with improved error handling"""
         if self._storages_status == StoragesStatus.INITIALIZED:
@@ -643,6 +741,13 @@ class LightRAG:
             else:
                 logger.debug("All storages finalized successfully")
 
+            if self.tokenizer_pool is not None:
+                self.tokenizer_pool.shutdown()
+
+            # Close pooled HTTP clients of the LLM and embedding bindings, unless
+            # other instances on this event loop still use them
+            await release_shared_clients()
+
             self._storages_status = StoragesStatus.FINALIZED
 
     async def check_and_migrate_data(self):
@@ -1464,6 +1569,12 @@ class LightRAG:
                 processed_count = 0
                 # Create a semaphore to limit the number of concurrent file processing
                 semaphore = asyncio.Semaphore(self.max_parallel_insert)
+                # Extracted documents wait here for a merge worker, so the LLM extracts
+                # the next documents while earlier ones are merged into the graph. The
+                # queue is bounded to keep extraction from running far ahead of merging.
+                merge_queue: asyncio.Queue = asyncio.Queue(
+                    maxsize=self.max_parallel_insert
+                )
 
                 async def process_document(
                     doc_id: str,
@@ -1521,7 +1632,22 @@ class LightRAG:
                                 )
                             content = content_data["content"]
 
-                            # Generate chunks from document
+                            # Generate chunks from document, off the event loop if a tokenizer pool is configured
+                            chunking_args = (
+                                content,
+                                split_by_character,
+                                split_by_character_only,
+                                self.chunk_overlap_token_size,
+                                self.chunk_token_size,
+                            )
+                            if self.tokenizer_pool is not None:
+                                chunk_list = await self.tokenizer_pool.chunk(
+                                    self.chunking_func, *chunking_args
+                                )
+                            else:
+                                chunk_list = self.chunking_func(
+                                    self.tokenizer, *chunking_args
+                                )
                             chunks: dict[str, Any] = {
                                 compute_mdhash_id(dp["content"], prefix="chunk-"): {
                                     **dp,
@@ -1529,14 +1655,7 @@ class LightRAG:
                                     "file_path": file_path,  # Add file path to each chunk
                                     "llm_cache_list": [],  # Initialize empty LLM cache list for each chunk
                                 }
-                                for dp in self.chunking_func(
-                                    self.tokenizer,
-                                    content,
-                                    split_by_character,
-                                    split_by_character_only,
-                                    self.chunk_overlap_token_size,
-                                    self.chunk_token_size,
-                                )
+                                for dp in chunk_list
                             }
 
                             if not chunks:
@@ -1647,104 +1766,130 @@ class LightRAG:
                                 }
                             )
 
-                        # Concurrency is controlled by keyed lock for individual entities and relationships
+                        # Hand the results to the merge stage, waiting for room in the
+                        # queue before freeing the extraction slot
                         if file_extraction_stage_ok:
-                            try:
-                                # Get chunk_results from entity_relation_task
-                                chunk_results = await entity_relation_task
-                                await merge_nodes_and_edges(
-                                    chunk_results=chunk_results,  # result collected from entity_relation_task
-                                    knowledge_graph_inst=self.chunk_entity_relation_graph,
-                                    entity_vdb=self.entities_vdb,
-                                    relationships_vdb=self.relationships_vdb,
-                                    global_config=asdict(self),
-                                    full_entities_storage=self.full_entities,
-                                    full_relations_storage=self.full_relations,
-                                    doc_id=doc_id,
-                                    pipeline_status=pipeline_status,
-                                    pipeline_status_lock=pipeline_status_lock,
-                                    llm_response_cache=self.llm_response_cache,
-                                    current_file_number=current_file_number,
-                                    total_files=total_files,
-                                    file_path=file_path,
-                                )
-
-                                # Record processing end time
-                                processing_end_time = int(time.time())
-
-                                await self.doc_status.upsert(
-                                    {
-                                        doc_id: {
-                                            "status": DocStatus.PROCESSED,
-                                            "chunks_count": len(chunks),
-                                            "chunks_list": list(chunks.keys()),
-                                            "content_summary": status_doc.content_summary,
-                                            "content_length": status_doc.content_length,
-                                            "created_at": status_doc.created_at,
-                                            "updated_at": datetime.now(
-                                                timezone.utc
-                                            ).isoformat(),
-                                            "file_path": file_path,
-                                            "track_id": status_doc.track_id,  # Preserve existing track_id
-                                            "metadata": {
-                                                "processing_start_time": processing_start_time,
-                                                "processing_end_time": processing_end_time,
-                                            },
-                                        }
-                                    }
+                            chunk_results = await entity_relation_task
+                            await merge_queue.put(
+                                (
+                                    doc_id,
+                                    status_doc,
+                                    file_path,
+                                    chunks,
+                                    chunk_results,
+                                    current_file_number,
+                                    processing_start_time,
                                 )
+                            )
 
-                                # Call _insert_done after processing each file
-                                await self._insert_done()
+                async def merge_document(
+                    doc_id: str,
+                    status_doc: DocProcessingStatus,
+                    file_path: str,
+                    chunks: dict[str, Any],
+                    chunk_results: list,
+                    current_file_number: int,
+                    processing_start_time: int,
+                ) -> None:
+                    """Merge the extracted entities and relations of a single document"""
+                    # Concurrency is controlled by keyed lock for individual entities and relationships
+                    try:
+                        await merge_nodes_and_edges(
+                            chunk_results=chunk_results,  # result collected from entity_relation_task
+                            knowledge_graph_inst=self.chunk_entity_relation_graph,
+                            entity_vdb=self.entities_vdb,
+                            relationships_vdb=self.relationships_vdb,
+                            global_config=asdict(self),
+                            full_entities_storage=self.full_entities,
+                            full_relations_storage=self.full_relations,
+                            doc_id=doc_id,
+                            pipeline_status=pipeline_status,
+                            pipeline_status_lock=pipeline_status_lock,
+                            llm_response_cache=self.llm_response_cache,
+                            current_file_number=current_file_number,
+                            total_files=total_files,
+                            file_path=file_path,
+                        )
 
-                                async with pipeline_status_lock:
-                                    log_message = f"Completed processing file {current_file_number}/{total_files}: {file_path}"
-                                    logger.info(log_message)
-                                    pipeline_status["latest_message"] = log_message
-                                    pipeline_status["history_messages"].append(
-                                        log_message
-                                    )
+                        # Record processing end time
+                        processing_end_time = int(time.time())
+
+                        await self.doc_status.upsert(
+                            {
+                                doc_id: {
+                                    "status": DocStatus.PROCESSED,
+                                    "chunks_count": len(chunks),
+                                    "chunks_list": list(chunks.keys()),
+                                    "content_summary": status_doc.content_summary,
+                                    "content_length": status_doc.content_length,
+                                    "created_at": status_doc.created_at,
+                                    "updated_at": datetime.now(
+                                        timezone.utc
+                                    ).isoformat(),
+                                    "file_path": file_path,
+                                    "track_id": status_doc.track_id,  # Preserve existing track_id
+                                    "metadata": {
+                                        "processing_start_time": processing_start_time,
+                                        "processing_end_time": processing_end_time,
+                                    },
+                                }
+                            }
+                        )
 
-                            except Exception as e:
-                                # Log error and update pipeline status
-                                logger.error(traceback.format_exc())
-                                error_msg = f"Merging stage failed in document {current_file_number}/{total_files}: {file_path}"
-                                logger.error(error_msg)
-                                async with pipeline_status_lock:
-                                    pipeline_status["latest_message"] = error_msg
-                                    pipeline_status["history_messages"].append(
-                                        traceback.format_exc()
-                                    )
-                                    pipeline_status["history_messages"].append(
-                                        error_msg
-                                    )
+                        # Call _insert_done after processing each file
+                        await self._insert_done()
 
-                                # Persistent llm cache
-                                if self.llm_response_cache:
-                                    await self.llm_response_cache.index_done_callback()
+                        async with pipeline_status_lock:
+                            log_message = f"Completed processing file {current_file_number}/{total_files}: {file_path}"
+                            logger.info(log_message)
+                            pipeline_status["latest_message"] = log_message
+                            pipeline_status["history_messages"].append(log_message)
 
-                                # Record processing end time for failed case
-                                processing_end_time = int(time.time())
+                    except Exception as e:
+                        # Log error and update pipeline status
+                        logger.error(traceback.format_exc())
+                        error_msg = f"Merging stage failed in document {current_file_number}/{total_files}: {file_path}"
+                        logger.error(error_msg)
+                        async with pipeline_status_lock:
+                            pipeline_status["latest_message"] = error_msg
+                            pipeline_status["history_messages"].append(
+                                traceback.format_exc()
+                            )
+                            pipeline_status["history_messages"].append(error_msg)
+
+                        # Persistent llm cache
+                        if self.llm_response_cache:
+                            await self.llm_response_cache.index_done_callback()
+
+                        # Record processing end time for failed case
+                        processing_end_time = int(time.time())
+
+                        # Update document status to failed
+                        await self.doc_status.upsert(
+                            {
+                                doc_id: {
+                                    "status": DocStatus.FAILED,
+                                    "error_msg": str(e),
+                                    "content_summary": status_doc.content_summary,
+                                    "content_length": status_doc.content_length,
+                                    "created_at": status_doc.created_at,
+                                    "updated_at": datetime.now().isoformat(),
+                                    "file_path": file_path,
+                                    "track_id": status_doc.track_id,  # Preserve existing track_id
+                                    "metadata": {
+                                        "processing_start_time": processing_start_time,
+                                        "processing_end_time": processing_end_time,
+                                    },
+                                }
+                            }
+                        )
 
-                                # Update document status to failed
-                                await self.doc_status.upsert(
-                                    {
-                                        doc_id: {
-                                            "status": DocStatus.FAILED,
-                                            "error_msg": str(e),
-                                            "content_summary": status_doc.content_summary,
-                                            "content_length": status_doc.content_length,
-                                            "created_at": status_doc.created_at,
-                                            "updated_at": datetime.now().isoformat(),
-                                            "file_path": file_path,
-                                            "track_id": status_doc.track_id,  # Preserve existing track_id
-                                            "metadata": {
-                                                "processing_start_time": processing_start_time,
-                                                "processing_end_time": processing_end_time,
-                                            },
-                                        }
-                                    }
-                                )
+                async def merge_worker() -> None:
+                    while True:
+                        item = await merge_queue.get()
+                        if item is None:
+                            return
+                        await merge_document(*item)
 
                 # Create processing tasks for all documents
                 doc_tasks = []
@@ -1761,8 +1906,23 @@ class LightRAG:
                         )
                     )
 
-                # Wait for all document processing to complete
-                await asyncio.gather(*doc_tasks)
+                async def extract_documents() -> None:
+                    await asyncio.gather(*doc_tasks)
+                    for _ in merge_workers:
+                        await merge_queue.put(None)
+
+                # Wait for all documents to be extracted and merged
+                merge_workers = [
+                    asyncio.create_task(merge_worker())
+                    for _ in range(self.max_parallel_insert)
+                ]
+                extract_task = asyncio.create_task(extract_documents())
+                try:
+                    await asyncio.gather(extract_task, *merge_workers)
+                finally:
+                    for task in [extract_task, *merge_workers]:
+                        if not task.done():
+                            task.cancel()
 
                 # Check if there's a pending request to process more documents (with lock)
                 has_pending_request = False
@@ -1843,6 +2003,8 @@ class LightRAG:
         ]
         await asyncio.gather(*tasks)
 
+        self._clear_semantic_query_cache()
+
         log_message = "In memory DB persist to disk"
         logger.info(log_message)
 
@@ -2187,6 +2349,11 @@ class LightRAG:
         await self._query_done()
         return final_data
 
+    def _clear_semantic_query_cache(self) -> None:
+        """Drop cached query answers, they may be outdated by a knowledge graph change"""
+        if self.semantic_query_cache is not None:
+            self.semantic_query_cache.clear()
+
     async def _query_done(self):
         await self.llm_response_cache.index_done_callback()
 
@@ -2199,6 +2366,8 @@ class LightRAG:
             # Clear all cache
             await rag.aclear_cache()
         """
+        self._clear_semantic_query_cache()
+
         if not self.llm_response_cache:
             logger.warning("No cache storage configured")
             return
@@ -2206,6 +2375,8 @@ class LightRAG:
         try:
             # Clear all cache using drop method
             success = await self.llm_response_cache.drop()
+            if self.llm_cache_limiter is not None:
+                self.llm_cache_limiter.clear()
             if success:
                 logger.info("Cleared all cache")
             else:
@@ -2220,6 +2391,30 @@ class LightRAG:
         """Synchronous version of aclear_cache."""
         return always_get_an_event_loop().run_until_complete(self.aclear_cache())
 
+    async def acompact_llm_cache(self) -> dict[str, Any]:
+        """Evict LLM cache entries until every cache type is within llm_cache_limits
+
+        Expired entries are evicted as well. Unlike the eviction done while saving
+        responses, the whole cache storage is rescanned, so entries saved by other
+        workers are accounted for.
+
+        Returns:
+            dict: Evicted entry count and bytes, and the remaining entries and bytes
+            by cache type. Empty when no limits are configured.
+        """
+        if self.llm_cache_limiter is None:
+            logger.warning("No LLM cache limits configured, nothing to compact")
+            return {}
+        result = await self.llm_cache_limiter.compact()
+        logger.info(
+            f"Compacted LLM cache: evicted {result['evicted_entries']} entries ({result['evicted_bytes']} bytes)"
+        )
+        return result
+
+    def compact_llm_cache(self) -> dict[str, Any]:
+        """Synchronous version of acompact_llm_cache."""
+        return always_get_an_event_loop().run_until_complete(self.acompact_llm_cache())
+
     async def get_docs_by_status(
         self, status: DocStatus
     ) -> dict[str, DocProcessingStatus]:
@@ -2512,8 +2707,20 @@ class LightRAG:
                 # 5. Delete chunks from storage
                 if chunk_ids:
                     try:
+                        # Extraction results of deleted chunks are no longer needed to rebuild
+                        llm_cache_keys = set()
+                        if self.llm_cache_limiter is not None:
+                            for chunk in await self.text_chunks.get_by_ids(
+                                list(chunk_ids)
+                            ):
+                                if chunk:
+                                    llm_cache_keys.update(
+                                        chunk.get("llm_cache_list") or ()
+                                    )
                         await self.chunks_vdb.delete(chunk_ids)
                         await self.text_chunks.delete(chunk_ids)
+                        if llm_cache_keys:
+                            await self.llm_cache_limiter.unpin(llm_cache_keys)
 
                         async with pipeline_status_lock:
                             log_message = f"Successfully deleted {len(chunk_ids)} chunks from storage"
@@ -2666,6 +2873,7 @@ class LightRAG:
                 logger.debug(
                     f"No deletion operations were started for document {doc_id}, skipping persistence"
                 )
+            self._clear_semantic_query_cache()
 
     async def adelete_by_entity(self, entity_name: str) -> DeletionResult:
         """Asynchronously delete an entity and all its relationships.
@@ -2678,12 +2886,15 @@ class LightRAG:
         """
         from .utils_graph import adelete_by_entity
 
-        return await adelete_by_entity(
-            self.chunk_entity_relation_graph,
-            self.entities_vdb,
-            self.relationships_vdb,
-            entity_name,
-        )
+        try:
+            return await adelete_by_entity(
+                self.chunk_entity_relation_graph,
+                self.entities_vdb,
+                self.relationships_vdb,
+                entity_name,
+            )
+        finally:
+            self._clear_semantic_query_cache()
 
     def delete_by_entity(self, entity_name: str) -> DeletionResult:
         """Synchronously delete an entity and all its relationships.
@@ -2711,12 +2922,15 @@ class LightRAG:
         """
         from .utils_graph import adelete_by_relation
 
-        return await adelete_by_relation(
-            self.chunk_entity_relation_graph,
-            self.relationships_vdb,
-            source_entity,
-            target_entity,
-        )
+        try:
+            return await adelete_by_relation(
+                self.chunk_entity_relation_graph,
+                self.relationships_vdb,
+                source_entity,
+                target_entity,
+            )
+        finally:
+            self._clear_semantic_query_cache()
 
     def delete_by_relation(
         self, source_entity: str, target_entity: str
@@ -2800,14 +3014,17 @@ class LightRAG:
         """
         from .utils_graph import aedit_entity
 
-        return await aedit_entity(
-            self.chunk_entity_relation_graph,
-            self.entities_vdb,
-            self.relationships_vdb,
-            entity_name,
-            updated_data,
-            allow_rename,
-        )
+        try:
+            return await aedit_entity(
+                self.chunk_entity_relation_graph,
+                self.entities_vdb,
+                self.relationships_vdb,
+                entity_name,
+                updated_data,
+                allow_rename,
+            )
+        finally:
+            self._clear_semantic_query_cache()
 
     def edit_entity(
         self, entity_name: str, updated_data: dict[str, str], allow_rename: bool = True
@@ -2834,14 +3051,17 @@ class LightRAG:
         """
         from .utils_graph import aedit_relation
 
-        return await aedit_relation(
-            self.chunk_entity_relation_graph,
-            self.entities_vdb,
-            self.relationships_vdb,
-            source_entity,
-            target_entity,
-            updated_data,
-        )
+        try:
+            return await aedit_relation(
+                self.chunk_entity_relation_graph,
+                self.entities_vdb,
+                self.relationships_vdb,
+                source_entity,
+                target_entity,
+                updated_data,
+            )
+        finally:
+            self._clear_semantic_query_cache()
 
     def edit_relation(
         self, source_entity: str, target_entity: str, updated_data: dict[str, Any]
@@ -2867,13 +3087,16 @@ class LightRAG:
         """
         from .utils_graph import acreate_entity
 
-        return await acreate_entity(
-            self.chunk_entity_relation_graph,
-            self.entities_vdb,
-            self.relationships_vdb,
-            entity_name,
-            entity_data,
-        )
+        try:
+            return await acreate_entity(
+                self.chunk_entity_relation_graph,
+                self.entities_vdb,
+                self.relationships_vdb,
+                entity_name,
+                entity_data,
+            )
+        finally:
+            self._clear_semantic_query_cache()
 
     def create_entity(
         self, entity_name: str, entity_data: dict[str, Any]
@@ -2898,14 +3121,17 @@ class LightRAG:
         """
         from .utils_graph import acreate_relation
 
-        return await acreate_relation(
-            self.chunk_entity_relation_graph,
-            self.entities_vdb,
-            self.relationships_vdb,
-            source_entity,
-            target_entity,
-            relation_data,
-        )
+        try:
+            return await acreate_relation(
+                self.chunk_entity_relation_graph,
+                self.entities_vdb,
+                self.relationships_vdb,
+                source_entity,
+                target_entity,
+                relation_data,
+            )
+        finally:
+            self._clear_semantic_query_cache()
 
     def create_relation(
         self, source_entity: str, target_entity: str, relation_data: dict[str, Any]
@@ -2944,15 +3170,18 @@ class LightRAG:
         """
         from .utils_graph import amerge_entities
 
-        return await amerge_entities(
-            self.chunk_entity_relation_graph,
-            self.entities_vdb,
-            self.relationships_vdb,
-            source_entities,
-            target_entity,
-            merge_strategy,
-            target_entity_data,
-        )
+        try:
+            return await amerge_entities(
+                self.chunk_entity_relation_graph,
+                self.entities_vdb,
+                self.relationships_vdb,
+                source_entities,
+                target_entity,
+                merge_strategy,
+                target_entity_data,
+            )
+        finally:
+            self._clear_semantic_query_cache()
 
     def merge_entities(
         self,
@@ -2971,15 +3200,16 @@ class LightRAG:
     async def aexport_data(
         self,
         output_path: str,
-        file_format: Literal["csv", "excel", "md", "txt"] = "csv",
+        file_format: Literal["csv", "jsonl", "excel", "md", "txt"] = "csv",
         include_vector_data: bool = False,
     ) -> None:
         """
         Asynchronously exports all entities, relations, and relationships to various formats.
         Args:
             output_path: The path to the output file (including extension).
-            file_format: Output format - "csv", "excel", "md", "txt".
+            file_format: Output format - "csv", "jsonl", "excel", "md", "txt".
                 - csv: Comma-separated values file
+                - jsonl: One JSON object per line, tagged with its section
                 - excel: Microsoft Excel file with multiple sheets
                 - md: Markdown tables
                 - txt: Plain text formatted output
@@ -3000,15 +3230,16 @@ class LightRAG:
     def export_data(
         self,
         output_path: str,
-        file_format: Literal["csv", "excel", "md", "txt"] = "csv",
+        file_format: Literal["csv", "jsonl", "excel", "md", "txt"] = "csv",
         include_vector_data: bool = False,
     ) -> None:
         """
         Synchronously exports all entities, relations, and relationships to various formats.
         Args:
             output_path: The path to the output file (including extension).
-            file_format: Output format - "csv", "excel", "md", "txt".
+            file_format: Output format - "csv", "jsonl", "excel", "md", "txt".
                 - csv: Comma-separated values file
+                - jsonl: One JSON object per line, tagged with its section
                 - excel: Microsoft Excel file with multiple sheets
                 - md: Markdown tables
                 - txt: Plain text formatted output
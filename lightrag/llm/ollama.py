@@ -28,7 +28,28 @@ from lightrag.api import __api_version__
 
 import numpy as np
 from typing import Union
-from lightrag.utils import logger
+from lightrag.utils import logger, get_http_pool_kwargs, get_shared_client
+
+
+def get_ollama_async_client(
+    host: str | None = None,
+    timeout: float | None = None,
+    headers: dict[str, str] | None = None,
+) -> ollama.AsyncClient:
+    """Get a shared Ollama client for the given host, timeout and headers.
+
+    The client keeps a pooled httpx connection to the host across calls and is closed
+    once the last LightRAG instance of the event loop is finalized, or by
+    close_shared_clients(); callers must not close it.
+    """
+    key = ("ollama", host, timeout, tuple(sorted((headers or {}).items())))
+    return get_shared_client(
+        key,
+        lambda: ollama.AsyncClient(
+            host=host, timeout=timeout, headers=headers, **get_http_pool_kwargs()
+        ),
+        lambda client: client._client.aclose(),
+    )
 
 
 @retry(
@@ -65,64 +86,37 @@ async def _ollama_model_if_cache(
     if api_key:
         headers["Authorization"] = f"Bearer {api_key}"
 
-    ollama_client = ollama.AsyncClient(host=host, timeout=timeout, headers=headers)
+    ollama_client = get_ollama_async_client(host=host, timeout=timeout, headers=headers)
 
-    try:
-        messages = []
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
-        messages.extend(history_messages)
-        messages.append({"role": "user", "content": prompt})
-
-        response = await ollama_client.chat(model=model, messages=messages, **kwargs)
-        if stream:
-            """cannot cache stream response and process reasoning"""
-
-            async def inner():
-                try:
-                    async for chunk in response:
-                        yield chunk["message"]["content"]
-                except Exception as e:
-                    logger.error(f"Error in stream response: {str(e)}")
-                    raise
-                finally:
-                    try:
-                        await ollama_client._client.aclose()
-                        logger.debug("Successfully closed Ollama client for streaming")
-                    except Exception as close_error:
-                        logger.warning(f"Failed to close Ollama client: {close_error}")
-
-            return inner()
-        else:
-            model_response = response["message"]["content"]
-
-            """
-            If the model also wraps its thoughts in a specific tag,
-            this information is not needed for the final
-            response and can simply be trimmed.
-            """
-
-            return model_response
-    except Exception as e:
-        try:
-            await ollama_client._client.aclose()
-            logger.debug("Successfully closed Ollama client after exception")
-        except Exception as close_error:
-            logger.warning(
-                f"Failed to close Ollama client after exception: {close_error}"
-            )
-        raise e
-    finally:
-        if not stream:
+    messages = []
+    if system_prompt:
+        messages.append({"role": "system", "content": system_prompt})
+    messages.extend(history_messages)
+    messages.append({"role": "user", "content": prompt})
+
+    response = await ollama_client.chat(model=model, messages=messages, **kwargs)
+    if stream:
+        """cannot cache stream response and process reasoning"""
+
+        async def inner():
             try:
-                await ollama_client._client.aclose()
-                logger.debug(
-                    "Successfully closed Ollama client for non-streaming response"
-                )
-            except Exception as close_error:
-                logger.warning(
-                    f"Failed to close Ollama client in finally block: {close_error}"
-                )
+                async for chunk in response:
+                    yield chunk["message"]["content"]
+            except Exception as e:
+                logger.error(f"Error in stream response: {str(e)}")
+                raise
+
+        return inner()
+    else:
+        model_response = response["message"]["content"]
+
+        """
+        If the model also wraps its thoughts in a specific tag,
+        this information is not needed for the final
+        response and can simply be trimmed.
+        """
+
+        return model_response
 
 
 async def ollama_model_complete(
@@ -159,7 +153,7 @@ async def ollama_embed(texts: list[str], embed_model, **kwargs) -> np.ndarray:
     host = kwargs.pop("host", None)
     timeout = kwargs.pop("timeout", None)
 
-    ollama_client = ollama.AsyncClient(host=host, timeout=timeout, headers=headers)
+    ollama_client = get_ollama_async_client(host=host, timeout=timeout, headers=headers)
     try:
         options = kwargs.pop("options", {})
         data = await ollama_client.embed(
@@ -168,17 +162,4 @@ async def ollama_embed(texts: list[str], embed_model, **kwargs) -> np.ndarray:
         return np.array(data["embeddings"])
     except Exception as e:
         logger.error(f"Error in ollama_embed: {str(e)}")
-        try:
-            await ollama_client._client.aclose()
-            logger.debug("Successfully closed Ollama client after exception in embed")
-        except Exception as close_error:
-            logger.warning(
-                f"Failed to close Ollama client after exception in embed: {close_error}"
-            )
         raise e
-    finally:
-        try:
-            await ollama_client._client.aclose()
-            logger.debug("Successfully closed Ollama client after embed")
-        except Exception as close_error:
-            logger.warning(f"Failed to close Ollama client after embed: {close_error}")
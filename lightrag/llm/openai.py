@@ -15,6 +15,7 @@ if not pm.is_installed("openai"):
 
 from openai import (
     AsyncOpenAI,
+    DefaultAsyncHttpxClient,
     APIConnectionError,
     RateLimitError,
     APITimeoutError,
@@ -29,12 +30,15 @@ from lightrag.utils import (
     wrap_embedding_func_with_attrs,
     safe_unicode_decode,
     logger,
+    get_http_pool_kwargs,
+    get_shared_client,
 )
 from lightrag.types import GPTKeywordExtractionFormat
 from lightrag.api import __api_version__
 
 import numpy as np
 import base64
+import json
 from typing import Any, Union
 
 from dotenv import load_dotenv
@@ -96,6 +100,48 @@ def create_openai_async_client(
     return AsyncOpenAI(**merged_configs)
 
 
+def get_openai_async_client(
+    api_key: str | None = None,
+    base_url: str | None = None,
+    client_configs: dict[str, Any] = None,
+) -> AsyncOpenAI:
+    """Get a shared AsyncOpenAI client for the given configuration.
+
+    Clients are reused across calls with the same api_key, base_url and client_configs,
+    so requests share warm keep-alive connections from a pooled httpx client. They are
+    closed once the last LightRAG instance of the event loop is finalized, or by
+    close_shared_clients(); callers must not close them.
+
+    Args:
+        api_key: OpenAI API key. If None, uses the OPENAI_API_KEY environment variable.
+        base_url: Base URL for the OpenAI API. If None, uses the default OpenAI API URL.
+        client_configs: Additional configuration options for the AsyncOpenAI client.
+
+    Returns:
+        A shared AsyncOpenAI client instance.
+    """
+    client_configs = client_configs or {}
+    key = (
+        "openai",
+        api_key,
+        base_url,
+        json.dumps(client_configs, sort_keys=True, default=repr),
+    )
+
+    def factory() -> AsyncOpenAI:
+        configs = client_configs
+        if "http_client" not in configs:
+            configs = {
+                **configs,
+                "http_client": DefaultAsyncHttpxClient(**get_http_pool_kwargs()),
+            }
+        return create_openai_async_client(
+            api_key=api_key, base_url=base_url, client_configs=configs
+        )
+
+    return get_shared_client(key, factory, lambda client: client.close())
+
+
 @retry(
     stop=stop_after_attempt(3),
     wait=wait_exponential(multiplier=1, min=4, max=10),
@@ -176,8 +222,8 @@ async def openai_complete_if_cache(
     # Extract client configuration options
     client_configs = kwargs.pop("openai_client_configs", {})
 
-    # Create the OpenAI client
-    openai_async_client = create_openai_async_client(
+    # Get the shared OpenAI client
+    openai_async_client = get_openai_async_client(
         api_key=api_key,
         base_url=base_url,
         client_configs=client_configs,
@@ -202,7 +248,7 @@ async def openai_complete_if_cache(
     messages = kwargs.pop("messages", messages)
 
     try:
-        # Don't use async with context manager, use client directly
+        # The client is shared, don't close it after the call
         if "response_format" in kwargs:
             response = await openai_async_client.beta.chat.completions.parse(
                 model=model, messages=messages, **kwargs
@@ -213,21 +259,17 @@ async def openai_complete_if_cache(
             )
     except APIConnectionError as e:
         logger.error(f"OpenAI API Connection Error: {e}")
-        await openai_async_client.close()  # Ensure client is closed
         raise
     except RateLimitError as e:
         logger.error(f"OpenAI API Rate Limit Error: {e}")
-        await openai_async_client.close()  # Ensure client is closed
         raise
     except APITimeoutError as e:
         logger.error(f"OpenAI API Timeout Error: {e}")
-        await openai_async_client.close()  # Ensure client is closed
         raise
     except Exception as e:
         logger.error(
             f"OpenAI API Call Failed,\nModel: {model},\nParams: {kwargs}, Got: {e}"
         )
-        await openai_async_client.close()  # Ensure client is closed
         raise
 
     if hasattr(response, "__aiter__"):
@@ -346,8 +388,6 @@ async def openai_complete_if_cache(
                         logger.warning(
                             f"Failed to close stream response: {close_error}"
                         )
-                # Ensure client is closed in case of exception
-                await openai_async_client.close()
                 raise
             finally:
                 # Ensure resources are released even if no exception occurs
@@ -364,93 +404,72 @@ async def openai_complete_if_cache(
                             f"Failed to close stream response in finally block: {close_error}"
                         )
 
-                # This prevents resource leaks since the caller doesn't handle closing
-                try:
-                    await openai_async_client.close()
-                    logger.debug(
-                        "Successfully closed OpenAI client for streaming response"
-                    )
-                except Exception as client_close_error:
-                    logger.warning(
-                        f"Failed to close OpenAI client in streaming finally block: {client_close_error}"
-                    )
-
         return inner()
 
     else:
-        try:
-            if (
-                not response
-                or not response.choices
-                or not hasattr(response.choices[0], "message")
-            ):
-                logger.error("Invalid response from OpenAI API")
-                await openai_async_client.close()  # Ensure client is closed
-                raise InvalidResponseError("Invalid response from OpenAI API")
-
-            message = response.choices[0].message
-            content = getattr(message, "content", None)
-            reasoning_content = getattr(message, "reasoning_content", None)
-
-            # Handle COT logic for non-streaming responses (only if enabled)
-            final_content = ""
-
-            if enable_cot:
-                # Check if we should include reasoning content
-                should_include_reasoning = False
-                if reasoning_content and reasoning_content.strip():
-                    if not content or content.strip() == "":
-                        # Case 1: Only reasoning content, should include COT
-                        should_include_reasoning = True
-                        final_content = (
-                            content or ""
-                        )  # Use empty string if content is None
-                    else:
-                        # Case 3: Both content and reasoning_content present, ignore reasoning
-                        should_include_reasoning = False
-                        final_content = content
+        if (
+            not response
+            or not response.choices
+            or not hasattr(response.choices[0], "message")
+        ):
+            logger.error("Invalid response from OpenAI API")
+            raise InvalidResponseError("Invalid response from OpenAI API")
+
+        message = response.choices[0].message
+        content = getattr(message, "content", None)
+        reasoning_content = getattr(message, "reasoning_content", None)
+
+        # Handle COT logic for non-streaming responses (only if enabled)
+        final_content = ""
+
+        if enable_cot:
+            # Check if we should include reasoning content
+            should_include_reasoning = False
+            if reasoning_content and reasoning_content.strip():
+                if not content or content.strip() == "":
+                    # Case 1: Only reasoning content, should include COT
+                    should_include_reasoning = True
+                    final_content = content or ""  # Use empty string if content is None
                 else:
-                    # No reasoning content, use regular content
-                    final_content = content or ""
-
-                # Apply COT wrapping if needed
-                if should_include_reasoning:
-                    if r"\u" in reasoning_content:
-                        reasoning_content = safe_unicode_decode(
-                            reasoning_content.encode("utf-8")
-                        )
-                    final_content = f"<think>{reasoning_content}</think>{final_content}"
+                    # Case 3: Both content and reasoning_content present, ignore reasoning
+                    should_include_reasoning = False
+                    final_content = content
             else:
-                # COT disabled, only use regular content
+                # No reasoning content, use regular content
                 final_content = content or ""
 
-            # Validate final content
-            if not final_content or final_content.strip() == "":
-                logger.error("Received empty content from OpenAI API")
-                await openai_async_client.close()  # Ensure client is closed
-                raise InvalidResponseError("Received empty content from OpenAI API")
+            # Apply COT wrapping if needed
+            if should_include_reasoning:
+                if r"\u" in reasoning_content:
+                    reasoning_content = safe_unicode_decode(
+                        reasoning_content.encode("utf-8")
+                    )
+                final_content = f"<think>{reasoning_content}</think>{final_content}"
+        else:
+            # COT disabled, only use regular content
+            final_content = content or ""
 
-            # Apply Unicode decoding to final content if needed
-            if r"\u" in final_content:
-                final_content = safe_unicode_decode(final_content.encode("utf-8"))
+        # Validate final content
+        if not final_content or final_content.strip() == "":
+            logger.error("Received empty content from OpenAI API")
+            raise InvalidResponseError("Received empty content from OpenAI API")
 
-            if token_tracker and hasattr(response, "usage"):
-                token_counts = {
-                    "prompt_tokens": getattr(response.usage, "prompt_tokens", 0),
-                    "completion_tokens": getattr(
-                        response.usage, "completion_tokens", 0
-                    ),
-                    "total_tokens": getattr(response.usage, "total_tokens", 0),
-                }
-                token_tracker.add_usage(token_counts)
+        # Apply Unicode decoding to final content if needed
+        if r"\u" in final_content:
+            final_content = safe_unicode_decode(final_content.encode("utf-8"))
 
-            logger.debug(f"Response content len: {len(final_content)}")
-            verbose_debug(f"Response: {response}")
+        if token_tracker and hasattr(response, "usage"):
+            token_counts = {
+                "prompt_tokens": getattr(response.usage, "prompt_tokens", 0),
+                "completion_tokens": getattr(response.usage, "completion_tokens", 0),
+                "total_tokens": getattr(response.usage, "total_tokens", 0),
+            }
+            token_tracker.add_usage(token_counts)
 
-            return final_content
-        finally:
-            # Ensure client is closed in all cases for non-streaming responses
-            await openai_async_client.close()
+        logger.debug(f"Response content len: {len(final_content)}")
+        verbose_debug(f"Response: {response}")
+
+        return final_content
 
 
 async def openai_complete(
@@ -580,20 +599,19 @@ async def openai_embed(
         RateLimitError: If the OpenAI API rate limit is exceeded.
         APITimeoutError: If the OpenAI API request times out.
     """
-    # Create the OpenAI client
-    openai_async_client = create_openai_async_client(
+    # Get the shared OpenAI client
+    openai_async_client = get_openai_async_client(
         api_key=api_key, base_url=base_url, client_configs=client_configs
     )
 
-    async with openai_async_client:
-        response = await openai_async_client.embeddings.create(
-            model=model, input=texts, encoding_format="base64"
-        )
-        return np.array(
-            [
-                np.array(dp.embedding, dtype=np.float32)
-                if isinstance(dp.embedding, list)
-                else np.frombuffer(base64.b64decode(dp.embedding), dtype=np.float32)
-                for dp in response.data
-            ]
-        )
+    response = await openai_async_client.embeddings.create(
+        model=model, input=texts, encoding_format="base64"
+    )
+    return np.array(
+        [
+            np.array(dp.embedding, dtype=np.float32)
+            if isinstance(dp.embedding, list)
+            else np.frombuffer(base64.b64decode(dp.embedding), dtype=np.float32)
+            for dp in response.data
+        ]
+    )
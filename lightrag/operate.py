@@ -1,16 +1,20 @@
 from __future__ import annotations
+from abc import ABC, abstractmethod
 from functools import partial
 
 import asyncio
+import heapq
+import itertools
 import json
 import json_repair
-from typing import Any, AsyncIterator, overload, Literal
+from typing import Any, AsyncIterator, Callable, Iterator, overload, Literal
 from collections import Counter, defaultdict
 
 from .utils import (
     logger,
     compute_mdhash_id,
     Tokenizer,
+    TokenizerPool,
     is_float_regex,
     sanitize_and_normalize_extracted_text,
     pack_user_ass_to_openai_messages,
@@ -31,6 +35,7 @@ from .utils import (
     create_prefixed_exception,
     fix_tuple_delimiter_corruption,
     _convert_to_user_format,
+    SemanticQueryCache,
 )
 from .base import (
     BaseGraphStorage,
@@ -42,6 +47,7 @@ from .base import (
 from .prompt import PROMPTS
 from .constants import (
     GRAPH_FIELD_SEP,
+    CHUNKING_BLOCK_CHARS,
     DEFAULT_MAX_ENTITY_TOKENS,
     DEFAULT_MAX_RELATION_TOKENS,
     DEFAULT_MAX_TOTAL_TOKENS,
@@ -49,6 +55,7 @@ from .constants import (
     DEFAULT_KG_CHUNK_PICK_METHOD,
     DEFAULT_ENTITY_TYPES,
     DEFAULT_SUMMARY_LANGUAGE,
+    DEFAULT_GRAPH_UPSERT_BATCH_SIZE,
 )
 from .kg.shared_storage import get_storage_keyed_lock
 import time
@@ -60,6 +67,125 @@ from dotenv import load_dotenv
 load_dotenv(dotenv_path=".env", override=False)
 
 
+def _iter_split(content: str, separator: str) -> Iterator[str]:
+    """Lazy equivalent of content.split(separator)"""
+    start = 0
+    while True:
+        pos = content.find(separator, start)
+        if pos == -1:
+            yield content[start:]
+            return
+        yield content[start:pos]
+        start = pos + len(separator)
+
+
+def _iter_token_blocks(
+    tokenizer: Tokenizer, content: str
+) -> Iterator[tuple[int, list[int]]]:
+    """Tokenize content incrementally, one block of about CHUNKING_BLOCK_CHARS at a time.
+
+    Blocks are cut at the start of a whitespace run so tokens rarely straddle a cut.
+    Yields (character offset of the block in content, block tokens).
+    """
+    start = 0
+    while start < len(content):
+        end = min(start + CHUNKING_BLOCK_CHARS, len(content))
+        if end < len(content):
+            cut = max(content.rfind(" ", start, end), content.rfind("\n", start, end))
+            while cut > start and content[cut - 1].isspace():
+                cut -= 1
+            if cut > start:
+                end = cut
+        yield start, tokenizer.encode(content[start:end])
+        start = end
+
+
+def _iter_token_windows(
+    tokenizer: Tokenizer,
+    content: str,
+    overlap_token_size: int,
+    max_token_size: int,
+    keep_if_fits: bool = False,
+) -> Iterator[tuple[int, str]]:
+    """Yield (token count, text) windows of max_token_size tokens overlapping by overlap_token_size.
+
+    Window text is sliced out of content by character offsets. The offset of each
+    window boundary is found by decoding the tokens since the previous boundary, so
+    every token is decoded once instead of once per window it belongs to. Windows
+    whose boundaries split a character fall back to decoding the window tokens.
+    With keep_if_fits, content that fits in one window is yielded unchanged.
+    """
+    step = max_token_size - overlap_token_size
+    if step <= 0:
+        raise ValueError("overlap_token_size must be smaller than max_token_size")
+
+    # Tokens from absolute token index `base` on
+    tokens: list[int] = []
+    base = 0
+    # Character offsets of window boundaries (None if inside a character), by token index
+    offsets: dict[int, int | None] = {0: 0}
+    last_point = 0
+    # Token index and character offset where each block starts, always exact
+    block_starts: list[tuple[int, int]] = []
+    # Window starts and ends, in increasing order
+    boundaries = heapq.merge(
+        itertools.count(step, step), itertools.count(max_token_size, step)
+    )
+    next_boundary = next(boundaries)
+
+    def offset_at(point: int) -> int | None:
+        nonlocal last_point, next_boundary
+        while last_point < point:
+            target = min(next_boundary, point)
+            prev, prev_offset = last_point, offsets[last_point]
+            for block_index, block_offset in block_starts:
+                if last_point < block_index <= target:
+                    prev, prev_offset = block_index, block_offset
+            if prev < target and prev_offset is not None:
+                piece = tokenizer.decode(tokens[prev - base : target - base])
+                if content.startswith(piece, prev_offset):
+                    prev_offset += len(piece)
+                else:
+                    prev_offset = None
+            elif prev < target:
+                prev_offset = None
+            offsets[target] = prev_offset
+            last_point = target
+            while next_boundary <= last_point:
+                next_boundary = next(boundaries)
+        return offsets[point]
+
+    def window(start: int, end: int) -> tuple[int, str]:
+        start_offset, end_offset = offset_at(start), offset_at(end)
+        if start_offset is None or end_offset is None:
+            return end - start, tokenizer.decode(tokens[start - base : end - base])
+        return end - start, content[start_offset:end_offset]
+
+    total = 0
+    start = 0
+    for block_offset, block_tokens in _iter_token_blocks(tokenizer, content):
+        block_starts.append((total, block_offset))
+        tokens.extend(block_tokens)
+        total += len(block_tokens)
+        # Only full windows are certain before the rest of content is tokenized
+        while total - start > max_token_size:
+            yield window(start, start + max_token_size)
+            start += step
+        # Drop tokens and bookkeeping no later window can reach
+        del tokens[: start - base]
+        base = start
+        offsets = {k: v for k, v in offsets.items() if k >= start}
+        block_starts = [b for b in block_starts if b[0] > last_point]
+
+    if keep_if_fits and start == 0 and total <= max_token_size:
+        yield total, content
+        return
+    # The end of content is an exact boundary for the final windows
+    block_starts.append((total, len(content)))
+    for start in range(start, total, step):
+        yield window(start, min(start + max_token_size, total))
+
+
 def chunking_by_token_size(
     tokenizer: Tokenizer,
     content: str,
@@ -67,52 +193,40 @@ def chunking_by_token_size(
     split_by_character_only: bool = False,
     overlap_token_size: int = 128,
     max_token_size: int = 1024,
-) -> list[dict[str, Any]]:
-    tokens = tokenizer.encode(content)
-    results: list[dict[str, Any]] = []
-    if split_by_character:
-        raw_chunks = content.split(split_by_character)
-        new_chunks = []
-        if split_by_character_only:
-            for chunk in raw_chunks:
-                _tokens = tokenizer.encode(chunk)
-                new_chunks.append((len(_tokens), chunk))
-        else:
-            for chunk in raw_chunks:
-                _tokens = tokenizer.encode(chunk)
-                if len(_tokens) > max_token_size:
-                    for start in range(
-                        0, len(_tokens), max_token_size - overlap_token_size
-                    ):
-                        chunk_content = tokenizer.decode(
-                            _tokens[start : start + max_token_size]
-                        )
-                        new_chunks.append(
-                            (min(max_token_size, len(_tokens) - start), chunk_content)
-                        )
-                else:
-                    new_chunks.append((len(_tokens), chunk))
-        for index, (_len, chunk) in enumerate(new_chunks):
-            results.append(
-                {
-                    "tokens": _len,
-                    "content": chunk.strip(),
-                    "chunk_order_index": index,
-                }
+) -> Iterator[dict[str, Any]]:
+    """Split content into chunks of at most max_token_size tokens.
+
+    Chunks are yielded as they are produced, content is tokenized block by block
+    instead of all at once so memory stays bounded for very large documents.
+    """
+    if split_by_character and split_by_character_only:
+        pieces = (
+            (len(tokenizer.encode(chunk)), chunk)
+            for chunk in _iter_split(content, split_by_character)
+        )
+    elif split_by_character:
+        pieces = (
+            window
+            for chunk in _iter_split(content, split_by_character)
+            for window in _iter_token_windows(
+                tokenizer,
+                chunk,
+                overlap_token_size,
+                max_token_size,
+                keep_if_fits=True,
             )
+        )
     else:
-        for index, start in enumerate(
-            range(0, len(tokens), max_token_size - overlap_token_size)
-        ):
-            chunk_content = tokenizer.decode(tokens[start : start + max_token_size])
-            results.append(
-                {
-                    "tokens": min(max_token_size, len(tokens) - start),
-                    "content": chunk_content.strip(),
-                    "chunk_order_index": index,
-                }
-            )
-    return results
+        pieces = _iter_token_windows(
+            tokenizer, content, overlap_token_size, max_token_size
+        )
+
+    for index, (_len, chunk) in enumerate(pieces):
+        yield {
+            "tokens": _len,
+            "content": chunk.strip(),
+            "chunk_order_index": index,
+        }
 
 
 async def _handle_entity_relation_summary(
@@ -1284,6 +1398,119 @@ async def _rebuild_single_relationship(
         raise  # Re-raise exception
 
 
+class _GroupCommitWriter(ABC):
+    """Group commit of writes from concurrent merge tasks
+
+    write() queues the data and returns once it is flushed together with the data
+    queued by other tasks. Tasks keep their keyed locks and semaphore slot while
+    waiting, so concurrent merges of the same entity still see each other's writes.
+    Subclasses queue data before calling _submit() and write it in _commit().
+    """
+
+    def __init__(self):
+        self._waiters: list[asyncio.Future] = []
+        self._flusher: asyncio.Task | None = None
+
+    async def _submit(self) -> None:
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush())
+        await waiter
+
+    @abstractmethod
+    def _take_pending(self) -> Any:
+        """Return the queued data and reset the queue"""
+
+    @abstractmethod
+    async def _commit(self, pending: Any) -> None:
+        """Write data returned by _take_pending()"""
+
+    async def _flush(self) -> None:
+        # Let tasks that are ready in the same loop iteration join the first batch
+        await asyncio.sleep(0)
+        while self._waiters:
+            pending = self._take_pending()
+            waiters, self._waiters = self._waiters, []
+            try:
+                await self._commit(pending)
+            except Exception as e:
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_exception(e)
+            else:
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_result(None)
+
+
+class _GraphWriteBatcher(_GroupCommitWriter):
+    """Flush node and edge upserts through upsert_nodes_batch/upsert_edges_batch
+
+    Nodes of a flush are written before its edges.
+    """
+
+    def __init__(
+        self,
+        graph: BaseGraphStorage,
+        batch_size: int = DEFAULT_GRAPH_UPSERT_BATCH_SIZE,
+    ):
+        super().__init__()
+        self._graph = graph
+        self._batch_size = max(1, batch_size)
+        self._nodes: dict[str, dict] = {}
+        self._edges: dict[tuple[str, str], dict] = {}
+
+    async def write(
+        self,
+        nodes: list[tuple[str, dict]] | None = None,
+        edges: list[tuple[str, str, dict]] | None = None,
+    ) -> None:
+        for node_id, node_data in nodes or []:
+            self._nodes[node_id] = node_data
+        for src_id, tgt_id, edge_data in edges or []:
+            self._edges[(src_id, tgt_id)] = edge_data
+        await self._submit()
+
+    def _take_pending(self) -> tuple[list, list]:
+        nodes, self._nodes = list(self._nodes.items()), {}
+        edges = [(src, tgt, data) for (src, tgt), data in self._edges.items()]
+        self._edges = {}
+        return nodes, edges
+
+    async def _commit(self, pending: tuple[list, list]) -> None:
+        nodes, edges = pending
+        for i in range(0, len(nodes), self._batch_size):
+            await self._graph.upsert_nodes_batch(nodes[i : i + self._batch_size])
+        for i in range(0, len(edges), self._batch_size):
+            await self._graph.upsert_edges_batch(edges[i : i + self._batch_size])
+
+
+class _VectorWriteBatcher(_GroupCommitWriter):
+    """Flush vector upserts in batches of up to batch_size records
+
+    Records queued under the same id are coalesced, the latest one is written.
+    """
+
+    def __init__(self, vdb: BaseVectorStorage, batch_size: int):
+        super().__init__()
+        self._vdb = vdb
+        self._batch_size = max(1, batch_size)
+        self._data: dict[str, dict] = {}
+
+    async def write(self, data: dict[str, dict]) -> None:
+        self._data.update(data)
+        await self._submit()
+
+    def _take_pending(self) -> list[tuple[str, dict]]:
+        data, self._data = list(self._data.items()), {}
+        return data
+
+    async def _commit(self, pending: list[tuple[str, dict]]) -> None:
+        for i in range(0, len(pending), self._batch_size):
+            await self._vdb.upsert(dict(pending[i : i + self._batch_size]))
+
+
 async def _merge_nodes_then_upsert(
     entity_name: str,
     nodes_data: list[dict],
@@ -1292,6 +1519,7 @@ async def _merge_nodes_then_upsert(
     pipeline_status: dict = None,
     pipeline_status_lock=None,
     llm_response_cache: BaseKVStorage | None = None,
+    graph_writer: _GraphWriteBatcher | None = None,
 ):
     """Get existing nodes from knowledge graph use name,if exists, merge data, else create, then upsert."""
     already_entity_types = []
@@ -1381,11 +1609,14 @@ async def _merge_nodes_then_upsert(
         file_path=file_path,
         created_at=int(time.time()),
     )
-    await knowledge_graph_inst.upsert_node(
-        entity_name,
-        node_data=node_data,
-    )
-    node_data["entity_name"] = entity_name
+    if graph_writer is not None:
+        await graph_writer.write(nodes=[(entity_name, node_data)])
+    else:
+        await knowledge_graph_inst.upsert_node(
+            entity_name,
+            node_data=node_data,
+        )
+    node_data = dict(node_data, entity_name=entity_name)
     return node_data
 
 
@@ -1399,6 +1630,7 @@ async def _merge_edges_then_upsert(
     pipeline_status_lock=None,
     llm_response_cache: BaseKVStorage | None = None,
     added_entities: list = None,  # New parameter to track entities added during edge processing
+    graph_writer: _GraphWriteBatcher | None = None,
 ):
     if src_id == tgt_id:
         return None
@@ -1523,6 +1755,7 @@ async def _merge_edges_then_upsert(
     )
     file_path = build_file_path(already_file_paths, edges_data, f"{src_id}-{tgt_id}")
 
+    missing_nodes = []
     for need_insert_id in [src_id, tgt_id]:
         if not (await knowledge_graph_inst.has_node(need_insert_id)):
             node_data = {
@@ -1533,7 +1766,7 @@ async def _merge_edges_then_upsert(
                 "file_path": file_path,
                 "created_at": int(time.time()),
             }
-            await knowledge_graph_inst.upsert_node(need_insert_id, node_data=node_data)
+            missing_nodes.append((need_insert_id, node_data))
 
             # Track entities added during edge processing
             if added_entities is not None:
@@ -1547,18 +1780,25 @@ async def _merge_edges_then_upsert(
                 }
                 added_entities.append(entity_data)
 
-    await knowledge_graph_inst.upsert_edge(
-        src_id,
-        tgt_id,
-        edge_data=dict(
-            weight=weight,
-            description=description,
-            keywords=keywords,
-            source_id=source_id,
-            file_path=file_path,
-            created_at=int(time.time()),
-        ),
+    graph_edge_data = dict(
+        weight=weight,
+        description=description,
+        keywords=keywords,
+        source_id=source_id,
+        file_path=file_path,
+        created_at=int(time.time()),
     )
+    if graph_writer is not None:
+        # Missing nodes are flushed before the edge that needs them
+        await graph_writer.write(
+            nodes=missing_nodes, edges=[(src_id, tgt_id, graph_edge_data)]
+        )
+    else:
+        for need_insert_id, node_data in missing_nodes:
+            await knowledge_graph_inst.upsert_node(need_insert_id, node_data=node_data)
+        await knowledge_graph_inst.upsert_edge(
+            src_id, tgt_id, edge_data=graph_edge_data
+        )
 
     edge_data = dict(
         src_id=src_id,
@@ -1639,6 +1879,17 @@ async def merge_nodes_and_edges(
     # Get max async tasks limit from global_config for semaphore control
     graph_max_async = global_config.get("llm_model_max_async", 4) * 2
     semaphore = asyncio.Semaphore(graph_max_async)
+    # Graph and vector writes of concurrent tasks are flushed together in batches
+    graph_writer = _GraphWriteBatcher(knowledge_graph_inst)
+    embedding_batch_num = global_config.get("embedding_batch_num", 10)
+    entity_vdb_writer = (
+        _VectorWriteBatcher(entity_vdb, embedding_batch_num) if entity_vdb else None
+    )
+    relationships_vdb_writer = (
+        _VectorWriteBatcher(relationships_vdb, embedding_batch_num)
+        if relationships_vdb
+        else None
+    )
 
     # ===== Phase 1: Process all entities concurrently =====
     log_message = f"Phase 1: Processing {total_entities_count} entities from {doc_id} (async: {graph_max_async})"
@@ -1664,6 +1915,7 @@ async def merge_nodes_and_edges(
                         pipeline_status,
                         pipeline_status_lock,
                         llm_response_cache,
+                        graph_writer=graph_writer,
                     )
 
                     # Vector database operation (equally critical, must succeed)
@@ -1684,7 +1936,7 @@ async def merge_nodes_and_edges(
 
                         # Use safe operation wrapper - VDB failure must throw exception
                         await safe_vdb_operation_with_exception(
-                            operation=lambda: entity_vdb.upsert(data_for_vdb),
+                            operation=lambda: entity_vdb_writer.write(data_for_vdb),
                             operation_name="entity_upsert",
                             entity_name=entity_name,
                             max_retries=3,
@@ -1795,6 +2047,7 @@ async def merge_nodes_and_edges(
                         pipeline_status_lock,
                         llm_response_cache,
                         added_entities,  # Pass list to collect added entities
+                        graph_writer=graph_writer,
                     )
 
                     if edge_data is None:
@@ -1820,7 +2073,9 @@ async def merge_nodes_and_edges(
 
                         # Use safe operation wrapper - VDB failure must throw exception
                         await safe_vdb_operation_with_exception(
-                            operation=lambda: relationships_vdb.upsert(data_for_vdb),
+                            operation=lambda: relationships_vdb_writer.write(
+                                data_for_vdb
+                            ),
                             operation_name="relationship_upsert",
                             entity_name=f"{edge_data['src_id']}-{edge_data['tgt_id']}",
                             max_retries=3,
@@ -1849,7 +2104,9 @@ async def merge_nodes_and_edges(
 
                             # Use safe operation wrapper - VDB failure must throw exception
                             await safe_vdb_operation_with_exception(
-                                operation=lambda data=vdb_data: entity_vdb.upsert(data),
+                                operation=lambda data=vdb_data: entity_vdb_writer.write(
+                                    data
+                                ),
                                 operation_name="added_entity_upsert",
                                 entity_name=entity_data["entity_name"],
                                 max_retries=3,
@@ -2233,6 +2490,42 @@ async def extract_entities(
     return chunk_results
 
 
+def _semantic_cache_scope(
+    query_param: QueryParam,
+    global_config: dict[str, str],
+    system_prompt: str | None,
+    return_raw_data: bool,
+) -> tuple[SemanticQueryCache | None, str]:
+    """Return the semantic query cache and the scope of this query, or (None, "") when it does not apply
+
+    Only complete answers without conversation history are shared between similar queries.
+    """
+    cache = global_config.get("semantic_query_cache")
+    if (
+        cache is None
+        or return_raw_data
+        or query_param.only_need_context
+        or query_param.only_need_prompt
+        or query_param.conversation_history
+    ):
+        return None, ""
+    scope = compute_args_hash(
+        query_param.mode,
+        query_param.response_type,
+        query_param.top_k,
+        query_param.chunk_top_k,
+        query_param.max_entity_tokens,
+        query_param.max_relation_tokens,
+        query_param.max_total_tokens,
+        query_param.hl_keywords or [],
+        query_param.ll_keywords or [],
+        query_param.user_prompt or "",
+        query_param.enable_rerank,
+        system_prompt or "",
+    )
+    return cache, scope
+
+
 @overload
 async def kg_query(
     query: str,
@@ -2311,6 +2604,18 @@ async def kg_query(
         if not query_param.only_need_context and not query_param.only_need_prompt:
             return cached_response
 
+    semantic_cache, semantic_scope = _semantic_cache_scope(
+        query_param, global_config, system_prompt, return_raw_data
+    )
+    # Embedded by the semantic cache lookup, reused for retrieval on a miss
+    query_embedding = None
+    if semantic_cache is not None:
+        cached_response, query_embedding = await semantic_cache.lookup(
+            semantic_scope, query
+        )
+        if cached_response is not None:
+            return cached_response
+
     hl_keywords, ll_keywords = await get_keywords_from_query(
         query, query_param, global_config, hashing_kv
     )
@@ -2346,6 +2651,7 @@ async def kg_query(
             query_param,
             chunks_vdb,
             return_raw_data=True,
+            query_embedding=query_embedding,
         )
 
         if isinstance(context_result, tuple):
@@ -2371,6 +2677,7 @@ async def kg_query(
         text_chunks_db,
         query_param,
         chunks_vdb,
+        query_embedding=query_embedding,
     )
 
     if query_param.only_need_context and not query_param.only_need_prompt:
@@ -2418,6 +2725,9 @@ async def kg_query(
             .strip()
         )
 
+    if semantic_cache is not None and isinstance(response, str) and response:
+        semantic_cache.insert(semantic_scope, query, query_embedding, response)
+
     if hashing_kv.global_config.get("enable_llm_cache"):
         # Save to cache with query parameters
         queryparam_dict = {
@@ -2660,95 +2970,107 @@ async def _perform_kg_search(
     text_chunks_db: BaseKVStorage,
     query_param: QueryParam,
     chunks_vdb: BaseVectorStorage = None,
+    query_embedding=None,
 ) -> dict[str, Any]:
     """
     Pure search logic that retrieves raw entities, relations, and vector chunks.
     No token truncation or formatting - just raw search results.
+    query_embedding is an optional pre-computed embedding of query.
     """
 
-    # Initialize result containers
-    local_entities = []
-    local_relations = []
-    global_entities = []
-    global_relations = []
-    vector_chunks = []
-    chunk_tracking = {}
-
-    # Handle different query modes
-
     # Track chunk sources and metadata for final logging
     chunk_tracking = {}  # chunk_id -> {source, frequency, order}
 
-    # Pre-compute query embedding once for all vector operations
+    # Decide which searches run for this mode, local and global modes fall back to
+    # searching with whatever keywords exist when their own keywords are empty
+    local_only = query_param.mode == "local" and len(ll_keywords) > 0
+    global_only = query_param.mode == "global" and len(hl_keywords) > 0
+    run_local = len(ll_keywords) > 0 and not global_only
+    run_global = len(hl_keywords) > 0 and not local_only
+    run_vector = query_param.mode == "mix" and chunks_vdb is not None
+
+    # Embed the query and keywords in a single batch for all vector operations
     kg_chunk_pick_method = text_chunks_db.global_config.get(
         "kg_chunk_pick_method", DEFAULT_KG_CHUNK_PICK_METHOD
     )
-    query_embedding = None
-    if query and (kg_chunk_pick_method == "VECTOR" or chunks_vdb):
-        embedding_func_config = text_chunks_db.embedding_func
-        if embedding_func_config and embedding_func_config.func:
-            try:
-                query_embedding = await embedding_func_config.func([query])
-                query_embedding = query_embedding[
-                    0
-                ]  # Extract first embedding from batch result
-                logger.debug("Pre-computed query embedding for all vector operations")
-            except Exception as e:
-                logger.warning(f"Failed to pre-compute query embedding: {e}")
-                query_embedding = None
+    embedding_inputs = {}
+    if (
+        query
+        and query_embedding is None
+        and (kg_chunk_pick_method == "VECTOR" or chunks_vdb)
+    ):
+        embedding_inputs["query"] = query
+    if run_local:
+        embedding_inputs["ll_keywords"] = ll_keywords
+    if run_global:
+        embedding_inputs["hl_keywords"] = hl_keywords
+
+    embeddings = {}
+    # The storage's embedding_func is the concurrency-limited wrapper
+    embedding_func = text_chunks_db.embedding_func
+    if embedding_inputs and embedding_func is not None:
+        try:
+            batch_embeddings = await embedding_func(
+                list(embedding_inputs.values()), _priority=5
+            )  # higher priority for query
+            embeddings = dict(zip(embedding_inputs, batch_embeddings))
+            logger.debug(
+                f"Pre-computed {len(embeddings)} embeddings for all vector operations"
+            )
+        except Exception as e:
+            # Each vector storage embeds its own query instead
+            logger.warning(f"Failed to pre-compute query embeddings: {e}")
+    if query_embedding is None:
+        query_embedding = embeddings.get("query")
 
-    # Handle local and global modes
-    if query_param.mode == "local" and len(ll_keywords) > 0:
-        local_entities, local_relations = await _get_node_data(
+    async def _skipped(result):
+        return result
+
+    # Run local, global and vector searches concurrently
+    (
+        (local_entities, local_relations),
+        (global_relations, global_entities),
+        vector_chunks,
+    ) = await asyncio.gather(
+        _get_node_data(
             ll_keywords,
             knowledge_graph_inst,
             entities_vdb,
             query_param,
+            embeddings.get("ll_keywords"),
         )
-
-    elif query_param.mode == "global" and len(hl_keywords) > 0:
-        global_relations, global_entities = await _get_edge_data(
+        if run_local
+        else _skipped(([], [])),
+        _get_edge_data(
             hl_keywords,
             knowledge_graph_inst,
             relationships_vdb,
             query_param,
+            embeddings.get("hl_keywords"),
         )
+        if run_global
+        else _skipped(([], [])),
+        _get_vector_context(
+            query,
+            chunks_vdb,
+            query_param,
+            query_embedding,
+        )
+        if run_vector
+        else _skipped([]),
+    )
 
-    else:  # hybrid or mix mode
-        if len(ll_keywords) > 0:
-            local_entities, local_relations = await _get_node_data(
-                ll_keywords,
-                knowledge_graph_inst,
-                entities_vdb,
-                query_param,
-            )
-        if len(hl_keywords) > 0:
-            global_relations, global_entities = await _get_edge_data(
-                hl_keywords,
-                knowledge_graph_inst,
-                relationships_vdb,
-                query_param,
-            )
-
-        # Get vector chunks for mix mode
-        if query_param.mode == "mix" and chunks_vdb:
-            vector_chunks = await _get_vector_context(
-                query,
-                chunks_vdb,
-                query_param,
-                query_embedding,
-            )
-            # Track vector chunks with source metadata
-            for i, chunk in enumerate(vector_chunks):
-                chunk_id = chunk.get("chunk_id") or chunk.get("id")
-                if chunk_id:
-                    chunk_tracking[chunk_id] = {
-                        "source": "C",
-                        "frequency": 1,  # Vector chunks always have frequency 1
-                        "order": i + 1,  # 1-based order in vector search results
-                    }
-                else:
-                    logger.warning(f"Vector chunk missing chunk_id: {chunk}")
+    # Track vector chunks with source metadata
+    for i, chunk in enumerate(vector_chunks):
+        chunk_id = chunk.get("chunk_id") or chunk.get("id")
+        if chunk_id:
+            chunk_tracking[chunk_id] = {
+                "source": "C",
+                "frequency": 1,  # Vector chunks always have frequency 1
+                "order": i + 1,  # 1-based order in vector search results
+            }
+        else:
+            logger.warning(f"Vector chunk missing chunk_id: {chunk}")
 
     # Round-robin merge entities
     final_entities = []
@@ -2819,6 +3141,23 @@ async def _perform_kg_search(
     }
 
 
+async def _truncate_list_by_token_size(
+    list_data: list[Any],
+    key: Callable[[Any], str],
+    max_token_size: int,
+    tokenizer: Tokenizer,
+    tokenizer_pool: TokenizerPool | None = None,
+) -> list[Any]:
+    """Truncate a list by token size, in the tokenizer pool if one is configured"""
+    if tokenizer_pool is None:
+        return truncate_list_by_token_size(
+            list_data, key=key, max_token_size=max_token_size, tokenizer=tokenizer
+        )
+    return await tokenizer_pool.truncate_list_by_token_size(
+        list_data, key=key, max_token_size=max_token_size
+    )
+
+
 async def _apply_token_truncation(
     search_result: dict[str, Any],
     query_param: QueryParam,
@@ -2924,13 +3263,14 @@ async def _apply_token_truncation(
             entity_copy.pop("created_at", None)
             entities_context_for_truncation.append(entity_copy)
 
-        entities_context = truncate_list_by_token_size(
+        entities_context = await _truncate_list_by_token_size(
             entities_context_for_truncation,
             key=lambda x: "\n".join(
                 json.dumps(item, ensure_ascii=False) for item in [x]
             ),
             max_token_size=max_entity_tokens,
             tokenizer=tokenizer,
+            tokenizer_pool=global_config.get("tokenizer_pool"),
         )
 
     if relations_context:
@@ -2942,13 +3282,14 @@ async def _apply_token_truncation(
             relation_copy.pop("created_at", None)
             relations_context_for_truncation.append(relation_copy)
 
-        relations_context = truncate_list_by_token_size(
+        relations_context = await _truncate_list_by_token_size(
             relations_context_for_truncation,
             key=lambda x: "\n".join(
                 json.dumps(item, ensure_ascii=False) for item in [x]
             ),
             max_token_size=max_relation_tokens,
             tokenizer=tokenizer,
+            tokenizer_pool=global_config.get("tokenizer_pool"),
         )
 
     logger.info(
@@ -3360,10 +3701,13 @@ async def _build_query_context(
     query_param: QueryParam,
     chunks_vdb: BaseVectorStorage = None,
     return_raw_data: bool = False,
+    query_embedding=None,
 ) -> str | tuple[str, dict[str, Any]]:
     """
     Main query context building function using the new 4-stage architecture:
     1. Search -> 2. Truncate -> 3. Merge chunks -> 4. Build LLM context
+
+    query_embedding is an optional pre-computed embedding of query.
     """
 
     if not query:
@@ -3381,6 +3725,7 @@ async def _build_query_context(
         text_chunks_db,
         query_param,
         chunks_vdb,
+        query_embedding,
     )
 
     if not search_result["final_entities"] and not search_result["final_relations"]:
@@ -3487,13 +3832,16 @@ async def _get_node_data(
     knowledge_graph_inst: BaseGraphStorage,
     entities_vdb: BaseVectorStorage,
     query_param: QueryParam,
+    query_embedding: list[float] = None,
 ):
     # get similar entities
     logger.info(
         f"Query nodes: {query} (top_k:{query_param.top_k}, cosine:{entities_vdb.cosine_better_than_threshold})"
     )
 
-    results = await entities_vdb.query(query, top_k=query_param.top_k)
+    results = await entities_vdb.query(
+        query, top_k=query_param.top_k, query_embedding=query_embedding
+    )
 
     if not len(results):
         return [], []
@@ -3764,12 +4112,15 @@ async def _get_edge_data(
     knowledge_graph_inst: BaseGraphStorage,
     relationships_vdb: BaseVectorStorage,
     query_param: QueryParam,
+    query_embedding: list[float] = None,
 ):
     logger.info(
         f"Query edges: {keywords} (top_k:{query_param.top_k}, cosine:{relationships_vdb.cosine_better_than_threshold})"
     )
 
-    results = await relationships_vdb.query(keywords, top_k=query_param.top_k)
+    results = await relationships_vdb.query(
+        keywords, top_k=query_param.top_k, query_embedding=query_embedding
+    )
 
     if not len(results):
         return [], []
@@ -4117,9 +4468,21 @@ async def naive_query(
         if not query_param.only_need_context and not query_param.only_need_prompt:
             return cached_response
 
+    semantic_cache, semantic_scope = _semantic_cache_scope(
+        query_param, global_config, system_prompt, return_raw_data
+    )
+    # Embedded by the semantic cache lookup, reused for retrieval on a miss
+    query_embedding = None
+    if semantic_cache is not None:
+        cached_response, query_embedding = await semantic_cache.lookup(
+            semantic_scope, query
+        )
+        if cached_response is not None:
+            return cached_response
+
     tokenizer: Tokenizer = global_config["tokenizer"]
 
-    chunks = await _get_vector_context(query, chunks_vdb, query_param, None)
+    chunks = await _get_vector_context(query, chunks_vdb, query_param, query_embedding)
 
     if chunks is None or len(chunks) == 0:
         # Build empty raw data for consistency
@@ -4282,6 +4645,9 @@ async def naive_query(
             .strip()
         )
 
+    if semantic_cache is not None and isinstance(response, str) and response:
+        semantic_cache.insert(semantic_scope, query, query_embedding, response)
+
     if hashing_kv.global_config.get("enable_llm_cache"):
         # Save to cache with query parameters
         queryparam_dict = {
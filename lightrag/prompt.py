@@ -341,3 +341,21 @@ Generate a concise response based on Document Chunks and follow Response Rules,
 
 ---Response---
 Output:"""
+
+PROMPTS["similarity_check"] = """---Role---
+You are a strict judge deciding whether a cached answer can be reused for a new question.
+
+---Goal---
+Rate how similar the two questions below are in meaning, so that the answer to the first question is also a correct and complete answer to the second.
+
+---Instructions & Constraints---
+1. Output a single number between 0 and 1 and nothing else.
+2. 1 means the questions ask for exactly the same information, 0 means they are unrelated.
+3. Questions about different entities, time periods, quantities or conditions must score below 0.5, even if worded alike.
+
+---Real Data---
+Question 1: {original_prompt}
+Question 2: {cached_prompt}
+
+---Output---
+Similarity score:"""
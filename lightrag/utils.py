@@ -7,15 +7,27 @@ import csv
 import json
 import logging
 import logging.handlers
+import multiprocessing
 import os
+import pickle
 import re
 import time
 import uuid
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import datetime
-from functools import wraps
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial, wraps
 from hashlib import md5
-from typing import Any, Protocol, Callable, TYPE_CHECKING, List, Optional
+from typing import (
+    Any,
+    AsyncIterator,
+    Protocol,
+    Callable,
+    TYPE_CHECKING,
+    List,
+    Optional,
+)
 import numpy as np
 from dotenv import load_dotenv
 
@@ -26,6 +38,14 @@ from lightrag.constants import (
     GRAPH_FIELD_SEP,
     DEFAULT_MAX_TOTAL_TOKENS,
     DEFAULT_MAX_FILE_PATH_LENGTH,
+    DEFAULT_HTTP_MAX_CONNECTIONS,
+    DEFAULT_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    DEFAULT_HTTP_KEEPALIVE_EXPIRY,
+    DEFAULT_ADAPTIVE_ASYNC_MAX_MULTIPLIER,
+    DEFAULT_ADAPTIVE_ASYNC_LATENCY_FACTOR,
+    DEFAULT_LLM_CACHE_EVICTION_POLICY,
+    DEFAULT_LLM_CACHE_EVICTION_HEADROOM,
+    DEFAULT_LLM_CACHE_EVICTION_RETRY_INTERVAL,
 )
 
 # Initialize logger with basic configuration
@@ -433,6 +453,104 @@ class HealthCheckTimeoutError(Exception):
         )
 
 
+def is_overload_error(e: BaseException) -> bool:
+    """Check whether an exception means the provider is overloaded (rate limit or timeout)"""
+    if isinstance(e, (TimeoutError, asyncio.TimeoutError, WorkerTimeoutError)):
+        return True
+    status = getattr(e, "status_code", None) or getattr(
+        getattr(e, "response", None), "status_code", None
+    )
+    if status in (429, 503):
+        return True
+    return "ratelimit" in type(e).__name__.lower()
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD concurrency limit used by priority_limit_async_func_call in adaptive mode
+
+    The limit grows by one per limit-sized window of successful calls while the
+    limit is fully used by running calls and latency stays below latency_factor
+    times the average latency. It is halved when a call is overloaded (see is_overload_error) or shows
+    a latency spike. Calls started before the last decrease do not decrease it
+    again, so one overload episode halves the limit only once.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int,
+        max_limit: int,
+        min_limit: int = 1,
+        latency_factor: float = DEFAULT_ADAPTIVE_ASYNC_LATENCY_FACTOR,
+        latency_alpha: float = 0.1,
+        warmup_calls: int = 10,
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self.latency_factor = latency_factor
+        self.latency_alpha = latency_alpha
+        self.warmup_calls = warmup_calls
+        self.in_flight = 0
+        # Slots actually running a call, in_flight also counts slots held by idle workers
+        self.executing = 0
+        self.avg_latency: float | None = None
+        self.increases = 0
+        self.decreases = 0
+        self._latency_samples = 0
+        self._last_decrease = float("-inf")
+        self._condition = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    def start(self) -> None:
+        """Mark an acquired slot as running a call"""
+        self.executing += 1
+
+    async def release(
+        self,
+        started_at: float | None = None,
+        latency: float | None = None,
+        outcome: str | None = None,
+    ) -> None:
+        """Return a slot, started_at is None for slots that never ran a call
+
+        outcome is "success", "overload", "error" or None when the call was cancelled.
+        """
+        async with self._condition:
+            was_saturated = self.executing >= int(self.limit)
+            self.in_flight -= 1
+            if started_at is not None:
+                self.executing -= 1
+            overloaded = outcome == "overload"
+            if outcome == "success":
+                overloaded = (
+                    self._latency_samples >= self.warmup_calls
+                    and latency > self.avg_latency * self.latency_factor
+                )
+                self._update_latency(latency)
+            if overloaded:
+                if started_at >= self._last_decrease:
+                    self.limit = max(self.min_limit, self.limit / 2)
+                    self._last_decrease = time.monotonic()
+                    self.decreases += 1
+            elif outcome == "success" and was_saturated:
+                previous = int(self.limit)
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+                if int(self.limit) > previous:
+                    self.increases += 1
+            self._condition.notify_all()
+
+    def _update_latency(self, latency: float) -> None:
+        self._latency_samples += 1
+        if self.avg_latency is None:
+            self.avg_latency = latency
+        else:
+            self.avg_latency += self.latency_alpha * (latency - self.avg_latency)
+
+
 def priority_limit_async_func_call(
     max_size: int,
     llm_timeout: float = None,
@@ -441,6 +559,8 @@ def priority_limit_async_func_call(
     max_queue_size: int = 1000,
     cleanup_timeout: float = 2.0,
     queue_name: str = "limit_async",
+    adaptive: bool = False,
+    adaptive_max_size: int = None,
 ):
     """
     Enhanced priority-limited asynchronous function call decorator with robust timeout handling
@@ -450,18 +570,21 @@ def priority_limit_async_func_call(
     - Task state tracking to prevent race conditions
     - Enhanced health check system with stuck task detection
     - Proper resource cleanup and error recovery
+    - Optional adaptive (AIMD) concurrency, see AdaptiveConcurrencyLimiter
 
     Args:
-        max_size: Maximum number of concurrent calls
+        max_size: Maximum number of concurrent calls, the starting limit in adaptive mode
         max_queue_size: Maximum queue capacity to prevent memory overflow
         llm_timeout: LLM provider timeout (from global config), used to calculate other timeouts
         max_execution_timeout: Maximum time for worker to execute function (defaults to llm_timeout + 30s)
         max_task_duration: Maximum time before health check intervenes (defaults to llm_timeout + 60s)
         cleanup_timeout: Maximum time to wait for cleanup operations (defaults to 2.0s)
         queue_name: Optional queue name for logging identification (defaults to "limit_async")
+        adaptive: Adjust the concurrency limit to the provider's behaviour instead of fixing it at max_size
+        adaptive_max_size: Upper bound of the adaptive limit (defaults to max_size * DEFAULT_ADAPTIVE_ASYNC_MAX_MULTIPLIER)
 
     Returns:
-        Decorator function
+        Decorator function, the decorated function has shutdown() and metrics() attributes
     """
 
     def final_decro(func):
@@ -482,6 +605,16 @@ def priority_limit_async_func_call(
                 )  # Reserved timeout buffer for health check phase
 
         queue = asyncio.PriorityQueue(maxsize=max_queue_size)
+        # In adaptive mode a worker runs per possible slot and the limiter gates them
+        limiter = None
+        worker_count = max_size
+        if adaptive:
+            worker_count = max(
+                max_size,
+                adaptive_max_size or max_size * DEFAULT_ADAPTIVE_ASYNC_MAX_MULTIPLIER,
+            )
+            limiter = AdaptiveConcurrencyLimiter(max_size, worker_count)
+        stats = {"completed": 0, "failed": 0, "overloaded": 0, "avg_latency": None}
         tasks = set()
         initialization_lock = asyncio.Lock()
         counter = 0
@@ -500,83 +633,105 @@ def priority_limit_async_func_call(
             try:
                 while not shutdown_event.is_set():
                     try:
-                        # Get task from queue with timeout for shutdown checking
+                        # Take a slot before the task so the highest priority task gets it
+                        if limiter is not None:
+                            await limiter.acquire()
+                        # Limiter feedback, started_at stays None unless a call ran
+                        started_at = latency = outcome = None
                         try:
-                            (
-                                priority,
-                                count,
-                                task_id,
-                                args,
-                                kwargs,
-                            ) = await asyncio.wait_for(queue.get(), timeout=1.0)
-                        except asyncio.TimeoutError:
-                            continue
-
-                        # Get task state and mark worker as started
-                        async with task_states_lock:
-                            if task_id not in task_states:
-                                queue.task_done()
+                            # Get task from queue with timeout for shutdown checking
+                            try:
+                                (
+                                    priority,
+                                    count,
+                                    task_id,
+                                    args,
+                                    kwargs,
+                                ) = await asyncio.wait_for(queue.get(), timeout=1.0)
+                            except asyncio.TimeoutError:
                                 continue
-                            task_state = task_states[task_id]
-                            task_state.worker_started = True
-                            # Record execution start time when worker actually begins processing
-                            task_state.execution_start_time = (
-                                asyncio.get_event_loop().time()
-                            )
 
-                        # Check if task was cancelled before worker started
-                        if (
-                            task_state.cancellation_requested
-                            or task_state.future.cancelled()
-                        ):
+                            # Get task state and mark worker as started
                             async with task_states_lock:
-                                task_states.pop(task_id, None)
-                            queue.task_done()
-                            continue
-
-                        try:
-                            # Execute function with timeout protection
-                            if max_execution_timeout is not None:
-                                result = await asyncio.wait_for(
-                                    func(*args, **kwargs), timeout=max_execution_timeout
+                                if task_id not in task_states:
+                                    queue.task_done()
+                                    continue
+                                task_state = task_states[task_id]
+                                task_state.worker_started = True
+                                # Record execution start time when worker actually begins processing
+                                task_state.execution_start_time = (
+                                    asyncio.get_event_loop().time()
                                 )
-                            else:
-                                result = await func(*args, **kwargs)
 
-                            # Set result if future is still valid
-                            if not task_state.future.done():
-                                task_state.future.set_result(result)
+                            # Check if task was cancelled before worker started
+                            if (
+                                task_state.cancellation_requested
+                                or task_state.future.cancelled()
+                            ):
+                                async with task_states_lock:
+                                    task_states.pop(task_id, None)
+                                queue.task_done()
+                                continue
 
-                        except asyncio.TimeoutError:
-                            # Worker-level timeout (max_execution_timeout exceeded)
-                            logger.warning(
-                                f"{queue_name}: Worker timeout for task {task_id} after {max_execution_timeout}s"
-                            )
-                            if not task_state.future.done():
-                                task_state.future.set_exception(
-                                    WorkerTimeoutError(
-                                        max_execution_timeout, "execution"
+                            # Same clock as the limiter's decrease timestamps
+                            started_at = time.monotonic()
+                            if limiter is not None:
+                                limiter.start()
+                            try:
+                                # Execute function with timeout protection
+                                if max_execution_timeout is not None:
+                                    result = await asyncio.wait_for(
+                                        func(*args, **kwargs),
+                                        timeout=max_execution_timeout,
                                     )
+                                else:
+                                    result = await func(*args, **kwargs)
+
+                                outcome = "success"
+                                # Set result if future is still valid
+                                if not task_state.future.done():
+                                    task_state.future.set_result(result)
+
+                            except asyncio.TimeoutError:
+                                outcome = "overload"
+                                # Worker-level timeout (max_execution_timeout exceeded)
+                                logger.warning(
+                                    f"{queue_name}: Worker timeout for task {task_id} after {max_execution_timeout}s"
                                 )
-                        except asyncio.CancelledError:
-                            # Task was cancelled during execution
-                            if not task_state.future.done():
-                                task_state.future.cancel()
-                            logger.debug(
-                                f"{queue_name}: Task {task_id} cancelled during execution"
-                            )
-                        except Exception as e:
-                            # Function execution error
-                            logger.error(
-                                f"{queue_name}: Error in decorated function for task {task_id}: {str(e)}"
-                            )
-                            if not task_state.future.done():
-                                task_state.future.set_exception(e)
+                                if not task_state.future.done():
+                                    task_state.future.set_exception(
+                                        WorkerTimeoutError(
+                                            max_execution_timeout, "execution"
+                                        )
+                                    )
+                            except asyncio.CancelledError:
+                                # Task was cancelled during execution
+                                if not task_state.future.done():
+                                    task_state.future.cancel()
+                                logger.debug(
+                                    f"{queue_name}: Task {task_id} cancelled during execution"
+                                )
+                            except Exception as e:
+                                outcome = (
+                                    "overload" if is_overload_error(e) else "error"
+                                )
+                                # Function execution error
+                                logger.error(
+                                    f"{queue_name}: Error in decorated function for task {task_id}: {str(e)}"
+                                )
+                                if not task_state.future.done():
+                                    task_state.future.set_exception(e)
+                            finally:
+                                # Clean up task state
+                                async with task_states_lock:
+                                    task_states.pop(task_id, None)
+                                queue.task_done()
+                                latency = time.monotonic() - started_at
+                                record_outcome(outcome, latency)
                         finally:
-                            # Clean up task state
-                            async with task_states_lock:
-                                task_states.pop(task_id, None)
-                            queue.task_done()
+                            # Return the slot on every path, including cancellation
+                            if limiter is not None:
+                                await limiter.release(started_at, latency, outcome)
 
                     except Exception as e:
                         # Critical error in worker loop
@@ -587,6 +742,39 @@ def priority_limit_async_func_call(
             finally:
                 logger.debug(f"{queue_name}: Worker exiting")
 
+        def record_outcome(outcome: str | None, latency: float) -> None:
+            if outcome == "success":
+                stats["completed"] += 1
+                avg_latency = stats["avg_latency"]
+                stats["avg_latency"] = (
+                    latency
+                    if avg_latency is None
+                    else avg_latency + 0.1 * (latency - avg_latency)
+                )
+            elif outcome is not None:
+                stats["failed"] += 1
+                if outcome == "overload":
+                    stats["overloaded"] += 1
+
+        def metrics() -> dict[str, Any]:
+            """Snapshot of the queue's concurrency and call statistics"""
+            return {
+                "queue_name": queue_name,
+                "adaptive": limiter is not None,
+                "concurrency_limit": int(limiter.limit) if limiter else max_size,
+                "max_concurrency": worker_count,
+                "in_flight": sum(
+                    1 for state in task_states.values() if state.worker_started
+                ),
+                "queued": queue.qsize(),
+                "completed": stats["completed"],
+                "failed": stats["failed"],
+                "overloaded": stats["overloaded"],
+                "avg_latency": stats["avg_latency"],
+                "limit_increases": limiter.increases if limiter else 0,
+                "limit_decreases": limiter.decreases if limiter else 0,
+            }
+
         async def enhanced_health_check():
             """Enhanced health check with stuck task detection and recovery"""
             nonlocal initialized
@@ -638,7 +826,7 @@ def priority_limit_async_func_call(
                     tasks.difference_update(done_tasks)
 
                     active_tasks_count = len(tasks)
-                    workers_needed = max_size - active_tasks_count
+                    workers_needed = worker_count - active_tasks_count
 
                     if workers_needed > 0:
                         logger.info(
@@ -688,7 +876,7 @@ def priority_limit_async_func_call(
                     )
 
                 # Create worker tasks
-                workers_needed = max_size - active_tasks_count
+                workers_needed = worker_count - active_tasks_count
                 for _ in range(workers_needed):
                     task = asyncio.create_task(worker())
                     tasks.add(task)
@@ -870,8 +1058,9 @@ def priority_limit_async_func_call(
                 async with task_states_lock:
                     task_states.pop(task_id, None)
 
-        # Add shutdown method to decorated function
+        # Add shutdown and metrics methods to decorated function
         wait_func.shutdown = shutdown
+        wait_func.metrics = metrics
 
         return wait_func
 
@@ -985,6 +1174,234 @@ class TiktokenTokenizer(Tokenizer):
             raise ValueError(f"Invalid model_name: {model_name}.")
 
 
+# Tokenizer of a TokenizerPool worker process, set once by the pool initializer
+_pool_worker_tokenizer: Tokenizer | None = None
+
+
+def _init_pool_worker(tokenizer: Tokenizer) -> None:
+    global _pool_worker_tokenizer
+    _pool_worker_tokenizer = tokenizer
+
+
+def _run_in_pool_worker(func: Callable[..., Any], *args: Any) -> Any:
+    return func(_pool_worker_tokenizer, *args)
+
+
+def _chunk_content(
+    tokenizer: Tokenizer, chunking_func: Callable[..., Any], *args: Any
+) -> list[dict[str, Any]]:
+    # Generators can not be returned from a pool, materialize the chunks
+    return list(chunking_func(tokenizer, *args))
+
+
+def _count_items_within_token_limit(
+    tokenizer: Tokenizer, texts: list[str], max_token_size: int
+) -> int:
+    if max_token_size <= 0:
+        return 0
+    tokens = 0
+    for i, text in enumerate(texts):
+        tokens += len(tokenizer.encode(text))
+        if tokens > max_token_size:
+            return i
+    return len(texts)
+
+
+class TokenizerPool:
+    """
+    Runs chunking and tokenization in a thread or process pool to keep the event loop responsive.
+
+    At most max_pending calls are handed to the pool at a time, further callers wait
+    for a free slot, so a burst of large documents can not queue unbounded work.
+    Process pools receive the tokenizer once per worker through the pool initializer,
+    functions and arguments submitted to them must be picklable.
+    """
+
+    def __init__(
+        self,
+        tokenizer: Tokenizer,
+        mode: str = "thread",
+        max_workers: int = 2,
+        max_pending: int | None = None,
+    ):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Invalid tokenizer pool mode: {mode}")
+        if mode == "process":
+            try:
+                pickle.dumps(tokenizer)
+            except Exception as e:
+                logger.warning(
+                    f"Tokenizer can not be sent to worker processes ({e}), using a thread pool"
+                )
+                mode = "thread"
+        self.tokenizer = tokenizer
+        self.mode = mode
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(1, max_pending or self.max_workers * 2)
+        self._executor: Executor | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+
+    def __deepcopy__(self, memo):
+        # Shared resource, global_config copies must keep using the same pool
+        return self
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.mode == "process":
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_pool_worker,
+                    initargs=(self.tokenizer,),
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="lightrag-tokenizer",
+                )
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run func(tokenizer, *args) in the pool"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Semaphores are bound to the event loop they are first used in
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_pending)
+        async with self._semaphore:
+            if self.mode == "process":
+                call = partial(_run_in_pool_worker, func, *args)
+            else:
+                call = partial(func, self.tokenizer, *args)
+            return await loop.run_in_executor(self._get_executor(), call)
+
+    async def chunk(
+        self, chunking_func: Callable[..., Any], *args: Any
+    ) -> list[dict[str, Any]]:
+        """Run chunking_func(tokenizer, *args) in the pool and return the chunks as a list"""
+        if self.mode == "process":
+            try:
+                pickle.dumps(chunking_func)
+            except Exception:
+                # e.g. a lambda or closure, chunk in a thread instead
+                return await asyncio.to_thread(
+                    _chunk_content, self.tokenizer, chunking_func, *args
+                )
+        return await self.run(_chunk_content, chunking_func, *args)
+
+    async def truncate_list_by_token_size(
+        self,
+        list_data: list[Any],
+        key: Callable[[Any], str],
+        max_token_size: int,
+    ) -> list[Any]:
+        """Pool counterpart of truncate_list_by_token_size"""
+        texts = [key(data) for data in list_data]
+        count = await self.run(_count_items_within_token_limit, texts, max_token_size)
+        return list_data[:count]
+
+    def shutdown(self) -> None:
+        """Stop the pool workers, the pool is recreated on next use"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# (event loop id, client key) -> (event loop, client, async close function)
+_shared_clients: dict[tuple, tuple[asyncio.AbstractEventLoop, Any, Callable]] = {}
+# event loop id -> (event loop, number of users retaining its shared clients)
+_shared_client_users: dict[int, tuple[asyncio.AbstractEventLoop, int]] = {}
+
+
+def get_http_pool_kwargs() -> dict[str, Any]:
+    """Connection pool settings for httpx clients shared by LLM and embedding bindings"""
+    import httpx
+
+    try:
+        import h2  # noqa: F401
+
+        http2_available = True
+    except ImportError:
+        http2_available = False
+
+    return {
+        "limits": httpx.Limits(
+            max_connections=get_env_value(
+                "HTTP_MAX_CONNECTIONS", DEFAULT_HTTP_MAX_CONNECTIONS, int
+            ),
+            max_keepalive_connections=get_env_value(
+                "HTTP_MAX_KEEPALIVE_CONNECTIONS",
+                DEFAULT_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                int,
+            ),
+            keepalive_expiry=get_env_value(
+                "HTTP_KEEPALIVE_EXPIRY", DEFAULT_HTTP_KEEPALIVE_EXPIRY, float
+            ),
+        ),
+        # HTTP/2 needs the optional h2 package
+        "http2": get_env_value("HTTP2", True, bool) and http2_available,
+    }
+
+
+def get_shared_client(
+    key: tuple,
+    factory: Callable[[], Any],
+    close: Callable[[Any], Any],
+) -> Any:
+    """Return the client registered under key for the running event loop, creating it with factory
+
+    Connections of a client are bound to the event loop they were opened in, so
+    every loop gets its own client. close(client) is awaited by close_shared_clients(),
+    directly or through the last release_shared_clients() of the loop.
+    """
+    loop = asyncio.get_running_loop()
+    full_key = (id(loop), *key)
+    entry = _shared_clients.get(full_key)
+    # The id of a closed loop may be reused by a new one
+    if entry is None or entry[0] is not loop:
+        entry = (loop, factory(), close)
+        _shared_clients[full_key] = entry
+    return entry[1]
+
+
+def retain_shared_clients() -> None:
+    """Register a user (e.g. a LightRAG instance) of the shared clients of the running loop"""
+    loop = asyncio.get_running_loop()
+    entry = _shared_client_users.get(id(loop))
+    users = entry[1] if entry is not None and entry[0] is loop else 0
+    _shared_client_users[id(loop)] = (loop, users + 1)
+
+
+async def release_shared_clients() -> None:
+    """Unregister a user of retain_shared_clients(), the last one closes the loop's clients
+
+    Clients of a loop without registered users are closed right away.
+    """
+    loop = asyncio.get_running_loop()
+    entry = _shared_client_users.get(id(loop))
+    users = entry[1] - 1 if entry is not None and entry[0] is loop else 0
+    if users > 0:
+        _shared_client_users[id(loop)] = (loop, users)
+        return
+    _shared_client_users.pop(id(loop), None)
+    await close_shared_clients()
+
+
+async def close_shared_clients() -> None:
+    """Close the shared clients of the running event loop and forget those of closed loops"""
+    loop = asyncio.get_running_loop()
+    for full_key, (client_loop, client, close) in list(_shared_clients.items()):
+        if client_loop is loop:
+            try:
+                await close(client)
+            except Exception as e:
+                logger.warning(f"Failed to close shared client {full_key[1:2]}: {e}")
+            del _shared_clients[full_key]
+        elif client_loop.is_closed():
+            del _shared_clients[full_key]
+
+
 def pack_user_ass_to_openai_messages(*args: str):
     roles = ["user", "assistant"]
     return [
@@ -1030,6 +1447,23 @@ def cosine_similarity(v1, v2):
     return dot_product / (norm1 * norm2)
 
 
+def cosine_similarities(query_vector, vectors) -> np.ndarray:
+    """Calculate cosine similarities between a query vector and each row of a matrix"""
+    matrix = np.asarray(vectors, dtype=np.float32)
+    query = np.asarray(query_vector, dtype=np.float32).reshape(-1)
+    norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Zero vectors have no direction, score them 0
+        return np.nan_to_num(matrix @ query / norms)
+
+
+def _get_llm_cache_limiter(hashing_kv) -> LLMCacheLimiter | None:
+    limiter = hashing_kv.global_config.get("llm_cache_limiter")
+    if limiter is None or limiter.cache_storage is not hashing_kv:
+        return None
+    return limiter
+
+
 async def handle_cache(
     hashing_kv,
     args_hash,
@@ -1056,6 +1490,15 @@ async def handle_cache(
     flattened_key = generate_cache_key(mode, cache_type, args_hash)
     cache_entry = await hashing_kv.get_by_id(flattened_key)
     if cache_entry:
+        limiter = _get_llm_cache_limiter(hashing_kv)
+        if limiter is not None:
+            if limiter.is_expired(
+                _cache_type_of(flattened_key, cache_entry),
+                _cache_entry_time(cache_entry),
+            ):
+                logger.debug(f"Expired cache entry(key:{flattened_key})")
+                return None
+            limiter.touch(flattened_key)
         logger.debug(f"Flattened cache hit(key:{flattened_key})")
         content = cache_entry["return"]
         timestamp = cache_entry.get("create_time", 0)
@@ -1097,11 +1540,19 @@ async def save_to_cache(hashing_kv, cache_data: CacheData):
         cache_data.mode, cache_data.cache_type, cache_data.args_hash
     )
 
+    limiter = _get_llm_cache_limiter(hashing_kv)
+
     # Check if we already have identical content cached
     existing_cache = await hashing_kv.get_by_id(flattened_key)
     if existing_cache:
         existing_content = existing_cache.get("return")
-        if existing_content == cache_data.content:
+        # An expired entry is rewritten to refresh its update_time
+        if existing_content == cache_data.content and not (
+            limiter is not None
+            and limiter.is_expired(
+                cache_data.cache_type, _cache_entry_time(existing_cache)
+            )
+        ):
             logger.info(f"Cache content unchanged for {flattened_key}, skipping update")
             return
 
@@ -1121,6 +1572,484 @@ async def save_to_cache(hashing_kv, cache_data: CacheData):
     # Save using flattened key
     await hashing_kv.upsert({flattened_key: cache_entry})
 
+    if limiter is not None:
+        await limiter.record(flattened_key, cache_entry)
+
+
+class SemanticQueryCache:
+    """
+    In-process cache of query answers looked up by query embedding similarity.
+
+    Answers are grouped by scope (query mode and parameters), a new query reuses the
+    answer of the most similar cached query in its scope when the cosine similarity
+    reaches similarity_threshold. With llm_check_func, the LLM additionally rates the
+    two queries from 0 to 1 and the answer is reused when the rating reaches
+    llm_check_threshold. Entries are evicted least recently used first once
+    max_entries is exceeded, and expire after ttl seconds when ttl is set.
+    """
+
+    def __init__(
+        self,
+        embedding_func: Callable[..., Any],
+        similarity_threshold: float = 0.95,
+        max_entries: int = 1000,
+        ttl: float | None = None,
+        llm_check_func: Callable[..., Any] | None = None,
+        llm_check_threshold: float = 0.8,
+    ):
+        self.embedding_func = embedding_func
+        self.similarity_threshold = similarity_threshold
+        self.llm_check_threshold = llm_check_threshold
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl if ttl and ttl > 0 else None
+        self.llm_check_func = llm_check_func
+        # entry id -> (scope, query, answer, create_time), in least recently used order
+        self._entries: OrderedDict[int, tuple[str, str, str, float]] = OrderedDict()
+        # scope -> (entry ids, normalized embedding matrix with one row per entry id)
+        self._scopes: dict[str, tuple[list[int], np.ndarray]] = {}
+        self._next_id = 0
+
+    def __deepcopy__(self, memo):
+        # Shared resource, global_config copies must keep using the same cache
+        return self
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def embed(self, query: str) -> np.ndarray:
+        embedding = await self.embedding_func([query])
+        vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _remove(self, entry_ids: set[int]) -> None:
+        scopes = {self._entries.pop(entry_id)[0] for entry_id in entry_ids}
+        for scope in scopes:
+            ids, vectors = self._scopes[scope]
+            keep = [i for i, entry_id in enumerate(ids) if entry_id not in entry_ids]
+            if keep:
+                self._scopes[scope] = ([ids[i] for i in keep], vectors[keep])
+            else:
+                del self._scopes[scope]
+
+    def _expire(self) -> None:
+        if self.ttl is None:
+            return
+        deadline = time.time() - self.ttl
+        expired = {
+            entry_id
+            for entry_id, (_, _, _, create_time) in self._entries.items()
+            if create_time < deadline
+        }
+        if expired:
+            self._remove(expired)
+
+    async def _llm_confirms(self, query: str, cached_query: str) -> bool:
+        from lightrag.prompt import PROMPTS
+
+        prompt = PROMPTS["similarity_check"].format(
+            original_prompt=query, cached_prompt=cached_query
+        )
+        try:
+            result = await self.llm_check_func(prompt)
+            score = float(re.search(r"\d+(?:\.\d+)?", result).group())
+        except Exception as e:
+            logger.warning(f"Semantic cache LLM check failed: {e}")
+            return False
+        return score >= self.llm_check_threshold
+
+    async def lookup(self, scope: str, query: str) -> tuple[str | None, np.ndarray]:
+        """Find a cached answer for query
+
+        Returns:
+            tuple[str | None, np.ndarray]: (answer or None on miss, query embedding),
+            the embedding can be passed to insert() after a miss
+        """
+        embedding = await self.embed(query)
+        self._expire()
+        if scope not in self._scopes:
+            return None, embedding
+
+        ids, vectors = self._scopes[scope]
+        similarities = vectors @ embedding
+        best = int(np.argmax(similarities))
+        similarity = float(similarities[best])
+        if similarity < self.similarity_threshold:
+            logger.debug(f"Semantic cache missed(best similarity: {similarity:.4f})")
+            return None, embedding
+
+        entry_id = ids[best]
+        _, cached_query, answer, _ = self._entries[entry_id]
+        if self.llm_check_func is not None and not await self._llm_confirms(
+            query, cached_query
+        ):
+            logger.debug("Semantic cache hit rejected by LLM check")
+            return None, embedding
+        if entry_id not in self._entries:
+            # Evicted while waiting for the LLM check
+            return None, embedding
+
+        self._entries.move_to_end(entry_id)
+        logger.info(f"Semantic cache hit(similarity: {similarity:.4f})")
+        return answer, embedding
+
+    def insert(
+        self, scope: str, query: str, embedding: np.ndarray, answer: str
+    ) -> None:
+        """Cache answer for query, embedding is the one returned by lookup()"""
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = (scope, query, answer, time.time())
+        row = embedding.reshape(1, -1)
+        if scope in self._scopes:
+            ids, vectors = self._scopes[scope]
+            self._scopes[scope] = (ids + [entry_id], np.vstack([vectors, row]))
+        else:
+            self._scopes[scope] = ([entry_id], row)
+
+        overflow = len(self._entries) - self.max_entries
+        if overflow > 0:
+            self._remove(set(list(self._entries)[:overflow]))
+
+    def clear(self) -> None:
+        """Drop all cached answers, e.g. after the knowledge base changed"""
+        self._entries.clear()
+        self._scopes.clear()
+
+
+LLM_CACHE_EVICTION_POLICIES = ("lru", "lfu", "ttl")
+
+
+def _cache_type_of(key: str, entry: dict[str, Any]) -> str:
+    cache_type = entry.get("cache_type")
+    if cache_type:
+        return cache_type
+    # Flattened cache key format: {mode}:{cache_type}:{hash}
+    parts = key.split(":")
+    return parts[1] if len(parts) == 3 else "unknown"
+
+
+def _cache_entry_time(entry: dict[str, Any]) -> float:
+    # Every KV storage refreshes update_time on upsert, some drop create_time on update
+    return entry.get("update_time") or entry.get("create_time") or 0
+
+
+def _cache_entry_size(entry: dict[str, Any]) -> int:
+    return len(json.dumps(entry, ensure_ascii=False, default=str).encode("utf-8"))
+
+
+@dataclass
+class _CacheEntryStats:
+    cache_type: str
+    size: int
+    saved_time: float
+    last_access: float
+    hits: int = 0
+    chunk_id: str | None = None
+
+
+class LLMCacheLimiter:
+    """
+    Keeps the LLM response cache within per cache_type size limits.
+
+    limits maps a cache_type ("extract", "summary", "keywords", "query", ...) or "*"
+    (every cache type without limits of its own) to a dict with:
+    - max_entries / max_bytes: once exceeded, entries are evicted in policy order until
+      the cache type is back below (1 - DEFAULT_LLM_CACHE_EVICTION_HEADROOM) of the limit
+    - policy: "lru" least recently used first, "lfu" least frequently used first or
+      "ttl" least recently saved first
+    - ttl: seconds after its last save (the update_time of the entry) after which an
+      entry expires, whatever the policy; saving an expired response again refreshes it
+
+    Extraction results still listed in the llm_cache_list of their text chunk are never
+    evicted, they are needed to rebuild the knowledge graph when a document is deleted.
+    Once found, such entries are pinned: they no longer count toward the limits and are
+    not checked again until compact() or until unpin() is called for them when their
+    text chunks are deleted.
+
+    Entry statistics are built from one scan of the cache storage and then tracked in
+    process, so each worker of a multi-process deployment only tracks the hits and
+    saves it served itself; compact() rescans the storage and applies the limits to
+    everything in it.
+    """
+
+    def __init__(self, limits: dict[str, dict[str, Any]]):
+        self.limits: dict[str, dict[str, Any]] = {}
+        for cache_type, limit in limits.items():
+            policy = limit.get("policy") or DEFAULT_LLM_CACHE_EVICTION_POLICY
+            if policy not in LLM_CACHE_EVICTION_POLICIES:
+                raise ValueError(
+                    f"Unknown LLM cache eviction policy '{policy}' for {cache_type}, "
+                    f"expected one of {LLM_CACHE_EVICTION_POLICIES}"
+                )
+            self.limits[cache_type] = {
+                "max_entries": limit.get("max_entries") or None,
+                "max_bytes": limit.get("max_bytes") or None,
+                "policy": policy,
+                "ttl": limit.get("ttl") or None,
+            }
+        self.cache_storage = None
+        self.text_chunks = None
+        self._entries: dict[str, _CacheEntryStats] = {}
+        # cache_type -> [entry count, total bytes]
+        self._totals: dict[str, list[int]] = {}
+        self._next_expiry_check: dict[str, float] = {}
+        self._next_eviction: dict[str, float] = {}
+        # key -> statistics of entries still referenced by their text chunk
+        self._pinned: dict[str, _CacheEntryStats] = {}
+        self._loaded = False
+        self._lock = asyncio.Lock()
+        self.evicted_entries = 0
+        self.evicted_bytes = 0
+
+    def __deepcopy__(self, memo):
+        # Shared resource, global_config copies must keep using the same limiter
+        return self
+
+    def attach(self, cache_storage, text_chunks) -> None:
+        """Set the LLM response cache to limit and the text chunks referencing it"""
+        self.cache_storage = cache_storage
+        self.text_chunks = text_chunks
+
+    def limit_for(self, cache_type: str) -> dict[str, Any] | None:
+        return self.limits.get(cache_type, self.limits.get("*"))
+
+    def _add(self, key: str, stats: _CacheEntryStats) -> None:
+        self._discard(key)
+        self._entries[key] = stats
+        totals = self._totals.setdefault(stats.cache_type, [0, 0])
+        totals[0] += 1
+        totals[1] += stats.size
+
+    def _discard(self, key: str) -> _CacheEntryStats | None:
+        stats = self._entries.pop(key, None)
+        if stats is not None:
+            totals = self._totals[stats.cache_type]
+            totals[0] -= 1
+            totals[1] -= stats.size
+        return stats
+
+    async def _load(self) -> None:
+        """Build the entry statistics from a scan of the cache storage"""
+        self._entries = {}
+        self._totals = {}
+        self._pinned = {}
+        for key, entry in (await self.cache_storage.get_all()).items():
+            if not isinstance(entry, dict):
+                continue
+            saved_time = _cache_entry_time(entry)
+            self._add(
+                key,
+                _CacheEntryStats(
+                    cache_type=_cache_type_of(key, entry),
+                    size=_cache_entry_size(entry),
+                    saved_time=saved_time,
+                    last_access=saved_time,
+                    chunk_id=entry.get("chunk_id"),
+                ),
+            )
+        self._loaded = True
+        logger.info(f"LLM cache limiter tracking {len(self._entries)} cache entries")
+
+    def is_expired(self, cache_type: str, saved_time: float) -> bool:
+        """Whether an entry last written at saved_time is past the ttl of its cache type"""
+        limit = self.limit_for(cache_type)
+        return bool(limit and limit["ttl"] and saved_time < time.time() - limit["ttl"])
+
+    def touch(self, key: str) -> None:
+        """Record a cache hit"""
+        stats = self._entries.get(key)
+        if stats is not None:
+            stats.last_access = time.time()
+            stats.hits += 1
+
+    async def record(self, key: str, entry: dict[str, Any]) -> None:
+        """Record a saved cache entry and evict entries if its cache type is over its limits"""
+        cache_type = _cache_type_of(key, entry)
+        limit = self.limit_for(cache_type)
+        if limit is None:
+            return
+        async with self._lock:
+            if not self._loaded:
+                await self._load()
+            if key in self._pinned:
+                return
+            now = time.time()
+            previous = self._entries.get(key)
+            self._add(
+                key,
+                _CacheEntryStats(
+                    cache_type=cache_type,
+                    size=_cache_entry_size(entry),
+                    saved_time=now,
+                    last_access=now,
+                    hits=previous.hits if previous else 0,
+                    chunk_id=entry.get("chunk_id"),
+                ),
+            )
+            if (
+                self._over_limit(cache_type, limit)
+                and now >= self._next_eviction.get(cache_type, 0)
+            ) or (limit["ttl"] and now >= self._next_expiry_check.get(cache_type, 0)):
+                await self._evict(cache_type, limit)
+
+    def _over_limit(
+        self, cache_type: str, limit: dict[str, Any], fraction: float = 1.0
+    ) -> bool:
+        count, size = self._totals.get(cache_type, (0, 0))
+        return bool(
+            (limit["max_entries"] and count > limit["max_entries"] * fraction)
+            or (limit["max_bytes"] and size > limit["max_bytes"] * fraction)
+        )
+
+    async def _referenced(self, keys: list[str]) -> set[str]:
+        """Return the keys still listed in the llm_cache_list of their text chunk"""
+        chunk_ids = list(
+            {
+                self._entries[key].chunk_id
+                for key in keys
+                if self._entries[key].chunk_id is not None
+            }
+        )
+        if not chunk_ids or self.text_chunks is None:
+            return set()
+        referenced = set()
+        for chunk in await self.text_chunks.get_by_ids(chunk_ids):
+            if chunk:
+                referenced.update(chunk.get("llm_cache_list") or ())
+        return referenced.intersection(keys)
+
+    async def _evict(
+        self, cache_type: str, limit: dict[str, Any], batch_size: int = 256
+    ) -> int:
+        """Evict expired entries and, while over the limits, entries in policy order"""
+        now = time.time()
+        if limit["ttl"]:
+            self._next_expiry_check[cache_type] = now + max(1.0, limit["ttl"] / 10)
+        deadline = now - limit["ttl"] if limit["ttl"] else None
+
+        def expired(stats: _CacheEntryStats) -> bool:
+            return deadline is not None and stats.saved_time < deadline
+
+        def order(item: tuple[str, _CacheEntryStats]) -> tuple:
+            stats = item[1]
+            if limit["policy"] == "lfu":
+                return (not expired(stats), stats.hits, stats.last_access)
+            if limit["policy"] == "lru":
+                return (not expired(stats), stats.last_access)
+            return (not expired(stats), stats.saved_time)
+
+        low_watermark = 1.0 - DEFAULT_LLM_CACHE_EVICTION_HEADROOM
+
+        def needed(stats: _CacheEntryStats) -> bool:
+            # Expired entries first, then until back below the low watermark
+            return expired(stats) or self._over_limit(cache_type, limit, low_watermark)
+
+        candidates = sorted(
+            (
+                item
+                for item in self._entries.items()
+                if item[1].cache_type == cache_type
+            ),
+            key=order,
+        )
+        victims = []
+        done = False
+        # Checked against the text chunks a batch at a time, most victims come early
+        for start in range(0, len(candidates), batch_size):
+            batch = candidates[start : start + batch_size]
+            if not needed(batch[0][1]):
+                break
+            referenced = await self._referenced([key for key, _ in batch])
+            for key, stats in batch:
+                done = not needed(stats)
+                if done:
+                    break
+                self._discard(key)
+                if key in referenced:
+                    # Stop counting it toward the limits and checking it again
+                    self._pinned[key] = stats
+                else:
+                    victims.append((key, stats))
+            if done:
+                break
+
+        if self._over_limit(cache_type, limit):
+            # Nothing left to evict, do not rescan on every save
+            self._next_eviction[cache_type] = (
+                now + DEFAULT_LLM_CACHE_EVICTION_RETRY_INTERVAL
+            )
+        else:
+            self._next_eviction.pop(cache_type, None)
+        if not victims:
+            return 0
+        await self.cache_storage.delete([key for key, _ in victims])
+        evicted_bytes = sum(stats.size for _, stats in victims)
+        self.evicted_entries += len(victims)
+        self.evicted_bytes += evicted_bytes
+        logger.info(
+            f"LLM cache evicted {len(victims)} {cache_type} entries ({evicted_bytes} bytes)"
+        )
+        return len(victims)
+
+    async def unpin(self, keys) -> None:
+        """Count pinned entries toward the limits again, once their text chunks are deleted"""
+        async with self._lock:
+            cache_types = set()
+            for key in keys:
+                stats = self._pinned.pop(key, None)
+                if stats is not None:
+                    self._add(key, stats)
+                    cache_types.add(stats.cache_type)
+            for cache_type in cache_types:
+                limit = self.limit_for(cache_type)
+                if limit is not None and self._over_limit(cache_type, limit):
+                    await self._evict(cache_type, limit)
+
+    async def compact(self) -> dict[str, Any]:
+        """Rescan the cache storage and evict entries until every cache type is within its limits
+
+        Pinned entries are checked against their text chunks again.
+
+        Returns:
+            dict: Evicted entry count and bytes, and the remaining and pinned entries by cache type
+        """
+        async with self._lock:
+            evicted_entries, evicted_bytes = self.evicted_entries, self.evicted_bytes
+            await self._load()
+            for cache_type in list(self._totals):
+                limit = self.limit_for(cache_type)
+                if limit is not None:
+                    await self._evict(cache_type, limit)
+            await self.cache_storage.index_done_callback()
+            return {
+                "evicted_entries": self.evicted_entries - evicted_entries,
+                "evicted_bytes": self.evicted_bytes - evicted_bytes,
+                "cache_types": self.metrics(),
+            }
+
+    def metrics(self) -> dict[str, dict[str, int]]:
+        pinned: dict[str, int] = {}
+        for stats in self._pinned.values():
+            pinned[stats.cache_type] = pinned.get(stats.cache_type, 0) + 1
+        return {
+            cache_type: {
+                "entries": count,
+                "bytes": size,
+                "pinned_entries": pinned.get(cache_type, 0),
+            }
+            for cache_type, (count, size) in self._totals.items()
+        }
+
+    def clear(self) -> None:
+        """Forget all entry statistics, e.g. after the cache was dropped"""
+        self._entries.clear()
+        self._totals.clear()
+        self._next_expiry_check.clear()
+        self._next_eviction.clear()
+        self._pinned.clear()
+        self._loaded = False
+
 
 def safe_unicode_decode(content):
     # Regular expression to find all Unicode escape sequences of the form \uXXXX
@@ -1176,6 +2105,141 @@ def always_get_an_event_loop() -> asyncio.AbstractEventLoop:
         return new_loop
 
 
+async def _iter_export_entities(
+    chunk_entity_relation_graph,
+    entities_vdb,
+    include_vector_data: bool,
+    batch_size: int,
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """Yield entity export rows in batches, sorted by entity name"""
+    nodes = await chunk_entity_relation_graph.get_all_nodes()
+    nodes.sort(key=lambda node: str(node.get("id", node.get("entity_id"))))
+    for start in range(0, len(nodes), batch_size):
+        batch = nodes[start : start + batch_size]
+        names = [node.get("id", node.get("entity_id")) for node in batch]
+
+        vector_records = {}
+        if include_vector_data:
+            vector_ids = [compute_mdhash_id(name, prefix="ent-") for name in names]
+            for record in await entities_vdb.get_by_ids(vector_ids):
+                if record:
+                    vector_records[record.get("id")] = record
+
+        rows = []
+        for name, node in zip(names, batch):
+            # get_all_nodes adds the node id to the node properties
+            node_data = {k: v for k, v in node.items() if k != "id"}
+            row = {
+                "entity_name": name,
+                "source_id": node_data.get("source_id"),
+                "graph_data": str(node_data),  # Convert to string for compatibility
+            }
+            if include_vector_data:
+                row["vector_data"] = str(
+                    vector_records.get(compute_mdhash_id(name, prefix="ent-"))
+                )
+            rows.append(row)
+        yield rows
+
+
+async def _iter_export_relations(
+    chunk_entity_relation_graph,
+    relationships_vdb,
+    include_vector_data: bool,
+    batch_size: int,
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """Yield relation export rows in batches, one row per undirected edge"""
+    edges = []
+    seen_pairs = set()
+    for edge in await chunk_entity_relation_graph.get_all_edges():
+        src, tgt = edge.get("source"), edge.get("target")
+        # Some storages return undirected edges once per direction
+        pair = (src, tgt) if str(src) <= str(tgt) else (tgt, src)
+        if pair not in seen_pairs:
+            seen_pairs.add(pair)
+            edges.append(edge)
+    del seen_pairs
+    edges.sort(key=lambda edge: (str(edge.get("source")), str(edge.get("target"))))
+
+    for start in range(0, len(edges), batch_size):
+        batch = edges[start : start + batch_size]
+
+        vector_records = {}
+        if include_vector_data:
+            # Relationship vectors may be keyed by either direction
+            vector_ids = []
+            for edge in batch:
+                vector_ids.append(
+                    compute_mdhash_id(edge["source"] + edge["target"], prefix="rel-")
+                )
+                vector_ids.append(
+                    compute_mdhash_id(edge["target"] + edge["source"], prefix="rel-")
+                )
+            for record in await relationships_vdb.get_by_ids(vector_ids):
+                if record:
+                    vector_records[record.get("id")] = record
+
+        rows = []
+        for edge in batch:
+            src, tgt = edge["source"], edge["target"]
+            edge_data = {k: v for k, v in edge.items() if k not in ("source", "target")}
+            row = {
+                "src_entity": src,
+                "tgt_entity": tgt,
+                "source_id": edge_data.get("source_id"),
+                "graph_data": str(edge_data),  # Convert to string
+            }
+            if include_vector_data:
+                row["vector_data"] = str(
+                    vector_records.get(compute_mdhash_id(src + tgt, prefix="rel-"))
+                    or vector_records.get(compute_mdhash_id(tgt + src, prefix="rel-"))
+                )
+            rows.append(row)
+        yield rows
+
+
+async def _iter_export_relationships(
+    relationships_vdb, batch_size: int
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """Yield relationship rows from the vector database in batches"""
+    all_relationships = await relationships_vdb.client_storage
+    data = all_relationships["data"]
+    for start in range(0, len(data), batch_size):
+        yield [
+            {
+                "relationship_id": rel["__id__"],
+                "data": str(rel),  # Convert to string for compatibility
+            }
+            for rel in data[start : start + batch_size]
+        ]
+
+
+async def _collect_export_rows(
+    row_batches: AsyncIterator[list[dict[str, Any]]],
+) -> list[dict[str, Any]]:
+    rows = []
+    async for batch in row_batches:
+        rows.extend(batch)
+    return rows
+
+
+def _write_txt_section(txtfile, title: str, rows: list[dict[str, Any]], empty: str):
+    txtfile.write(f"{title}\n")
+    txtfile.write("-" * 80 + "\n")
+    if not rows:
+        txtfile.write(f"{empty}\n\n")
+        return
+    # Create fixed width columns
+    col_widths = {k: max(len(k), max(len(str(r[k])) for r in rows)) for k in rows[0]}
+    header = "  ".join(k.ljust(col_widths[k]) for k in rows[0])
+    txtfile.write(header + "\n")
+    txtfile.write("-" * len(header) + "\n")
+    for row in rows:
+        txtfile.write(
+            "  ".join(str(v).ljust(col_widths[k]) for k, v in row.items()) + "\n"
+        )
+
+
 async def aexport_data(
     chunk_entity_relation_graph,
     entities_vdb,
@@ -1183,296 +2247,159 @@ async def aexport_data(
     output_path: str,
     file_format: str = "csv",
     include_vector_data: bool = False,
+    batch_size: int = 1000,
 ) -> None:
     """
     Asynchronously exports all entities, relations, and relationships to various formats.
 
+    Nodes and edges are read with get_all_nodes/get_all_edges, vector data is fetched
+    in batches of batch_size, and csv, jsonl and md rows are written to the output file
+    batch by batch instead of being collected first.
+
     Args:
         chunk_entity_relation_graph: Graph storage instance for entities and relations
         entities_vdb: Vector database storage for entities
         relationships_vdb: Vector database storage for relationships
         output_path: The path to the output file (including extension).
-        file_format: Output format - "csv", "excel", "md", "txt".
+        file_format: Output format - "csv", "jsonl", "excel", "md", "txt".
             - csv: Comma-separated values file
+            - jsonl: One JSON object per line, tagged with its section
             - excel: Microsoft Excel file with multiple sheets
             - md: Markdown tables
             - txt: Plain text formatted output
         include_vector_data: Whether to include data from the vector database.
+        batch_size: Number of rows fetched and written per batch.
     """
-    # Collect data
-    entities_data = []
-    relations_data = []
-    relationships_data = []
-
-    # --- Entities ---
-    all_entities = await chunk_entity_relation_graph.get_all_labels()
-    for entity_name in all_entities:
-        # Get entity information from graph
-        node_data = await chunk_entity_relation_graph.get_node(entity_name)
-        source_id = node_data.get("source_id") if node_data else None
-
-        entity_info = {
-            "graph_data": node_data,
-            "source_id": source_id,
-        }
-
-        # Optional: Get vector database information
-        if include_vector_data:
-            entity_id = compute_mdhash_id(entity_name, prefix="ent-")
-            vector_data = await entities_vdb.get_by_id(entity_id)
-            entity_info["vector_data"] = vector_data
-
-        entity_row = {
-            "entity_name": entity_name,
-            "source_id": source_id,
-            "graph_data": str(
-                entity_info["graph_data"]
-            ),  # Convert to string to ensure compatibility
-        }
-        if include_vector_data and "vector_data" in entity_info:
-            entity_row["vector_data"] = str(entity_info["vector_data"])
-        entities_data.append(entity_row)
-
-    # --- Relations ---
-    for src_entity in all_entities:
-        for tgt_entity in all_entities:
-            if src_entity == tgt_entity:
-                continue
-
-            edge_exists = await chunk_entity_relation_graph.has_edge(
-                src_entity, tgt_entity
-            )
-            if edge_exists:
-                # Get edge information from graph
-                edge_data = await chunk_entity_relation_graph.get_edge(
-                    src_entity, tgt_entity
-                )
-                source_id = edge_data.get("source_id") if edge_data else None
+    batch_size = max(1, batch_size)
 
-                relation_info = {
-                    "graph_data": edge_data,
-                    "source_id": source_id,
-                }
-
-                # Optional: Get vector database information
-                if include_vector_data:
-                    rel_id = compute_mdhash_id(src_entity + tgt_entity, prefix="rel-")
-                    vector_data = await relationships_vdb.get_by_id(rel_id)
-                    relation_info["vector_data"] = vector_data
-
-                relation_row = {
-                    "src_entity": src_entity,
-                    "tgt_entity": tgt_entity,
-                    "source_id": relation_info["source_id"],
-                    "graph_data": str(relation_info["graph_data"]),  # Convert to string
-                }
-                if include_vector_data and "vector_data" in relation_info:
-                    relation_row["vector_data"] = str(relation_info["vector_data"])
-                relations_data.append(relation_row)
-
-    # --- Relationships (from VectorDB) ---
-    all_relationships = await relationships_vdb.client_storage
-    for rel in all_relationships["data"]:
-        relationships_data.append(
-            {
-                "relationship_id": rel["__id__"],
-                "data": str(rel),  # Convert to string for compatibility
-            }
+    def sections():
+        return (
+            (
+                "entity",
+                _iter_export_entities(
+                    chunk_entity_relation_graph,
+                    entities_vdb,
+                    include_vector_data,
+                    batch_size,
+                ),
+            ),
+            (
+                "relation",
+                _iter_export_relations(
+                    chunk_entity_relation_graph,
+                    relationships_vdb,
+                    include_vector_data,
+                    batch_size,
+                ),
+            ),
+            (
+                "relationship",
+                _iter_export_relationships(relationships_vdb, batch_size),
+            ),
         )
 
-    # Export based on format
     if file_format == "csv":
-        # CSV export
+        titles = {
+            "entity": "# ENTITIES\n",
+            "relation": "# RELATIONS\n",
+            "relationship": "# RELATIONSHIPS\n",
+        }
         with open(output_path, "w", newline="", encoding="utf-8") as csvfile:
-            # Entities
-            if entities_data:
-                csvfile.write("# ENTITIES\n")
-                writer = csv.DictWriter(csvfile, fieldnames=entities_data[0].keys())
-                writer.writeheader()
-                writer.writerows(entities_data)
-                csvfile.write("\n\n")
-
-            # Relations
-            if relations_data:
-                csvfile.write("# RELATIONS\n")
-                writer = csv.DictWriter(csvfile, fieldnames=relations_data[0].keys())
-                writer.writeheader()
-                writer.writerows(relations_data)
-                csvfile.write("\n\n")
-
-            # Relationships
-            if relationships_data:
-                csvfile.write("# RELATIONSHIPS\n")
-                writer = csv.DictWriter(
-                    csvfile, fieldnames=relationships_data[0].keys()
-                )
-                writer.writeheader()
-                writer.writerows(relationships_data)
+            wrote_section = False
+            for section, row_batches in sections():
+                writer = None
+                async for rows in row_batches:
+                    if not rows:
+                        continue
+                    if writer is None:
+                        if wrote_section:
+                            csvfile.write("\n\n")
+                        csvfile.write(titles[section])
+                        writer = csv.DictWriter(csvfile, fieldnames=rows[0].keys())
+                        writer.writeheader()
+                        wrote_section = True
+                    writer.writerows(rows)
+
+    elif file_format == "jsonl":
+        with open(output_path, "w", encoding="utf-8") as jsonlfile:
+            for section, row_batches in sections():
+                async for rows in row_batches:
+                    jsonlfile.writelines(
+                        json.dumps({"type": section, **row}, ensure_ascii=False) + "\n"
+                        for row in rows
+                    )
 
     elif file_format == "excel":
         # Excel export
         import pandas as pd
 
-        entities_df = pd.DataFrame(entities_data) if entities_data else pd.DataFrame()
-        relations_df = (
-            pd.DataFrame(relations_data) if relations_data else pd.DataFrame()
-        )
-        relationships_df = (
-            pd.DataFrame(relationships_data) if relationships_data else pd.DataFrame()
-        )
-
+        sheet_names = {
+            "entity": "Entities",
+            "relation": "Relations",
+            "relationship": "Relationships",
+        }
         with pd.ExcelWriter(output_path, engine="xlsxwriter") as writer:
-            if not entities_df.empty:
-                entities_df.to_excel(writer, sheet_name="Entities", index=False)
-            if not relations_df.empty:
-                relations_df.to_excel(writer, sheet_name="Relations", index=False)
-            if not relationships_df.empty:
-                relationships_df.to_excel(
-                    writer, sheet_name="Relationships", index=False
-                )
+            for section, row_batches in sections():
+                rows = await _collect_export_rows(row_batches)
+                if rows:
+                    pd.DataFrame(rows).to_excel(
+                        writer, sheet_name=sheet_names[section], index=False
+                    )
 
     elif file_format == "md":
         # Markdown export
+        titles = {
+            "entity": ("## Entities\n\n", "*No entity data available*\n\n"),
+            "relation": ("## Relations\n\n", "*No relation data available*\n\n"),
+            "relationship": (
+                "## Relationships\n\n",
+                "*No relationship data available*\n\n",
+            ),
+        }
         with open(output_path, "w", encoding="utf-8") as mdfile:
             mdfile.write("# LightRAG Data Export\n\n")
-
-            # Entities
-            mdfile.write("## Entities\n\n")
-            if entities_data:
-                # Write header
-                mdfile.write("| " + " | ".join(entities_data[0].keys()) + " |\n")
-                mdfile.write(
-                    "| " + " | ".join(["---"] * len(entities_data[0].keys())) + " |\n"
-                )
-
-                # Write rows
-                for entity in entities_data:
-                    mdfile.write(
-                        "| " + " | ".join(str(v) for v in entity.values()) + " |\n"
-                    )
-                mdfile.write("\n\n")
-            else:
-                mdfile.write("*No entity data available*\n\n")
-
-            # Relations
-            mdfile.write("## Relations\n\n")
-            if relations_data:
-                # Write header
-                mdfile.write("| " + " | ".join(relations_data[0].keys()) + " |\n")
-                mdfile.write(
-                    "| " + " | ".join(["---"] * len(relations_data[0].keys())) + " |\n"
-                )
-
-                # Write rows
-                for relation in relations_data:
-                    mdfile.write(
-                        "| " + " | ".join(str(v) for v in relation.values()) + " |\n"
-                    )
-                mdfile.write("\n\n")
-            else:
-                mdfile.write("*No relation data available*\n\n")
-
-            # Relationships
-            mdfile.write("## Relationships\n\n")
-            if relationships_data:
-                # Write header
-                mdfile.write("| " + " | ".join(relationships_data[0].keys()) + " |\n")
-                mdfile.write(
-                    "| "
-                    + " | ".join(["---"] * len(relationships_data[0].keys()))
-                    + " |\n"
-                )
-
-                # Write rows
-                for relationship in relationships_data:
-                    mdfile.write(
-                        "| "
-                        + " | ".join(str(v) for v in relationship.values())
-                        + " |\n"
-                    )
-            else:
-                mdfile.write("*No relationship data available*\n\n")
+            for section, row_batches in sections():
+                title, empty = titles[section]
+                mdfile.write(title)
+                has_rows = False
+                async for rows in row_batches:
+                    if not rows:
+                        continue
+                    if not has_rows:
+                        mdfile.write("| " + " | ".join(rows[0].keys()) + " |\n")
+                        mdfile.write("| " + " | ".join(["---"] * len(rows[0])) + " |\n")
+                        has_rows = True
+                    for row in rows:
+                        mdfile.write(
+                            "| " + " | ".join(str(v) for v in row.values()) + " |\n"
+                        )
+                if has_rows:
+                    if section != "relationship":
+                        mdfile.write("\n\n")
+                else:
+                    mdfile.write(empty)
 
     elif file_format == "txt":
-        # Plain text export
+        # Plain text export, column widths need all rows of a section
+        titles = {
+            "entity": ("ENTITIES", "No entity data available"),
+            "relation": ("RELATIONS", "No relation data available"),
+            "relationship": ("RELATIONSHIPS", "No relationship data available"),
+        }
         with open(output_path, "w", encoding="utf-8") as txtfile:
             txtfile.write("LIGHTRAG DATA EXPORT\n")
             txtfile.write("=" * 80 + "\n\n")
-
-            # Entities
-            txtfile.write("ENTITIES\n")
-            txtfile.write("-" * 80 + "\n")
-            if entities_data:
-                # Create fixed width columns
-                col_widths = {
-                    k: max(len(k), max(len(str(e[k])) for e in entities_data))
-                    for k in entities_data[0]
-                }
-                header = "  ".join(k.ljust(col_widths[k]) for k in entities_data[0])
-                txtfile.write(header + "\n")
-                txtfile.write("-" * len(header) + "\n")
-
-                # Write rows
-                for entity in entities_data:
-                    row = "  ".join(
-                        str(v).ljust(col_widths[k]) for k, v in entity.items()
-                    )
-                    txtfile.write(row + "\n")
-                txtfile.write("\n\n")
-            else:
-                txtfile.write("No entity data available\n\n")
-
-            # Relations
-            txtfile.write("RELATIONS\n")
-            txtfile.write("-" * 80 + "\n")
-            if relations_data:
-                # Create fixed width columns
-                col_widths = {
-                    k: max(len(k), max(len(str(r[k])) for r in relations_data))
-                    for k in relations_data[0]
-                }
-                header = "  ".join(k.ljust(col_widths[k]) for k in relations_data[0])
-                txtfile.write(header + "\n")
-                txtfile.write("-" * len(header) + "\n")
-
-                # Write rows
-                for relation in relations_data:
-                    row = "  ".join(
-                        str(v).ljust(col_widths[k]) for k, v in relation.items()
-                    )
-                    txtfile.write(row + "\n")
-                txtfile.write("\n\n")
-            else:
-                txtfile.write("No relation data available\n\n")
-
-            # Relationships
-            txtfile.write("RELATIONSHIPS\n")
-            txtfile.write("-" * 80 + "\n")
-            if relationships_data:
-                # Create fixed width columns
-                col_widths = {
-                    k: max(len(k), max(len(str(r[k])) for r in relationships_data))
-                    for k in relationships_data[0]
-                }
-                header = "  ".join(
-                    k.ljust(col_widths[k]) for k in relationships_data[0]
-                )
-                txtfile.write(header + "\n")
-                txtfile.write("-" * len(header) + "\n")
-
-                # Write rows
-                for relationship in relationships_data:
-                    row = "  ".join(
-                        str(v).ljust(col_widths[k]) for k, v in relationship.items()
-                    )
-                    txtfile.write(row + "\n")
-            else:
-                txtfile.write("No relationship data available\n\n")
+            for section, row_batches in sections():
+                title, empty = titles[section]
+                rows = await _collect_export_rows(row_batches)
+                _write_txt_section(txtfile, title, rows, empty)
+                if rows and section != "relationship":
+                    txtfile.write("\n\n")
 
     else:
         raise ValueError(
             f"Unsupported file format: {file_format}. "
-            f"Choose from: csv, excel, md, txt"
+            f"Choose from: csv, jsonl, excel, md, txt"
         )
     if file_format is not None:
         print(f"Data exported to: {output_path} with format: {file_format}")
@@ -1496,8 +2423,9 @@ def export_data(
         entities_vdb: Vector database storage for entities
         relationships_vdb: Vector database storage for relationships
         output_path: The path to the output file (including extension).
-        file_format: Output format - "csv", "excel", "md", "txt".
+        file_format: Output format - "csv", "jsonl", "excel", "md", "txt".
             - csv: Comma-separated values file
+            - jsonl: One JSON object per line, tagged with its section
             - excel: Microsoft Excel file with multiple sheets
             - md: Markdown tables
             - txt: Plain text formatted output
@@ -2158,42 +3086,24 @@ async def pick_by_vector_similarity(
                 "Using pre-computed query embedding for vector similarity chunk selection"
             )
 
-        # Get chunk embeddings from vector database
-        chunk_vectors = await chunks_vdb.get_vectors_by_ids(all_chunk_ids)
+        # Score the chunks inside the vector database instead of fetching their vectors
+        scores = await chunks_vdb.score_by_ids(query_embedding, all_chunk_ids)
         logger.debug(
-            f"Vector similarity chunk selection: {len(chunk_vectors)} chunk vectors Retrieved"
+            f"Vector similarity chunk selection: {len(scores)} chunk vectors scored"
         )
 
-        if not chunk_vectors or len(chunk_vectors) != len(all_chunk_ids):
-            if not chunk_vectors:
+        if not scores or len(scores) != len(all_chunk_ids):
+            if not scores:
                 logger.warning(
                     "Vector similarity chunk selection: no vectors retrieved from chunks_vdb"
                 )
             else:
                 logger.warning(
-                    f"Vector similarity chunk selection: found {len(chunk_vectors)} but expecting {len(all_chunk_ids)}"
+                    f"Vector similarity chunk selection: found {len(scores)} but expecting {len(all_chunk_ids)}"
                 )
             return []
 
-        # Calculate cosine similarities
-        similarities = []
-        valid_vectors = 0
-        for chunk_id in all_chunk_ids:
-            if chunk_id in chunk_vectors:
-                chunk_embedding = chunk_vectors[chunk_id]
-                try:
-                    # Calculate cosine similarity
-                    similarity = cosine_similarity(query_embedding, chunk_embedding)
-                    similarities.append((chunk_id, similarity))
-                    valid_vectors += 1
-                except Exception as e:
-                    logger.warning(
-                        f"Vector similarity chunk selection: failed to calculate similarity for chunk {chunk_id}: {e}"
-                    )
-            else:
-                logger.warning(
-                    f"Vector similarity chunk selection:  no vector found for chunk {chunk_id}"
-                )
+        similarities = list(scores.items())
 
         # Sort by similarity (highest first) and select top num_of_chunks
         similarities.sort(key=lambda x: x[1], reverse=True)
@@ -0,0 +1,59 @@
+"""
+Shared fixtures for the unit tests
+"""
+
+import pytest
+
+from lightrag.kg.shared_storage import finalize_share_data, initialize_share_data
+from lightrag.utils import Tokenizer
+
+
+class _CharTokenizer:
+    def encode(self, content):
+        return [ord(char) for char in content]
+
+    def decode(self, tokens):
+        return "".join(chr(token) for token in tokens)
+
+
+@pytest.fixture
+def shared_data():
+    """Single-process shared data, as used by storages outside the API server"""
+    initialize_share_data(1)
+    yield
+    finalize_share_data()
+
+
+@pytest.fixture
+def make_storage():
+    """Factory of initialized storages, tests finalize the storages they create
+
+    global_config entries are added to the working_dir, other keyword arguments
+    are passed to the storage class.
+    """
+
+    async def make(
+        storage_cls,
+        namespace,
+        working_dir,
+        workspace="",
+        global_config=None,
+        **kwargs,
+    ):
+        kwargs.setdefault("embedding_func", None)
+        storage = storage_cls(
+            namespace=namespace,
+            workspace=workspace,
+            global_config={"working_dir": working_dir, **(global_config or {})},
+            **kwargs,
+        )
+        await storage.initialize()
+        return storage
+
+    return make
+
+
+@pytest.fixture
+def tokenizer():
+    """Offline tokenizer, the default tiktoken one downloads its encoding"""
+    return Tokenizer("chars", _CharTokenizer())
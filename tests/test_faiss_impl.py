@@ -0,0 +1,63 @@
+"""
+Tests for FaissVectorDBStorage index persistence
+"""
+
+import numpy as np
+import pytest
+
+from lightrag.utils import EmbeddingFunc
+
+pytest.importorskip("faiss")
+
+from lightrag.kg.faiss_impl import FaissVectorDBStorage  # noqa: E402
+
+EMBEDDING_DIM = 16
+
+
+async def mock_embedding_func(texts, **kwargs):
+    # Deterministic vector per text so queries find the upserted record
+    return np.array(
+        [
+            np.random.default_rng(abs(hash(text)) % (2**32)).random(EMBEDDING_DIM)
+            for text in texts
+        ]
+    )
+
+
+def make_faiss_storage(make_storage, working_dir, index_type):
+    return make_storage(
+        FaissVectorDBStorage,
+        "chunks",
+        working_dir,
+        global_config={
+            "embedding_batch_num": 8,
+            "vector_db_storage_cls_kwargs": {
+                "cosine_better_than_threshold": 0.0,
+                "index_type": index_type,
+            },
+        },
+        embedding_func=EmbeddingFunc(
+            embedding_dim=EMBEDDING_DIM, func=mock_embedding_func
+        ),
+        meta_fields={"content"},
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("index_type", ["flat", "hnsw"])
+async def test_upsert_after_reload_with_deleted_last_fid(
+    tmp_path, shared_data, make_storage, index_type
+):
+    storage = await make_faiss_storage(make_storage, str(tmp_path), index_type)
+    await storage.upsert({f"id{i}": {"content": f"text {i}"} for i in range(10)})
+    # Delete the record holding the highest faiss id, then persist
+    await storage.delete(["id9"])
+    await storage.index_done_callback()
+
+    reloaded = await make_faiss_storage(make_storage, str(tmp_path), index_type)
+    await reloaded.upsert({"new": {"content": "new text"}})
+
+    results = await reloaded.query("new text", top_k=3)
+    assert results[0]["id"] == "new"
+    assert await reloaded.get_by_id("id9") is None
+    assert (await reloaded.get_by_id("new"))["content"] == "new text"
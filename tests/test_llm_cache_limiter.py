@@ -0,0 +1,195 @@
+"""
+Tests for the size and ttl limits of the LLM response cache
+"""
+
+import asyncio
+
+import pytest
+
+from lightrag.kg.json_kv_impl import JsonKVStorage
+from lightrag.kg.sqlite_impl import SqliteKVStorage
+from lightrag.utils import CacheData, LLMCacheLimiter, handle_cache, save_to_cache
+
+
+@pytest.fixture
+def make_cache(make_storage):
+    async def make(working_dir, cache_cls, limits):
+        limiter = LLMCacheLimiter(limits)
+        global_config = {
+            "enable_llm_cache": True,
+            "enable_llm_cache_for_entity_extract": True,
+            "llm_cache_limiter": limiter,
+        }
+        cache = await make_storage(
+            cache_cls, "llm_response_cache", working_dir, global_config=global_config
+        )
+        text_chunks = await make_storage(
+            JsonKVStorage, "text_chunks", working_dir, global_config=global_config
+        )
+        limiter.attach(cache, text_chunks)
+        return cache, text_chunks, limiter
+
+    return make
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("cache_cls", [JsonKVStorage, SqliteKVStorage])
+async def test_expired_entry_is_refreshed_by_saving_again(
+    tmp_path, shared_data, make_cache, cache_cls
+):
+    cache, _, _ = await make_cache(
+        str(tmp_path), cache_cls, {"query": {"max_entries": 100, "ttl": 2}}
+    )
+    data = CacheData(args_hash="q1", content="answer", prompt="question", mode="local")
+
+    await save_to_cache(cache, data)
+    assert (await handle_cache(cache, "q1", "question", "local", "query"))[
+        0
+    ] == "answer"
+
+    # Storages keep whole-second timestamps
+    await asyncio.sleep(3.2)
+    assert await handle_cache(cache, "q1", "question", "local", "query") is None
+
+    # Saving the same response again must bring the entry back to life
+    await save_to_cache(cache, data)
+    assert (await handle_cache(cache, "q1", "question", "local", "query"))[
+        0
+    ] == "answer"
+    await cache.finalize()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("cache_cls", [JsonKVStorage, SqliteKVStorage])
+async def test_limit_keeps_referenced_extract_results(
+    tmp_path, shared_data, make_cache, cache_cls
+):
+    cache, text_chunks, limiter = await make_cache(
+        str(tmp_path), cache_cls, {"*": {"max_entries": 20, "policy": "lru"}}
+    )
+    pinned_keys = [f"default:extract:h{i}" for i in range(5)]
+    await text_chunks.upsert(
+        {"chunk-1": {"content": "text", "llm_cache_list": pinned_keys}}
+    )
+
+    for i in range(26):
+        await save_to_cache(
+            cache,
+            CacheData(
+                args_hash=f"h{i}",
+                content=f"result {i}",
+                prompt="prompt",
+                cache_type="extract",
+                chunk_id="chunk-1",
+            ),
+        )
+
+    keys = set((await cache.get_all()).keys())
+    assert set(pinned_keys) <= keys
+    # Pinned entries stop counting once found, the other ones are evicted oldest
+    # first: h21..h23 push the cache over 20 counted entries and h5 is evicted
+    assert len(keys) == 25
+    assert "default:extract:h5" not in keys
+    metrics = limiter.metrics()["extract"]
+    assert metrics["entries"] == 20
+    assert metrics["pinned_entries"] == len(pinned_keys)
+
+    result = await limiter.compact()
+    # The rescan counts the pinned entries again until it finds them referenced
+    assert result["evicted_entries"] == 2
+    assert result["cache_types"]["extract"]["entries"] == 18
+    assert result["cache_types"]["extract"]["pinned_entries"] == len(pinned_keys)
+    await cache.finalize()
+
+
+@pytest.mark.asyncio
+async def test_entries_of_deleted_chunks_are_unpinned(
+    tmp_path, shared_data, make_cache
+):
+    cache, text_chunks, limiter = await make_cache(
+        str(tmp_path), JsonKVStorage, {"*": {"max_entries": 20, "policy": "lru"}}
+    )
+    pinned_keys = [f"default:extract:h{i}" for i in range(5)]
+    await text_chunks.upsert(
+        {"chunk-1": {"content": "text", "llm_cache_list": pinned_keys}}
+    )
+    for i in range(26):
+        await save_to_cache(
+            cache,
+            CacheData(
+                args_hash=f"h{i}",
+                content=f"result {i}",
+                prompt="prompt",
+                cache_type="extract",
+                chunk_id="chunk-1",
+            ),
+        )
+    assert limiter.metrics()["extract"]["pinned_entries"] == len(pinned_keys)
+
+    await text_chunks.delete(["chunk-1"])
+    await limiter.unpin(pinned_keys)
+
+    # Counted again and, being the oldest, evicted first
+    metrics = limiter.metrics()["extract"]
+    assert metrics["pinned_entries"] == 0
+    assert metrics["entries"] == 18
+    keys = set((await cache.get_all()).keys())
+    assert len(keys) == 18
+    assert not keys.intersection(pinned_keys)
+    await cache.finalize()
+
+
+@pytest.mark.asyncio
+async def test_pinned_entries_are_not_checked_on_every_save(
+    tmp_path, shared_data, make_cache
+):
+    cache, text_chunks, limiter = await make_cache(
+        str(tmp_path), JsonKVStorage, {"*": {"max_entries": 10}}
+    )
+    # One chunk per pinned entry, so every pinned entry checked costs a chunk read
+    await text_chunks.upsert(
+        {
+            f"chunk-{i}": {
+                "content": "text",
+                "llm_cache_list": [f"default:extract:p{i}"],
+            }
+            for i in range(300)
+        }
+    )
+    for i in range(300):
+        await save_to_cache(
+            cache,
+            CacheData(
+                args_hash=f"p{i}",
+                content=f"result {i}",
+                prompt="prompt",
+                cache_type="extract",
+                chunk_id=f"chunk-{i}",
+            ),
+        )
+
+    chunk_reads = 0
+    get_by_ids = text_chunks.get_by_ids
+
+    async def counting_get_by_ids(ids):
+        nonlocal chunk_reads
+        chunk_reads += len(ids)
+        return await get_by_ids(ids)
+
+    text_chunks.get_by_ids = counting_get_by_ids
+    for i in range(50):
+        await save_to_cache(
+            cache,
+            CacheData(
+                args_hash=f"u{i}",
+                content=f"result {i}",
+                prompt="prompt",
+                cache_type="extract",
+                chunk_id="chunk-0",
+            ),
+        )
+
+    assert chunk_reads < 100
+    assert limiter.metrics()["extract"]["pinned_entries"] == 300
+    assert limiter.metrics()["extract"]["entries"] <= 10
+    assert len(await cache.get_all()) <= 310
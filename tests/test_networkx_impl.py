@@ -0,0 +1,95 @@
+"""
+Tests for the chunk id indexes of NetworkXStorage
+
+Lookups through the indexes are checked against a scan of the whole graph,
+which is how get_nodes_by_chunk_ids and get_edges_by_chunk_ids used to work.
+"""
+
+import random
+
+import pytest
+
+from lightrag.constants import GRAPH_FIELD_SEP
+from lightrag.kg.networkx_impl import NetworkXStorage
+
+CHUNK_IDS = [f"chunk-{i}" for i in range(12)]
+
+
+def source_id(rng):
+    return GRAPH_FIELD_SEP.join(rng.sample(CHUNK_IDS, rng.randint(1, 3)))
+
+
+async def scan_by_chunk_ids(storage, chunk_ids):
+    chunk_ids = set(chunk_ids)
+
+    def matches(data):
+        # Nodes added implicitly by an edge have no source_id
+        return "source_id" in data and not chunk_ids.isdisjoint(
+            data["source_id"].split(GRAPH_FIELD_SEP)
+        )
+
+    nodes = [node for node in await storage.get_all_nodes() if matches(node)]
+    edges = [edge for edge in await storage.get_all_edges() if matches(edge)]
+    return nodes, edges
+
+
+async def assert_index_matches_scan(storage, rng):
+    for _ in range(10):
+        chunk_ids = rng.sample(CHUNK_IDS, rng.randint(1, 4))
+        nodes, edges = await scan_by_chunk_ids(storage, chunk_ids)
+        # Same elements, same order and same edge orientation as the scan
+        assert await storage.get_nodes_by_chunk_ids(chunk_ids) == nodes
+        assert await storage.get_edges_by_chunk_ids(chunk_ids) == edges
+
+
+async def apply_random_changes(storage, rng, steps=200):
+    node_ids = [f"node-{i}" for i in range(30)]
+    for _ in range(steps):
+        action = rng.random()
+        if action < 0.4:
+            node_id = rng.choice(node_ids)
+            await storage.upsert_node(
+                node_id, {"entity_id": node_id, "source_id": source_id(rng)}
+            )
+        elif action < 0.8:
+            src, tgt = rng.sample(node_ids, 2)
+            await storage.upsert_edge(src, tgt, {"source_id": source_id(rng)})
+        elif action < 0.9:
+            await storage.remove_nodes([rng.choice(node_ids)])
+        else:
+            await storage.remove_edges([tuple(rng.sample(node_ids, 2))])
+
+
+async def make_graph(make_storage, working_dir):
+    return await make_storage(NetworkXStorage, "chunk_entity_relation", working_dir)
+
+
+@pytest.mark.asyncio
+async def test_chunk_index_follows_changes_and_reload(
+    tmp_path, shared_data, make_storage
+):
+    rng = random.Random(0)
+    storage = await make_graph(make_storage, str(tmp_path))
+
+    await apply_random_changes(storage, rng)
+    await assert_index_matches_scan(storage, rng)
+    # The first save writes a snapshot, the second one appends to the change log
+    await storage.index_done_callback()
+    await apply_random_changes(storage, rng)
+    await assert_index_matches_scan(storage, rng)
+    await storage.index_done_callback()
+    assert storage._changelog_ops > 0
+
+    reloaded = await make_graph(make_storage, str(tmp_path))
+    for _ in range(10):
+        chunk_ids = rng.sample(CHUNK_IDS, rng.randint(1, 4))
+        assert await reloaded.get_nodes_by_chunk_ids(
+            chunk_ids
+        ) == await storage.get_nodes_by_chunk_ids(chunk_ids)
+        assert await reloaded.get_edges_by_chunk_ids(
+            chunk_ids
+        ) == await storage.get_edges_by_chunk_ids(chunk_ids)
+
+    # Changes on top of the replayed log keep the index in step
+    await apply_random_changes(reloaded, rng)
+    await assert_index_matches_scan(reloaded, rng)
@@ -0,0 +1,72 @@
+"""
+Tests for the adaptive concurrency limit of priority_limit_async_func_call
+"""
+
+import asyncio
+
+import pytest
+
+from lightrag.utils import priority_limit_async_func_call
+
+
+def make_limited_func(max_size):
+    @priority_limit_async_func_call(max_size, adaptive=True, adaptive_max_size=8)
+    async def call():
+        await asyncio.sleep(0.002)
+        return True
+
+    return call
+
+
+@pytest.mark.asyncio
+async def test_sequential_calls_do_not_grow_the_limit():
+    call = make_limited_func(2)
+    try:
+        # Idle workers hold slots while waiting for tasks, that is not load
+        for _ in range(100):
+            assert await call()
+        metrics = call.metrics()
+        assert metrics["concurrency_limit"] == 2
+        assert metrics["limit_increases"] == 0
+        assert metrics["completed"] == 100
+    finally:
+        await call.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_saturating_load_grows_the_limit():
+    call = make_limited_func(2)
+    try:
+        results = await asyncio.gather(*(call() for _ in range(300)))
+        assert all(results)
+        metrics = call.metrics()
+        assert metrics["concurrency_limit"] > 2
+        assert metrics["limit_increases"] > 0
+    finally:
+        await call.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_idle_workers_return_their_slots():
+    call = make_limited_func(2)
+    try:
+        assert await call()
+        # Let every worker reach its slot or the queue, then cancel them all
+        await asyncio.sleep(0.05)
+        workers = [
+            task
+            for task in asyncio.all_tasks()
+            if task.get_coro().__qualname__.endswith(".worker")
+        ]
+        assert workers
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+        # The health check replaces the workers, which must find the slots free
+        results = await asyncio.wait_for(
+            asyncio.gather(*(call() for _ in range(4))), timeout=10
+        )
+        assert all(results)
+    finally:
+        await call.shutdown()
@@ -0,0 +1,183 @@
+"""
+Tests for the secondary indexes of the Redis doc status storage
+
+Redis is replaced by fakeredis, the queries are checked against
+JsonDocStatusStorage, the reference implementation of the DocStatusStorage
+interface.
+"""
+
+import asyncio
+import random
+
+import pytest
+
+from lightrag.base import DocStatus
+from lightrag.kg.json_doc_status_impl import JsonDocStatusStorage
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from lightrag.kg import redis_impl  # noqa: E402
+from lightrag.kg.redis_impl import RedisDocStatusStorage  # noqa: E402
+
+
+@pytest.fixture
+def fake_server(monkeypatch):
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        redis_impl,
+        "Redis",
+        lambda connection_pool: fakeredis.FakeAsyncRedis(
+            server=server, decode_responses=True
+        ),
+    )
+    return server
+
+
+def make_doc(rng, i):
+    return {
+        "status": rng.choice(list(DocStatus)),
+        "content_summary": f"summary {i}",
+        "content_length": i,
+        # Unique sort keys, ties are ordered differently by each storage
+        "created_at": f"2024-01-01T00:00:{i:02d}+00:00",
+        "updated_at": f"2024-02-01T00:{rng.randrange(60):02d}:{i:02d}+00:00",
+        "file_path": rng.choice(["a", "B", "文档", "c"]) + f"-{i:02d}.txt",
+        "track_id": rng.choice(["t1", "t2", None]),
+        "chunks_count": 1,
+        "chunks_list": [],
+    }
+
+
+async def apply_random_changes(rng, storages, steps=60):
+    for _ in range(steps):
+        if rng.random() < 0.8:
+            docs = {
+                f"doc-{i:02d}": make_doc(rng, i)
+                for i in rng.sample(range(60), rng.randint(1, 6))
+            }
+            for storage in storages:
+                await storage.upsert({k: dict(v) for k, v in docs.items()})
+        else:
+            ids = [f"doc-{rng.randrange(60):02d}" for _ in range(3)]
+            for storage in storages:
+                await storage.delete(ids)
+
+
+async def assert_same_queries(redis_status, json_status):
+    assert (
+        await redis_status.get_all_status_counts()
+        == await json_status.get_all_status_counts()
+    )
+    for status in DocStatus:
+        assert await redis_status.get_docs_by_status(
+            status
+        ) == await json_status.get_docs_by_status(status)
+    for track_id in ["t1", "t2"]:
+        assert await redis_status.get_docs_by_track_id(
+            track_id
+        ) == await json_status.get_docs_by_track_id(track_id)
+
+    for sort_field in ["created_at", "updated_at", "id", "file_path"]:
+        for sort_direction in ["asc", "desc"]:
+            for status_filter in [None, DocStatus.PENDING]:
+                for page in [1, 2, 4]:
+                    args = (status_filter, page, 10, sort_field, sort_direction)
+                    assert await redis_status.get_docs_paginated(
+                        *args
+                    ) == await json_status.get_docs_paginated(*args), args
+
+
+async def index_members(redis_status):
+    """Doc ids found in every index key, by key"""
+    redis = redis_status._redis
+    members = {}
+    async for key in redis.scan_iter(match=f"{redis_status.final_namespace}#idx:*"):
+        key_type = await redis.type(key)
+        if key_type == "set":
+            members[key] = await redis.smembers(key)
+        elif key_type == "zset":
+            members[key] = set(await redis.zrange(key, 0, -1))
+    return members
+
+
+@pytest.mark.asyncio
+async def test_indexes_match_json_storage(
+    tmp_path, shared_data, fake_server, make_storage
+):
+    redis_status = await make_storage(
+        RedisDocStatusStorage, "doc_status", str(tmp_path)
+    )
+    json_status = await make_storage(JsonDocStatusStorage, "doc_status", str(tmp_path))
+    rng = random.Random(0)
+
+    await apply_random_changes(rng, [redis_status, json_status])
+    await assert_same_queries(redis_status, json_status)
+
+    # Every sorted set of all documents holds exactly the stored doc ids
+    stored_ids = {
+        doc_id
+        for status in DocStatus
+        for doc_id in await json_status.get_docs_by_status(status)
+    }
+    members = await index_members(redis_status)
+    for field in redis_impl.DOC_STATUS_SORT_FIELDS:
+        assert members[redis_status._index_key("sort", field)] == stored_ids
+
+    assert (await redis_status.drop())["status"] == "success"
+    await json_status.drop()
+    assert await index_members(redis_status) == {}
+    await assert_same_queries(redis_status, json_status)
+
+    # Indexes keep working after a drop
+    await apply_random_changes(rng, [redis_status, json_status], steps=10)
+    await assert_same_queries(redis_status, json_status)
+    await redis_status.close()
+    await json_status.finalize()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_status_updates_keep_indexes_consistent(
+    tmp_path, shared_data, fake_server, make_storage
+):
+    redis_status = await make_storage(
+        RedisDocStatusStorage, "doc_status", str(tmp_path)
+    )
+    rng = random.Random(1)
+    doc = make_doc(rng, 1)
+
+    # Each writer moves the same document to a different status
+    await asyncio.gather(
+        *(
+            redis_status.upsert({"doc-01": {**doc, "status": status}})
+            for status in DocStatus
+            for _ in range(5)
+        )
+    )
+
+    counts = await redis_status.get_status_counts()
+    assert sum(counts.values()) == 1
+    final_status = (await redis_status.get_by_id("doc-01"))["status"]
+    assert counts[final_status] == 1
+    await redis_status.close()
+
+
+@pytest.mark.asyncio
+async def test_indexes_are_built_for_existing_documents(
+    tmp_path, shared_data, fake_server, make_storage
+):
+    redis_status = await make_storage(
+        RedisDocStatusStorage, "doc_status", str(tmp_path)
+    )
+    json_status = await make_storage(JsonDocStatusStorage, "doc_status", str(tmp_path))
+    await apply_random_changes(random.Random(2), [redis_status, json_status])
+    members = await index_members(redis_status)
+
+    # Data written before the indexes existed has no index keys nor version
+    await redis_status._delete_index_keys(redis_status._redis)
+    await redis_status.close()
+
+    rebuilt = await make_storage(RedisDocStatusStorage, "doc_status", str(tmp_path))
+    assert await index_members(rebuilt) == members
+    await assert_same_queries(rebuilt, json_status)
+    await rebuilt.close()
+    await json_status.finalize()
@@ -0,0 +1,85 @@
+"""
+Tests for the semantic query cache configured by embedding_cache_config
+"""
+
+import numpy as np
+import pytest
+
+from lightrag import LightRAG
+from lightrag.kg.shared_storage import finalize_share_data
+from lightrag.utils import EmbeddingFunc, SemanticQueryCache
+
+EMBEDDING_DIM = 8
+
+
+async def same_embedding_func(texts, **kwargs):
+    # Every query looks identical to the embedding check
+    return np.ones((len(texts), EMBEDDING_DIM))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("rating, hit", [("0.85", True), ("0.5", False)])
+async def test_llm_check_uses_its_own_threshold(rating, hit):
+    async def llm_check_func(prompt, **kwargs):
+        return rating
+
+    cache = SemanticQueryCache(
+        same_embedding_func,
+        similarity_threshold=0.95,
+        llm_check_func=llm_check_func,
+        llm_check_threshold=0.8,
+    )
+    _, embedding = await cache.lookup("local", "who founded the company?")
+    cache.insert("local", "who founded the company?", embedding, "answer")
+
+    answer, _ = await cache.lookup("local", "who started the company?")
+    assert (answer == "answer") is hit
+
+
+@pytest.mark.asyncio
+async def test_graph_edits_clear_cached_answers(tmp_path, tokenizer):
+    async def llm_model_func(prompt, **kwargs):
+        return "answer"
+
+    rag = LightRAG(
+        working_dir=str(tmp_path),
+        llm_model_func=llm_model_func,
+        tokenizer=tokenizer,
+        embedding_func=EmbeddingFunc(
+            embedding_dim=EMBEDDING_DIM, func=same_embedding_func
+        ),
+        embedding_cache_config={"enabled": True},
+    )
+    await rag.initialize_storages()
+    try:
+        cache = rag.semantic_query_cache
+        assert cache.ttl == 3600
+
+        async def cache_an_answer():
+            _, embedding = await cache.lookup("local", "question")
+            cache.insert("local", "question", embedding, "answer")
+            assert len(cache) == 1
+
+        await cache_an_answer()
+        await rag.acreate_entity("Alice", {"description": "A person"})
+        assert len(cache) == 0
+
+        await cache_an_answer()
+        await rag.acreate_entity("Bob", {"description": "Another person"})
+        await rag.acreate_relation("Alice", "Bob", {"description": "Friends"})
+        assert len(cache) == 0
+
+        await cache_an_answer()
+        await rag.aedit_entity("Alice", {"description": "A friend of Bob"})
+        assert len(cache) == 0
+
+        await cache_an_answer()
+        await rag.adelete_by_relation("Alice", "Bob")
+        assert len(cache) == 0
+
+        await cache_an_answer()
+        await rag.adelete_by_entity("Bob")
+        assert len(cache) == 0
+    finally:
+        await rag.finalize_storages()
+        finalize_share_data()
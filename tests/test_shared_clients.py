@@ -0,0 +1,52 @@
+"""
+Tests for the lifetime of the HTTP clients shared by LLM and embedding bindings
+"""
+
+import numpy as np
+import pytest
+
+from lightrag import LightRAG
+from lightrag.kg.shared_storage import finalize_share_data
+from lightrag.utils import EmbeddingFunc, get_shared_client
+
+
+async def llm_model_func(prompt, **kwargs):
+    return "answer"
+
+
+async def embedding_func(texts, **kwargs):
+    return np.ones((len(texts), 8))
+
+
+def make_rag(working_dir, workspace, tokenizer):
+    return LightRAG(
+        working_dir=working_dir,
+        workspace=workspace,
+        llm_model_func=llm_model_func,
+        tokenizer=tokenizer,
+        embedding_func=EmbeddingFunc(embedding_dim=8, func=embedding_func),
+    )
+
+
+@pytest.mark.asyncio
+async def test_shared_clients_outlive_other_instances_on_the_loop(tmp_path, tokenizer):
+    closed = []
+
+    async def close(client):
+        closed.append(client)
+
+    rag1 = make_rag(str(tmp_path), "ws1", tokenizer)
+    rag2 = make_rag(str(tmp_path), "ws2", tokenizer)
+    try:
+        await rag1.initialize_storages()
+        await rag2.initialize_storages()
+        client = get_shared_client(("test",), object, close)
+
+        await rag1.finalize_storages()
+        assert closed == []
+        assert get_shared_client(("test",), object, close) is client
+
+        await rag2.finalize_storages()
+        assert closed == [client]
+    finally:
+        finalize_share_data()
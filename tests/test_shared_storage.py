@@ -0,0 +1,211 @@
+"""
+Tests for the cross-process primitives of shared_storage
+"""
+
+import asyncio
+import contextlib
+import multiprocessing as mp
+import pickle
+
+import numpy as np
+import pytest
+
+from lightrag.kg import shared_storage
+from lightrag.kg.shared_storage import (
+    finalize_share_data,
+    get_changes_since,
+    get_namespace_lock,
+    get_update_flag,
+    initialize_share_data,
+    publish_changes,
+)
+
+
+@pytest.fixture
+def multi_process():
+    initialize_share_data(2)
+    yield
+    finalize_share_data()
+
+
+def vectors_change_set(count, dim=256):
+    return {
+        "upsert": [
+            {"__id__": f"id{i}", "__vector__": np.ones(dim, dtype=np.float32)}
+            for i in range(count)
+        ],
+        "delete": [],
+    }
+
+
+@pytest.mark.asyncio
+async def test_single_process_keeps_no_change_feed(shared_data):
+    await get_update_flag("chunks")
+    for _ in range(5):
+        version = await publish_changes("chunks", vectors_change_set(10))
+    assert version == 5
+    assert not shared_storage._change_feeds
+    # A lagging reader in the same process reloads instead
+    assert await get_changes_since("chunks", 4) == (5, None)
+    assert await get_changes_since("chunks", 5) == (5, [])
+
+
+@pytest.mark.asyncio
+async def test_change_feed_returns_change_sets_in_order(multi_process):
+    await get_update_flag("chunks")
+    await publish_changes("chunks", {"upsert": [], "delete": ["a"]})
+    await publish_changes("chunks", {"upsert": [], "delete": ["b"]})
+    latest, change_sets = await get_changes_since("chunks", 0)
+    assert latest == 2
+    assert [changes["delete"] for changes in change_sets] == [["a"], ["b"]]
+
+
+@pytest.mark.asyncio
+async def test_change_feed_is_capped_by_bytes(multi_process, monkeypatch):
+    await get_update_flag("chunks")
+    one_set_bytes = len(
+        pickle.dumps(vectors_change_set(10), protocol=pickle.HIGHEST_PROTOCOL)
+    )
+    monkeypatch.setattr(shared_storage, "CHANGE_FEED_MAX_BYTES", 3 * one_set_bytes)
+
+    for _ in range(6):
+        await publish_changes("chunks", vectors_change_set(10))
+
+    assert len(shared_storage._change_feeds["chunks"]) == 3
+    # Trimmed change sets force a reload, the recent ones still apply as deltas
+    assert await get_changes_since("chunks", 0) == (6, None)
+    latest, change_sets = await get_changes_since("chunks", 3)
+    assert latest == 6 and len(change_sets) == 3
+
+
+@pytest.mark.asyncio
+async def test_oversized_change_set_forces_reload(multi_process, monkeypatch):
+    await get_update_flag("chunks")
+    monkeypatch.setattr(shared_storage, "CHANGE_FEED_MAX_BYTES", 1024)
+    await publish_changes("chunks", vectors_change_set(10))
+    assert await get_changes_since("chunks", 0) == (1, None)
+
+
+class LockHolders:
+    """Count the holders of a lock and record every violation of its exclusion"""
+
+    def __init__(self, guard, readers, writers, max_readers, violations):
+        self.guard = guard
+        self.readers = readers
+        self.writers = writers
+        self.max_readers = max_readers
+        self.violations = violations
+
+    @classmethod
+    def local(cls):
+        return cls(
+            contextlib.nullcontext(),
+            *(mp.Value("i", 0, lock=False) for _ in range(4)),
+        )
+
+    @classmethod
+    def shared(cls, ctx):
+        return cls(ctx.Lock(), *(ctx.Value("i", 0, lock=False) for _ in range(4)))
+
+    def _update(self, write, delta):
+        with self.guard:
+            self._update_counts(write, delta)
+
+    def _update_counts(self, write, delta):
+        if write:
+            self.writers.value += delta
+        else:
+            self.readers.value += delta
+        if delta > 0:
+            if self.writers.value > 1 or (self.writers.value and self.readers.value):
+                self.violations.value += 1
+            self.max_readers.value = max(self.max_readers.value, self.readers.value)
+
+    async def hold(self, lock, write, seconds):
+        async with lock.write() if write else lock.read():
+            self._update(write, 1)
+            await asyncio.sleep(seconds)
+            self._update(write, -1)
+
+
+@pytest.mark.asyncio
+async def test_namespace_lock_readers_share_and_writers_exclude(shared_data):
+    lock = get_namespace_lock("chunks")
+    holders = LockHolders.local()
+    await asyncio.gather(
+        *(holders.hold(lock, write=i % 3 == 0, seconds=0.01) for i in range(12))
+    )
+    assert holders.violations.value == 0
+    assert holders.max_readers.value > 1
+    assert lock.get_metrics()["write_acquired"] == 4
+
+    # Locks of other namespaces are independent
+    async with lock.write():
+        async with get_namespace_lock("entities").write():
+            pass
+
+
+@pytest.mark.asyncio
+async def test_waiting_writer_blocks_new_readers(shared_data):
+    lock = get_namespace_lock("chunks")
+    order = []
+
+    async def writer():
+        async with lock.write():
+            order.append("writer")
+
+    async def late_reader():
+        async with lock.read():
+            order.append("late reader")
+
+    async with lock.read():
+        writer_task = asyncio.create_task(writer())
+        await asyncio.sleep(0.01)
+        reader_task = asyncio.create_task(late_reader())
+        await asyncio.sleep(0.01)
+        assert order == []
+    await asyncio.gather(writer_task, reader_task)
+    assert order == ["writer", "late reader"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_writer_releases_its_claim(shared_data):
+    lock = get_namespace_lock("chunks")
+    async with lock.read():
+        writer_task = asyncio.create_task(lock.acquire_write())
+        await asyncio.sleep(0.01)
+        writer_task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await writer_task
+    await asyncio.wait_for(lock.acquire_read(), timeout=1)
+    await lock.release_read()
+    assert lock.get_metrics()["waiting_writers"] == 0
+
+
+def hold_namespace_lock(holders, write, rounds):
+    async def run():
+        lock = get_namespace_lock("chunks")
+        for _ in range(rounds):
+            await holders.hold(lock, write, seconds=0.02)
+            await asyncio.sleep(0.005)
+
+    asyncio.run(run())
+
+
+def test_namespace_lock_excludes_across_processes(multi_process):
+    ctx = mp.get_context("fork")
+    holders = LockHolders.shared(ctx)
+    roles = [True, True, False, False, False]
+    processes = [
+        ctx.Process(target=hold_namespace_lock, args=(holders, write, 10))
+        for write in roles
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=30)
+        assert process.exitcode == 0
+
+    assert holders.violations.value == 0
+    # Readers in different workers share the lock
+    assert holders.max_readers.value > 1
@@ -0,0 +1,136 @@
+"""
+Tests for the SQLite KV and doc status storages
+
+The doc status queries are checked against JsonDocStatusStorage, the reference
+implementation of the DocStatusStorage interface.
+"""
+
+import asyncio
+import random
+
+import pytest
+
+from lightrag.base import DocStatus
+from lightrag.kg.json_doc_status_impl import JsonDocStatusStorage
+from lightrag.kg.sqlite_impl import SqliteDocStatusStorage, SqliteKVStorage
+
+
+def make_doc(rng, i):
+    return {
+        "status": rng.choice(list(DocStatus)),
+        "content_summary": f"summary {i}",
+        "content_length": i,
+        # Unique sort keys, ties are ordered differently by each storage
+        "created_at": f"2024-01-01T00:00:{i:02d}+00:00",
+        "updated_at": f"2024-02-01T00:{rng.randrange(60):02d}:{i:02d}+00:00",
+        "file_path": rng.choice(["a", "B", "文档", "c"]) + f"-{i:02d}.txt",
+        "track_id": rng.choice(["t1", "t2", None]),
+        "chunks_count": 1,
+    }
+
+
+@pytest.mark.asyncio
+async def test_kv_round_trip(tmp_path, shared_data, make_storage):
+    kv = await make_storage(SqliteKVStorage, "text_chunks", str(tmp_path))
+    await kv.upsert({"a": {"content": "x"}, "b": {"content": "y"}})
+
+    first = await kv.get_by_id("a")
+    assert first["content"] == "x" and first["_id"] == "a"
+    await asyncio.sleep(1.1)
+    await kv.upsert({"a": {"content": "z"}})
+    updated = await kv.get_by_id("a")
+    assert updated["content"] == "z"
+    assert updated["create_time"] == first["create_time"]
+    assert updated["update_time"] > first["update_time"]
+
+    assert [r and r["content"] for r in await kv.get_by_ids(["b", "missing", "a"])] == [
+        "y",
+        None,
+        "z",
+    ]
+    assert await kv.filter_keys({"a", "c"}) == {"c"}
+    assert set(await kv.get_all()) == {"a", "b"}
+
+    await kv.delete(["a"])
+    assert await kv.get_by_id("a") is None
+    await kv.finalize()
+
+    # Persisted without an explicit flush
+    reopened = await make_storage(SqliteKVStorage, "text_chunks", str(tmp_path))
+    assert set(await reopened.get_all()) == {"b"}
+    assert (await reopened.drop())["status"] == "success"
+    assert await reopened.get_all() == {}
+    await reopened.finalize()
+
+
+@pytest.mark.asyncio
+async def test_kv_workspaces_are_isolated(tmp_path, shared_data, make_storage):
+    kv1 = await make_storage(SqliteKVStorage, "text_chunks", str(tmp_path), "ws1")
+    kv2 = await make_storage(SqliteKVStorage, "text_chunks", str(tmp_path), "ws2")
+    await kv1.upsert({"a": {"content": "x"}})
+    assert await kv2.get_by_id("a") is None
+    await kv1.finalize()
+    await kv2.finalize()
+
+
+@pytest.mark.asyncio
+async def test_doc_status_matches_json_storage(tmp_path, shared_data, make_storage):
+    sqlite_status = await make_storage(
+        SqliteDocStatusStorage, "doc_status", str(tmp_path / "sqlite")
+    )
+    json_status = await make_storage(
+        JsonDocStatusStorage, "doc_status", str(tmp_path / "json")
+    )
+    rng = random.Random(0)
+    for _ in range(60):
+        if rng.random() < 0.8:
+            docs = {
+                f"doc-{i:02d}": make_doc(rng, i)
+                for i in rng.sample(range(60), rng.randint(1, 6))
+            }
+            await sqlite_status.upsert({k: dict(v) for k, v in docs.items()})
+            await json_status.upsert({k: dict(v) for k, v in docs.items()})
+        else:
+            ids = [f"doc-{rng.randrange(60):02d}" for _ in range(3)]
+            await sqlite_status.delete(ids)
+            await json_status.delete(ids)
+
+    assert (
+        await sqlite_status.get_all_status_counts()
+        == await json_status.get_all_status_counts()
+    )
+    assert (
+        await sqlite_status.get_status_counts() == await json_status.get_status_counts()
+    )
+    for status in DocStatus:
+        assert await sqlite_status.get_docs_by_status(
+            status
+        ) == await json_status.get_docs_by_status(status)
+    assert await sqlite_status.get_docs_by_track_id(
+        "t1"
+    ) == await json_status.get_docs_by_track_id("t1")
+
+    ids = [f"doc-{i:02d}" for i in range(70)]
+    assert await sqlite_status.filter_keys(set(ids)) == await json_status.filter_keys(
+        set(ids)
+    )
+    assert await sqlite_status.get_by_ids(ids) == await json_status.get_by_ids(ids)
+
+    for sort_field in ["created_at", "updated_at", "id", "file_path"]:
+        for sort_direction in ["asc", "desc"]:
+            for status_filter in [None, DocStatus.PENDING]:
+                for page in [1, 2, 4]:
+                    args = (status_filter, page, 10, sort_field, sort_direction)
+                    assert await sqlite_status.get_docs_paginated(
+                        *args
+                    ) == await json_status.get_docs_paginated(*args), args
+
+    assert (await sqlite_status.drop())["status"] == "success"
+    await json_status.drop()
+    assert (
+        await sqlite_status.get_all_status_counts()
+        == await json_status.get_all_status_counts()
+    )
+    assert sum((await sqlite_status.get_status_counts()).values()) == 0
+    await sqlite_status.finalize()
+    await json_status.finalize()